@@ -0,0 +1,68 @@
+"""Compares the latency and throughput of the decision tree pipeline and its compiled form.
+
+Run with ``python benchmarks/bench_compiled_tree.py --max-rows 10000000``.
+Batches of 1, 10, ... up to ``--max-rows`` synthetic iris rows are
+predicted by the saved pipeline and by ``compile_tree`` of it, and every
+prediction is checked to be identical. Small batches are repeated so each
+timing covers at least ``--min-seconds``; latency is the median call.
+``--depth`` fits a deeper tree on synthetic rows instead of loading one.
+"""
+import click
+import statistics
+import sys, os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from benchmarks.bench_processed_formats import synthetic_iris
+from src.compiled_tree import compile_tree
+from src.save_model import load_model
+
+
+def time_calls(predict, X, min_seconds: float) -> float:
+    """Median seconds per call of ``predict(X)``, calling it for at least ``min_seconds``."""
+    times = []
+    start = time.perf_counter()
+    while not times or time.perf_counter() - start < min_seconds:
+        call_start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - call_start)
+    return statistics.median(times)
+
+
+@click.command()
+@click.option("--model", "model_path", type=str, default="./results/models/decision_tree.pickle", show_default=True,
+              help="Saved decision tree pipeline")
+@click.option("--depth", type=int, default=None, help="Fit a tree of this depth on synthetic rows instead")
+@click.option("--max-rows", type=int, default=10_000_000, show_default=True, help="Largest batch size")
+@click.option("--min-seconds", type=float, default=0.5, show_default=True, help="Minimum time spent on each timing")
+def main(model_path, depth, max_rows, min_seconds):
+    if depth is None:
+        model = load_model(model_path)
+    else:
+        train_df = synthetic_iris(100_000, seed=7)
+        model = make_pipeline(StandardScaler(), DecisionTreeClassifier(max_depth=depth, random_state=123))
+        model.fit(train_df.drop(columns="species"), train_df["species"])
+    compiled = compile_tree(model)
+    queries = synthetic_iris(max_rows, seed=1).drop(columns="species")
+    print(f"tree of depth {compiled.max_depth} with {len(compiled.feature)} nodes")
+    print(f"{'rows':>10} {'pipeline':>12} {'compiled':>12} {'speedup':>8} {'pipeline rows/s':>16} {'compiled rows/s':>16}")
+
+    n_rows = 1
+    while n_rows <= max_rows:
+        X = queries.iloc[:n_rows]
+        if not (compiled.predict(X) == model.predict(X)).all():
+            raise AssertionError(f"Compiled predictions differ from the pipeline's on {n_rows} rows")
+        pipeline_seconds = time_calls(model.predict, X, min_seconds)
+        compiled_seconds = time_calls(compiled.predict, X, min_seconds)
+        print(
+            f"{n_rows:>10} {pipeline_seconds * 1e3:>10.3f}ms {compiled_seconds * 1e3:>10.3f}ms "
+            f"{pipeline_seconds / compiled_seconds:>7.1f}x "
+            f"{n_rows / pipeline_seconds:>16,.0f} {n_rows / compiled_seconds:>16,.0f}"
+        )
+        n_rows *= 10
+
+
+if __name__ == "__main__":
+    main()
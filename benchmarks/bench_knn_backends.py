@@ -0,0 +1,71 @@
+"""Compares the query throughput and recall of the KNN neighbor backends.
+
+Run with ``python benchmarks/bench_knn_backends.py --sizes 1000,10000,100000,1000000``.
+Each backend indexes standardized synthetic iris rows and finds the
+``--k`` nearest neighbors of ``--queries`` fresh rows. Recall counts the
+returned neighbors no farther than the exact k-th neighbor, since the
+0.1-grid synthetic rows have many exact ties. ``sklearn`` is
+``NearestNeighbors`` with its default algorithm, as used by
+``KNeighborsClassifier()``. ``--extra-features`` appends random columns
+to show where GEMM beats the trees.
+"""
+import click
+import sys, os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+from benchmarks.bench_processed_formats import synthetic_iris
+from src.knn_backends import BACKENDS, make_index, select_backend
+
+
+def recall(dist, exact_dist) -> float:
+    """Share of returned neighbors within the exact k-th nearest distance."""
+    return float(np.mean(dist <= exact_dist[:, -1:] * (1 + 1e-9)))
+
+
+def with_extra_features(df, n_features: int, seed: int):
+    """Appends ``n_features`` uniform random columns, for the high-dimensional regime."""
+    extra = np.random.default_rng(seed).uniform(0.1, 8.0, size=(len(df), n_features))
+    return np.hstack([df.to_numpy(), extra])
+
+
+@click.command()
+@click.option("--sizes", type=str, default="1000,10000,100000,1000000", show_default=True,
+              help="Comma-separated numbers of training rows")
+@click.option("--queries", "n_queries", type=int, default=2000, show_default=True, help="Number of query rows")
+@click.option("--k", type=int, default=5, show_default=True, help="Number of neighbors")
+@click.option("--recall-target", type=float, default=0.95, show_default=True, help="Recall target of the ivf index")
+@click.option("--extra-features", type=int, default=0, show_default=True,
+              help="Number of random features appended to the four iris ones")
+@click.option("--backends", type=str, default=",".join(["sklearn", *BACKENDS]), show_default=True,
+              help="Comma-separated backends to run")
+def main(sizes, n_queries, k, recall_target, extra_features, backends):
+    queries_df = with_extra_features(synthetic_iris(n_queries, seed=1).drop(columns="species"), extra_features, seed=1)
+    for n_rows in [int(size) for size in sizes.split(",")]:
+        train_df = with_extra_features(synthetic_iris(n_rows, seed=7).drop(columns="species"), extra_features, seed=7)
+        scaler = StandardScaler().fit(train_df)
+        X, queries = scaler.transform(train_df), scaler.transform(queries_df)
+        exact_dist, _ = NearestNeighbors(n_neighbors=k, algorithm="brute").fit(X).kneighbors(queries)
+        print(f"{n_rows} training rows, {n_queries} queries, k={k}; auto picks {select_backend(*X.shape)}")
+
+        for name in backends.split(","):
+            if name == "sklearn":
+                index = NearestNeighbors(n_neighbors=k)
+            else:
+                index = make_index(name, *X.shape, k, recall_target=recall_target)
+            start = time.perf_counter()
+            index.fit(X)
+            fit_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            dist, _ = index.kneighbors(queries, k)
+            query_seconds = time.perf_counter() - start
+            print(
+                f"  {name:>10}: fit {fit_seconds:7.3f} s, {n_queries / query_seconds:>11,.0f} queries/s, "
+                f"recall {recall(dist, exact_dist):.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compares the load time and memory of the pickle and memory-mapped model formats.
+
+Run with ``python benchmarks/bench_model_formats.py --rows 2000000 --processes 4``.
+A KNN pipeline fitted on synthetic iris rows, whose training set is the
+model, is saved in both formats. Several fresh interpreters then load each
+file at the same time and predict a few rows. Private memory (RssAnon) is
+what every process holds on its own; pages of a mapped file (RssFile) are
+shared between the processes through the page cache.
+"""
+import click
+import json
+import subprocess
+import sys, os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from src.save_model import load_model, save_model
+
+
+def memory_mib() -> dict:
+    """Private and file-backed resident memory of this process, from /proc."""
+    usage = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                usage[line.split(":")[0]] = int(line.split()[1]) / 1024
+    return usage
+
+
+def load(path):
+    """Loads ``path``, predicts a few rows and reports the time and memory it took."""
+    from benchmarks.bench_processed_formats import synthetic_iris
+
+    queries = synthetic_iris(100, seed=1).drop(columns="species")
+    before = memory_mib()
+    start = time.perf_counter()
+    model = load_model(path, verify=False)
+    loaded = time.perf_counter() - start
+    model.predict(queries)
+    after = memory_mib()
+    return {
+        "load_seconds": loaded,
+        "private_mib": after["RssAnon"] - before["RssAnon"],
+        "shared_mib": after["RssFile"] - before["RssFile"],
+    }
+
+
+@click.command()
+@click.option("--rows", type=int, default=2_000_000, show_default=True, help="Number of synthetic training rows")
+@click.option("--processes", type=int, default=4, show_default=True, help="Number of processes loading each model")
+@click.option("--load-path", type=str, default=None, hidden=True)
+def main(rows, processes, load_path):
+    if load_path is not None:
+        print(json.dumps(load(load_path)))
+        return
+
+    from benchmarks.bench_processed_formats import synthetic_iris
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        df = synthetic_iris(rows)
+        model = make_pipeline(StandardScaler(), KNeighborsClassifier()).fit(df.drop(columns="species"), df["species"])
+        paths = {"pickle": os.path.join(tmp_dir, "knn.pickle"), "mmap": os.path.join(tmp_dir, "knn.mmodel")}
+        save_model(model, paths["pickle"])
+        save_model(model, paths["mmap"], format="mmap")
+        del df, model
+
+        print(f"{rows} training rows, {processes} processes loading each model")
+        for name, path in paths.items():
+            loaders = [
+                subprocess.Popen([sys.executable, __file__, "--load-path", path], stdout=subprocess.PIPE, text=True)
+                for _ in range(processes)
+            ]
+            results = [json.loads(loader.communicate()[0]) for loader in loaders]
+            mean = {key: sum(result[key] for result in results) / processes for key in results[0]}
+            print(
+                f"{name:>6}: {os.path.getsize(path) / 2**20:7.1f} MiB on disk, "
+                f"{mean['load_seconds']:6.3f} s to load, "
+                f"+{mean['private_mib']:7.1f} MiB private and +{mean['shared_mib']:7.1f} MiB shared RSS per process"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compares the load time and peak RSS of the CSV and columnar processed data formats.
+
+Run with ``python benchmarks/bench_processed_formats.py --rows 5000000``.
+Each load runs in a fresh interpreter so the peak RSS of one format does
+not include the other.
+"""
+import click
+import json
+import numpy as np
+import pandas as pd
+import resource
+import subprocess
+import sys, os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.columnar import write_columnar
+from src.load_data import read_iris
+
+
+def synthetic_iris(n_rows: int, seed: int = 123) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        np.round(rng.uniform(0.1, 8.0, size=(n_rows, 4)), 1),
+        columns=["sepal_length", "sepal_width", "petal_length", "petal_width"],
+    )
+    df["species"] = rng.choice(["setosa", "versicolor", "virginica"], n_rows)
+    return df
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss survives exec, so it would include the parent that wrote the
+    # files; the high-water mark in /proc starts afresh with the new image
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load(path):
+    """Loads ``path`` like the downstream stages and touches every value."""
+    baseline = peak_rss_mib()
+    start = time.perf_counter()
+    df = read_iris(path)
+    X, y = df.drop(columns="species"), df["species"]
+    X.to_numpy().sum(), y.value_counts()
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mib()
+    return {"seconds": elapsed, "peak_rss_mib": peak, "load_rss_mib": peak - baseline}
+
+
+@click.command()
+@click.option("--rows", type=int, default=2_000_000, show_default=True, help="Number of synthetic rows")
+@click.option("--load-path", type=str, default=None, hidden=True)
+def main(rows, load_path):
+    if load_path is not None:
+        print(json.dumps(load(load_path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        df = synthetic_iris(rows)
+        paths = {"csv": os.path.join(tmp_dir, "iris.csv"), "columnar": os.path.join(tmp_dir, "iris.cols")}
+        df.to_csv(paths["csv"], index=False)
+        write_columnar(df, paths["columnar"])
+        del df
+
+        print(f"{rows} rows")
+        for name, path in paths.items():
+            result = json.loads(subprocess.run(
+                [sys.executable, __file__, "--load-path", path], check=True, capture_output=True, text=True
+            ).stdout)
+            print(
+                f"{name:>9}: {os.path.getsize(path) / 2**20:8.1f} MiB on disk, "
+                f"{result['seconds']:6.2f} s to load, "
+                f"+{result['load_rss_mib']:7.1f} MiB RSS (peak {result['peak_rss_mib']:.1f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
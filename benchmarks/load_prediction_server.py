@@ -0,0 +1,127 @@
+"""Load generator for the prediction server.
+
+Run with ``python benchmarks/load_prediction_server.py --spawn --max-wait-ms 0 --max-wait-ms 2``
+to start a local server for each batching setting, or without ``--spawn``
+against a server already running on ``--port``. ``--concurrency`` clients
+each keep one connection open and send requests of ``--rows`` synthetic
+iris rows back to back for ``--duration`` seconds. Client-side latency
+percentiles and throughput are printed with the server's own ``/stats``
+for the model, which include the mean batch size.
+"""
+import asyncio
+import click
+import subprocess
+import sys, os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import numpy as np
+from benchmarks.bench_processed_formats import synthetic_iris
+from src.prediction_server import request_json
+
+
+async def connect(host, port, unix_socket):
+    if unix_socket:
+        return await asyncio.open_unix_connection(unix_socket)
+    return await asyncio.open_connection(host, port)
+
+
+async def wait_until_up(host, port, unix_socket, server=None, timeout: float = 60):
+    """Polls ``/health`` until the server answers, failing if the spawned ``server`` exits."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await connect(host, port, unix_socket)
+            await request_json(reader, writer, "GET", "/health")
+            writer.close()
+            return
+        except OSError:
+            if server is not None and server.poll() is not None:
+                raise RuntimeError(f"The spawned server exited with code {server.returncode}")
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def client(host, port, unix_socket, path, payloads, stop_at, latencies):
+    """Sends requests on one connection until ``stop_at``, recording their latency."""
+    reader, writer = await connect(host, port, unix_socket)
+    i = 0
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        status, answer = await request_json(reader, writer, "POST", path, payloads[i % len(payloads)])
+        if status != 200:
+            raise RuntimeError(f"Server answered {status}: {answer}")
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    writer.close()
+
+
+async def run_load(host, port, unix_socket, model, concurrency, duration, rows, server=None):
+    """Runs the clients and returns the client-side results and the server's stats of the model."""
+    df = synthetic_iris(1000 * rows, seed=3).drop(columns="species")
+    payloads = [{"rows": df.iloc[i:i + rows].to_numpy().tolist()} for i in range(0, len(df), rows)]
+    await wait_until_up(host, port, unix_socket, server)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(host, port, unix_socket, f"/predict/{model}", payloads, start + duration, latencies)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    reader, writer = await connect(host, port, unix_socket)
+    _, stats = await request_json(reader, writer, "GET", "/stats")
+    writer.close()
+    p50, p99 = np.percentile(np.array(latencies) * 1e3, [50, 99])
+    return {"requests_per_s": len(latencies) / elapsed, "p50_ms": p50, "p99_ms": p99}, stats[model]
+
+
+@click.command()
+@click.option("--host", type=str, default="127.0.0.1", show_default=True, help="Server address")
+@click.option("--port", type=int, default=8000, show_default=True, help="Server TCP port")
+@click.option("--unix-socket", type=str, default=None, help="Server Unix socket, instead of a TCP port")
+@click.option("--model", type=str, default="knn", show_default=True, help="Model to request predictions from")
+@click.option("--concurrency", type=int, default=32, show_default=True, help="Number of concurrent clients")
+@click.option("--duration", type=float, default=10.0, show_default=True, help="Seconds of load per run")
+@click.option("--rows", type=int, default=1, show_default=True, help="Rows per request")
+@click.option("--spawn", is_flag=True, help="Start a local server for each --max-wait-ms")
+@click.option("--max-wait-ms", type=float, multiple=True, default=[2.0], show_default=True,
+              help="Batching wait of the spawned server; repeat to compare several")
+@click.option("--max-batch-rows", type=int, default=256, show_default=True, help="Batch size of the spawned server")
+@click.option("--compiled-tree", is_flag=True, help="Spawned server serves decision_tree from its compiled form")
+@click.option("--models-dir", type=str, default="./results/models", show_default=True,
+              help="Directory of the saved models of the spawned server")
+def main(host, port, unix_socket, model, concurrency, duration, rows, spawn, max_wait_ms, max_batch_rows,
+         compiled_tree, models_dir):
+    print(f"{concurrency} clients sending {rows} row(s) per request to {model} for {duration} s")
+    for wait_ms in max_wait_ms if spawn else [None]:
+        server = None
+        if spawn:
+            command = [
+                sys.executable, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src", "prediction_server.py"),
+                "--models-dir", models_dir, "--host", host, "--port", str(port), "--model", model,
+                "--max-wait-ms", str(wait_ms), "--max-batch-rows", str(max_batch_rows),
+            ]
+            if unix_socket:
+                command += ["--unix-socket", unix_socket]
+            if compiled_tree:
+                command.append("--compiled-tree")
+            server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        try:
+            results, stats = asyncio.run(run_load(host, port, unix_socket, model, concurrency, duration, rows, server))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+                if unix_socket and os.path.exists(unix_socket):
+                    os.remove(unix_socket)
+        label = f"max wait {wait_ms} ms" if spawn else "server"
+        print(
+            f"{label:>16}: {results['requests_per_s']:9,.0f} requests/s, "
+            f"client p50 {results['p50_ms']:6.2f} ms, p99 {results['p99_ms']:6.2f} ms; "
+            f"server p50 {stats['latency_p50_ms']:6.2f} ms, p99 {stats['latency_p99_ms']:6.2f} ms, "
+            f"{stats['mean_batch_rows']:6.1f} rows per batch"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# src/column_stats.py
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.quantile_sketch import KLLSketch
+
+SPECIES_LEVELS = ["setosa", "versicolor", "virginica"]
+
+
+def quantile_from_counts(values, counts, q):
+    """
+    Computes an exact quantile from a table of distinct values and their counts.
+
+    Uses the same linear interpolation as ``pandas.Series.quantile``, so the
+    result matches the quantile of the fully expanded column.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Sorted distinct values of the column.
+    counts : numpy.ndarray
+        Number of occurrences of each value.
+    q : float
+        Quantile to compute, between 0 and 1.
+
+    Returns
+    -------
+    float
+        The interpolated quantile, or NaN if the table is empty.
+
+    Examples
+    --------
+    >>> quantile_from_counts(np.array([1.0, 2.0]), np.array([3, 1]), 0.75)
+    1.25
+    """
+    if len(values) == 0:
+        return np.nan
+    cum = np.cumsum(counts)
+    h = (cum[-1] - 1) * q
+    lo = int(np.floor(h))
+    hi = min(lo + 1, int(cum[-1]) - 1)
+    v_lo = values[np.searchsorted(cum, lo, side="right")]
+    v_hi = values[np.searchsorted(cum, hi, side="right")]
+    return float(v_lo + (h - lo) * (v_hi - v_lo))
+
+
+def _sorted_value_counts(ordered):
+    """Distinct values and their counts of an already sorted 1D array."""
+    if len(ordered) == 0:
+        return np.empty(0), np.empty(0, dtype="int64")
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    counts = np.diff(np.r_[starts, len(ordered)])
+    return ordered[starts], counts
+
+
+def _merge_value_counts(left, right):
+    """Combines two (values, counts) tables into one sorted table."""
+    values, inverse = np.unique(np.concatenate([left[0], right[0]]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([left[1], right[1]]), minlength=len(values))
+    return values, counts.astype("int64")
+
+
+def count_empty_rows(df: pd.DataFrame) -> int:
+    """Number of rows in which every cell is the empty string."""
+    mask = np.ones(len(df), dtype=bool)
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            # A numeric column can never hold an empty string
+            return 0
+        mask &= (df[col] == "").to_numpy()
+    return int(mask.sum())
+
+
+def _block_stats(values: np.ndarray, columns, sketch_k: int = None):
+    """
+    Moments, extremes, quantile summaries and feature NaN counts of a
+    (features + species code) x rows block. Frame-level counts (rows, empty
+    rows, classes) are left to the caller.
+    """
+    stats = ColumnStats(columns, sketch_k=sketch_k)
+    k = len(stats.columns)
+    missing = np.isnan(values)
+    missing_per_col = missing.sum(axis=1)
+    stats.nan_counts = pd.Series(missing_per_col, index=stats.nan_counts.index, dtype="int64")
+
+    complete = values if not missing_per_col.any() else values[:, ~missing.any(axis=0)]
+    stats.n = complete.shape[1]
+    if stats.n:
+        stats.mean = complete.mean(axis=1)
+        centered = complete - stats.mean[:, None]
+        stats.comoment = centered @ centered.T
+
+    if sketch_k is not None:
+        for j, sketch in enumerate(stats.sketches):
+            sketch.update(values[j])
+        stats.min = np.fmin.reduce(values[:k], axis=1, initial=np.inf)
+        stats.max = np.fmax.reduce(values[:k], axis=1, initial=-np.inf)
+    else:
+        # NaN sorts to the end of each column, so the valid values are a prefix
+        ordered = np.sort(values[:k], axis=1)
+        valid = values.shape[1] - missing_per_col[:k]
+        stats.value_counts = [_sorted_value_counts(ordered[j, : valid[j]]) for j in range(k)]
+        stats.min = np.array([v[0] if len(v) else np.inf for v, _ in stats.value_counts])
+        stats.max = np.array([v[-1] if len(v) else -np.inf for v, _ in stats.value_counts])
+    return stats
+
+
+def _shared_block_stats(name: str, shape: tuple, start: int, stop: int, columns, sketch_k: int = None):
+    """Worker side of ``ColumnStats.from_frame``: statistics of one row partition of a shared block."""
+    # Workers share the parent's resource tracker, which unlinks the segment
+    # only if the parent dies without doing it
+    shm = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    try:
+        return _block_stats(values[:, start:stop], columns, sketch_k)
+    finally:
+        del values
+        shm.close()
+
+
+class ColumnStats:
+    """
+    Mergeable summary statistics of a validated iris DataFrame.
+
+    Statistics from different chunks of the same dataset can be combined with
+    ``merge`` and give the same means, standard deviations, correlations and
+    quantiles as computing them on the concatenated frame. This lets the
+    dataset-level validation checks run on files that do not fit in memory.
+
+    Moments are accumulated with Chan's parallel update of the co-moment
+    matrix, which stays numerically stable across many small chunks. The
+    ``species`` column is encoded with its position in ``SPECIES_LEVELS`` and
+    carried as an extra moment column so that target-feature correlations
+    come out of the same matrix.
+
+    Quantiles are exact by default, from merged tables of distinct values,
+    which stay small for measurement data recorded at a fixed precision.
+    When ``sketch_k`` is given, each column is summarised by a ``KLLSketch``
+    instead, which bounds memory regardless of the number of distinct values
+    at the cost of a small, configurable rank error.
+
+    Parameters
+    ----------
+    columns : list of str
+        Names of the numeric feature columns.
+    sketch_k : int, optional
+        Size of the KLL quantile sketches. Defaults to None (exact quantiles).
+
+    Examples
+    --------
+    >>> stats = ColumnStats.from_frame(chunk_1)
+    >>> stats.merge(ColumnStats.from_frame(chunk_2))
+    >>> stats.std()
+    """
+
+    def __init__(self, columns, sketch_k: int = None):
+        self.columns = list(columns)
+        self.sketch_k = sketch_k
+        k = len(self.columns) + 1  # features + species code
+        self.n_rows = 0
+        self.empty_rows = 0
+        self.nan_counts = pd.Series(0, index=[*self.columns, "species"], dtype="int64")
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(len(self.columns), np.inf)
+        self.max = np.full(len(self.columns), -np.inf)
+        self.value_counts = [(np.empty(0), np.empty(0, dtype="int64")) for _ in self.columns]
+        self.sketches = None if sketch_k is None else [KLLSketch(sketch_k) for _ in self.columns]
+        self.class_counts = pd.Series(dtype="int64")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sketch_k: int = None, n_jobs: int = 1, partition_rows: int = 2**20):
+        """
+        Computes the statistics of a single DataFrame in one vectorized pass.
+
+        The feature columns are copied once into a 2D float block; NaN
+        counts, the empty-row count, moments, the co-moment matrix, extremes
+        and the sorted value-count tables used for quantiles are all derived
+        from that block instead of rescanning the frame once per check.
+
+        With ``n_jobs > 1`` the block is placed in shared memory and split
+        into row partitions of about ``partition_rows`` rows, whose
+        statistics are computed by a pool of worker processes and merged.
+        Workers map the block instead of receiving pickled copies of it.
+        """
+        columns = [
+            col
+            for col, dtype in df.dtypes.items()
+            if col != "species"
+            and pd.api.types.is_numeric_dtype(dtype)
+            and not pd.api.types.is_bool_dtype(dtype)
+        ]
+
+        # Factorize species once; class counts, missing species and the
+        # SPECIES_LEVELS code used for correlations all come from it
+        species = pd.Categorical(df["species"])
+        present = species.codes >= 0
+        counts = np.bincount(species.codes[present], minlength=len(species.categories))
+        level_of = pd.Index(SPECIES_LEVELS).get_indexer(species.categories).astype(float)
+        level_of[level_of < 0] = np.nan
+
+        # One (columns x rows) block: each row of the block is contiguous, so
+        # the per-column reductions, sorts and the co-moment GEMM stream memory
+        k = len(columns)
+        shape = (k + 1, len(df))
+        partitions = -(-len(df) // partition_rows)
+        shm = None
+        if n_jobs > 1 and partitions > 1:
+            shm = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+            values = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        else:
+            values = np.empty(shape)
+        try:
+            for j, col in enumerate(columns):
+                values[j] = df[col].to_numpy(dtype=float)
+            values[k] = np.nan
+            values[k, present] = level_of[species.codes[present]]
+
+            if shm is None:
+                stats = _block_stats(values, columns, sketch_k)
+            else:
+                bounds = np.linspace(0, len(df), partitions + 1).astype(int)
+                with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                    parts = list(pool.map(
+                        _shared_block_stats,
+                        *zip(*[
+                            (shm.name, shape, start, stop, columns, sketch_k)
+                            for start, stop in zip(bounds[:-1], bounds[1:])
+                        ]),
+                    ))
+                stats = parts[0]
+                for part in parts[1:]:
+                    stats.merge(part)
+        finally:
+            if shm is not None:
+                del values
+                shm.close()
+                shm.unlink()
+
+        stats.n_rows = len(df)
+        stats.nan_counts = pd.Series(
+            [
+                stats.nan_counts[col] if col in columns
+                else (~present).sum() if col == "species"
+                else df[col].isna().sum()
+                for col in df.columns
+            ],
+            index=df.columns,
+            dtype="int64",
+        )
+        stats.empty_rows = count_empty_rows(df)
+        # A categorical species column may declare levels no row uses
+        stats.class_counts = (
+            pd.Series(counts, index=pd.Index(species.categories, name="species"), name="count")[counts > 0]
+            .sort_values(ascending=False, kind="stable")
+        )
+        return stats
+
+    def merge(self, other):
+        """Folds the statistics of another chunk into this one, in place."""
+        if other.columns != self.columns:
+            raise ValueError(
+                f"Cannot merge statistics over different columns: {self.columns} vs {other.columns}"
+            )
+        if other.sketch_k != self.sketch_k:
+            raise ValueError(
+                f"Cannot merge statistics with different quantile sketches: {self.sketch_k} vs {other.sketch_k}"
+            )
+
+        n = self.n + other.n
+        if other.n:
+            delta = other.mean - self.mean
+            self.comoment = (
+                self.comoment
+                + other.comoment
+                + np.outer(delta, delta) * self.n * other.n / n
+            )
+            self.mean = self.mean + delta * other.n / n
+        self.n = n
+
+        self.n_rows += other.n_rows
+        self.empty_rows += other.empty_rows
+        self.nan_counts = self.nan_counts.add(other.nan_counts, fill_value=0).astype("int64")
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        if self.sketches is not None:
+            for mine, theirs in zip(self.sketches, other.sketches):
+                mine.merge(theirs)
+        else:
+            self.value_counts = [
+                _merge_value_counts(mine, theirs)
+                for mine, theirs in zip(self.value_counts, other.value_counts)
+            ]
+        self.class_counts = self.class_counts.add(other.class_counts, fill_value=0).astype("int64")
+        return self
+
+    def std(self) -> pd.Series:
+        """Sample standard deviation (ddof=1) of each feature column."""
+        if self.n < 2:
+            return pd.Series(np.nan, index=self.columns)
+        variance = np.diag(self.comoment)[:-1] / (self.n - 1)
+        return pd.Series(np.sqrt(variance), index=self.columns)
+
+    def quantile(self, q: float) -> pd.Series:
+        """``q``-quantile of each feature column, exact unless sketches are used."""
+        if self.sketches is not None:
+            return pd.Series([sketch.quantile(q) for sketch in self.sketches], index=self.columns)
+        return pd.Series(
+            [quantile_from_counts(values, counts, q) for values, counts in self.value_counts],
+            index=self.columns,
+        )
+
+    def corr(self) -> pd.DataFrame:
+        """Pearson correlation matrix of the features and the species code."""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self.comoment / np.outer(scale, scale)
+        labels = [*self.columns, "species"]
+        return pd.DataFrame(corr, index=labels, columns=labels)
+
+    def zscore_outliers(self, threshold: float = 3.0) -> list:
+        """
+        Feature columns holding at least one value with ``|z| > threshold``.
+
+        Like the per-value check, a z-score that is not a number, from a
+        constant column or a single row, counts as an outlier in any column
+        holding a value.
+        """
+        mean = pd.Series(self.mean[:-1], index=self.columns)
+        spread = np.maximum(self.max - mean, mean - self.min)
+        z = spread / self.std()
+        flagged = ~(z <= threshold) & (self.max >= self.min)
+        return list(z.index[flagged])
+
+    def iqr_outliers(self, factor: float = 1.5) -> list:
+        """Feature columns holding at least one value outside the IQR fences."""
+        q1 = self.quantile(0.25)
+        q3 = self.quantile(0.75)
+        iqr = q3 - q1
+        flagged = (self.min < q1 - factor * iqr) | (self.max > q3 + factor * iqr)
+        return list(flagged.index[flagged])
+
+    def missing_fraction(self) -> pd.Series:
+        """Fraction of missing values in each column."""
+        if self.n_rows == 0:
+            return self.nan_counts.astype(float)
+        return self.nan_counts / self.n_rows
+
+    def target_proportions(self) -> pd.Series:
+        """Proportion of rows belonging to each species."""
+        proportions = (self.class_counts / self.class_counts.sum()).sort_values(ascending=False)
+        proportions.index.name = "species"
+        return proportions.rename("proportion")
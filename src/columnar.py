@@ -0,0 +1,179 @@
+# src/columnar.py
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+
+MAGIC = b"IRISCOL1"
+ALIGNMENT = 64
+COLUMNAR_SUFFIX = ".cols"
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _code_dtype(n_categories: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def write_columnar(df: pd.DataFrame, path):
+    """
+    Writes a DataFrame to a single-file columnar format that can be memory-mapped.
+
+    Numeric columns are stored as float32 and every other column as a
+    categorical: integer codes plus the list of categories. The file starts
+    with a JSON header describing the columns, followed by one contiguous,
+    64-byte aligned buffer per column, so ``read_columnar`` can map the
+    columns directly instead of parsing them. The file is written to a
+    temporary name and renamed, so readers never see a partial file.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The frame to write. The index is not stored.
+    path : str or path-like
+        Destination file, conventionally with the ``.cols`` suffix.
+
+    Examples
+    --------
+    >>> write_columnar(train_df, "./data/processed/iris_train.cols")
+    """
+    write_columnar_chunks(lambda: [df], path)
+
+
+def write_columnar_chunks(make_chunks, path):
+    """
+    Writes a stream of DataFrame chunks to a columnar file without holding them all in memory.
+
+    The stream is read twice: once for the row count and the categories of
+    each column, which the header needs, and once to write each chunk's
+    values at their place in the column buffers. The file is the same as
+    ``write_columnar`` writes for the concatenated chunks.
+
+    Parameters
+    ----------
+    make_chunks : callable
+        Returns a new iterable of frames with the same columns on each call,
+        e.g. ``lambda: read_iris("iris_train.csv", chunksize=100_000)``.
+    path : str or path-like
+        Destination file, conventionally with the ``.cols`` suffix.
+
+    Examples
+    --------
+    >>> write_columnar_chunks(lambda: read_iris(csv_path, chunksize=100_000), "iris_train.cols")
+    """
+    columns, n_rows = None, 0
+    for chunk in make_chunks():
+        if columns is None:
+            columns = [
+                {"name": name, "dtype": "float32"}
+                if pd.api.types.is_numeric_dtype(chunk[name].dtype) and not pd.api.types.is_bool_dtype(chunk[name].dtype)
+                else {"name": name, "categories": pd.Index([])}
+                for name in chunk.columns
+            ]
+        for column in columns:
+            if "categories" in column:
+                column["categories"] = column["categories"].union(pd.Categorical(chunk[column["name"]]).categories)
+        n_rows += len(chunk)
+    if columns is None:
+        raise ValueError("Cannot write a columnar file without any chunk")
+    for column in columns:
+        if "categories" in column:
+            column["categories"] = column["categories"].tolist()
+            column["dtype"] = _code_dtype(len(column["categories"])).name
+
+    # Offsets are relative to the end of the header, whose length they do
+    # not depend on
+    offset = 0
+    for column in columns:
+        column["offset"] = offset
+        offset = _aligned(offset + n_rows * np.dtype(column["dtype"]).itemsize)
+    header = json.dumps({"n_rows": n_rows, "columns": columns}).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.fspath(path)) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            row = 0
+            for chunk in make_chunks():
+                for column in columns:
+                    dtype = np.dtype(column["dtype"])
+                    series = chunk[column["name"]]
+                    if "categories" in column:
+                        buffer = pd.Categorical(series, categories=column["categories"]).codes.astype(dtype)
+                    else:
+                        buffer = series.to_numpy(dtype=np.float32)
+                    f.seek(data_start + column["offset"] + row * dtype.itemsize)
+                    f.write(buffer.tobytes())
+                row += len(chunk)
+            f.truncate(data_start + offset)
+        replace_file(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_columnar(path, columns=None) -> pd.DataFrame:
+    """
+    Reads a file written by ``write_columnar`` without parsing or copying the data.
+
+    The file is memory-mapped copy-on-write and each column of the returned
+    frame is a view of its buffer in the mapping: pages are only read from
+    disk when a column is actually used, and several processes reading the
+    same file share them through the page cache. Writing to the frame
+    modifies private copies of the touched pages, never the file.
+
+    Parameters
+    ----------
+    path : str or path-like
+        The ``.cols`` file to read.
+    columns : list of str, optional
+        Subset of the columns to load. Defaults to all columns.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Frame with float32 numeric columns and categorical other columns.
+
+    Examples
+    --------
+    >>> train_df = read_columnar("./data/processed/iris_train.cols")
+    >>> train_df.dtypes
+    sepal_length     float32
+    ...
+    species         category
+    """
+    mapping = np.memmap(path, dtype=np.uint8, mode="c")
+    if bytes(mapping[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a columnar iris file")
+    header_length = int.from_bytes(bytes(mapping[len(MAGIC): len(MAGIC) + 8]), "little")
+    header_start = len(MAGIC) + 8
+    header = json.loads(bytes(mapping[header_start: header_start + header_length]))
+    data_start = _aligned(header_start + header_length)
+
+    n_rows = header["n_rows"]
+    selected = {column["name"]: column for column in header["columns"]}
+    data = {}
+    for name in columns if columns is not None else selected:
+        column = selected[name]
+        dtype = np.dtype(column["dtype"])
+        start = data_start + column["offset"]
+        values = mapping[start: start + n_rows * dtype.itemsize].view(dtype)
+        if "categories" in column:
+            values = pd.Categorical.from_codes(values, column["categories"])
+        data[name] = values
+    return pd.DataFrame(data, columns=list(data), copy=False)
+
@@ -0,0 +1,239 @@
+# src/compiled_tree.py
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+COMPILED_TREE_SUFFIX = ".npz"
+
+_SIGN = np.int64(-2**63)
+
+
+def _to_key(x: np.ndarray) -> np.ndarray:
+    """Maps float64 values to int64 keys in the same order, adjacent floats getting adjacent keys."""
+    bits = x.view(np.int64)
+    return np.where(bits < 0, -(bits & ~_SIGN), bits)
+
+
+def _from_key(key: np.ndarray) -> np.ndarray:
+    return np.where(key < 0, (-key) | _SIGN, key).view(np.float64)
+
+
+def fold_thresholds(threshold, mean, scale) -> np.ndarray:
+    """
+    Moves tree thresholds from the scaled space to the raw feature space, exactly.
+
+    The tree sends a row left when ``float32((x - mean) / scale) <= threshold``,
+    scaled like ``StandardScaler.transform`` in float64 and cast like the
+    tree's input. Every step is monotone in ``x``, so the test is
+    ``x <= x_max`` for the largest float64 ``x_max`` passing it, found by
+    bisecting the ordered float64 bit patterns. ``threshold * scale + mean``
+    would be off by rounding for rows next to a threshold.
+
+    Parameters
+    ----------
+    threshold, mean, scale : array-like
+        Threshold of each node, and the scaler's ``mean_`` and ``scale_`` of
+        the node's feature (0 and 1 without a scaler).
+
+    Returns
+    -------
+    numpy.ndarray
+        The largest raw float64 value going left at each node, possibly ``inf``.
+    """
+    threshold, mean, scale = (np.asarray(a, dtype=np.float64) for a in (threshold, mean, scale))
+
+    def goes_left(x):
+        with np.errstate(over="ignore", invalid="ignore"):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    lo = np.full(threshold.shape, _to_key(np.array(-np.inf)))
+    hi = np.full(threshold.shape, _to_key(np.array(np.inf)))
+    # Thresholds are finite, so -inf always goes left; inf may too
+    always_left = goes_left(_from_key(hi))
+    while True:
+        open_ = (hi - 1 > lo) & ~always_left
+        if not open_.any():
+            break
+        # hi - lo overflows int64 across the whole float range
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(_from_key(mid))
+        lo = np.where(open_ & left, mid, lo)
+        hi = np.where(open_ & ~left, mid, hi)
+    return np.where(always_left, np.inf, _from_key(lo))
+
+
+class CompiledTree:
+    """
+    Decision tree flattened into arrays, with the pipeline's scaler folded into its thresholds.
+
+    ``predict`` walks all rows down the tree together in NumPy, one level
+    per step, so it has no per-call pipeline overhead and a batch of ``n``
+    rows costs ``max_depth`` vectorized gathers. Predictions equal those
+    of the pipeline it was compiled from for float64 (or integer) input,
+    missing values included. Build it with ``compile_tree``.
+
+    Attributes
+    ----------
+    feature : numpy.ndarray
+        Feature tested at each node; 0 at leaves.
+    threshold : numpy.ndarray
+        Largest raw value going left at each node; ``inf`` at leaves.
+    children : numpy.ndarray
+        Left and right child of each node, flattened; leaves point to themselves.
+    missing_left : numpy.ndarray
+        Whether missing values go left at each node.
+    leaf_class : numpy.ndarray
+        Index into ``classes_`` predicted at each node.
+    classes_ : numpy.ndarray
+        Class labels.
+    feature_names_in_ : numpy.ndarray or None
+        Columns used when predicting on a DataFrame.
+    max_depth : int
+        Number of levels walked by ``predict``.
+    """
+
+    _ARRAYS = ["feature", "threshold", "children", "missing_left", "leaf_class", "classes_"]
+
+    def __init__(self, feature, threshold, children, missing_left, leaf_class, classes_, feature_names_in_=None,
+                 max_depth=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.leaf_class = np.asarray(leaf_class, dtype=np.intp)
+        self.classes_ = np.asarray(classes_)
+        self.feature_names_in_ = None if feature_names_in_ is None else np.asarray(feature_names_in_)
+        self.max_depth = int(max_depth)
+
+    def apply(self, X, chunk_rows: int = 2**16) -> np.ndarray:
+        """
+        Returns the leaf each row of ``X`` ends in.
+
+        Rows are walked in chunks of ``chunk_rows`` so the working arrays
+        stay in cache.
+        """
+        if isinstance(X, pd.DataFrame):
+            # Selecting columns costs more than predicting a small batch, so only reorder when needed
+            if self.feature_names_in_ is not None and not np.array_equal(X.columns, self.feature_names_in_):
+                X = X[self.feature_names_in_]
+            X = X.to_numpy(dtype=np.float64)
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2D array of rows, got shape {X.shape}")
+        n_rows, n_features = X.shape
+        leaves = np.empty(n_rows, dtype=np.intp)
+        for start in range(0, n_rows, chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            values = chunk.ravel()
+            row_offsets = np.arange(len(chunk), dtype=np.intp) * n_features
+            has_missing = np.isnan(values).any()
+            node = np.zeros(len(chunk), dtype=np.intp)
+            for _ in range(self.max_depth):
+                x = values[row_offsets + self.feature[node]]
+                go_right = x > self.threshold[node]
+                if has_missing:
+                    go_right |= np.isnan(x) & ~self.missing_left[node]
+                node = self.children[2 * node + go_right]
+            leaves[start:start + len(chunk)] = node
+        return leaves
+
+    def predict(self, X, chunk_rows: int = 2**16) -> np.ndarray:
+        """Predicts the class of each row of ``X``, like the compiled pipeline's ``predict``."""
+        return self.classes_[self.leaf_class[self.apply(X, chunk_rows)]]
+
+    def save(self, path):
+        """
+        Saves the arrays to an uncompressed ``.npz`` file, loadable without pickle.
+
+        Class labels keep their dtype; object labels, which would need
+        pickle, are stored as text and turned back into objects by ``load``.
+
+        Raises
+        ------
+        ValueError
+            If object class labels are not all strings.
+        """
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        if self.classes_.dtype == object:
+            if not all(isinstance(label, str) for label in self.classes_):
+                raise ValueError("Object class labels must be strings to be saved without pickle")
+            arrays["classes_"] = self.classes_.astype(str)
+        if self.feature_names_in_ is not None:
+            arrays["feature_names_in_"] = self.feature_names_in_.astype(str)
+        np.savez(path, max_depth=self.max_depth, classes_dtype=self.classes_.dtype.str, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a tree written by ``save``."""
+        with np.load(path, allow_pickle=False) as arrays:
+            arrays = {name: arrays[name] for name in arrays.files}
+        if "classes_dtype" in arrays:
+            arrays["classes_"] = arrays["classes_"].astype(str(arrays.pop("classes_dtype")))
+        return cls(**arrays)
+
+
+def compile_tree(model) -> CompiledTree:
+    """
+    Compiles a fitted decision tree, alone or after a ``StandardScaler`` in a pipeline.
+
+    Parameters
+    ----------
+    model : Pipeline or DecisionTreeClassifier
+        A fitted single-output classification tree, optionally preceded by
+        a ``StandardScaler`` and ``"passthrough"`` steps.
+
+    Returns
+    -------
+    CompiledTree
+
+    Raises
+    ------
+    ValueError
+        If the model has other steps or the tree has several outputs.
+
+    Examples
+    --------
+    >>> compiled = compile_tree(load_model("./results/models/decision_tree.pickle"))
+    >>> (compiled.predict(X_test) == model.predict(X_test)).all()
+    True
+    """
+    steps = [step for _, step in model.steps] if isinstance(model, Pipeline) else [model]
+    steps = [step for step in steps if step not in (None, "passthrough")]
+    scaler = None
+    if len(steps) == 2 and isinstance(steps[0], StandardScaler):
+        scaler = steps.pop(0)
+    if len(steps) != 1 or not isinstance(steps[0], DecisionTreeClassifier):
+        raise ValueError(f"Expected a DecisionTreeClassifier, optionally after a StandardScaler, got {model!r}")
+    tree = steps[0].tree_
+    if tree.n_outputs != 1:
+        raise ValueError("Only single-output trees can be compiled")
+
+    n_nodes = tree.node_count
+    is_leaf = tree.children_left == -1
+    feature = np.where(is_leaf, 0, tree.feature)
+    mean = np.zeros(n_nodes)
+    scale = np.ones(n_nodes)
+    if scaler is not None:
+        if scaler.mean_ is not None:
+            mean = scaler.mean_[feature]
+        if scaler.scale_ is not None:
+            scale = scaler.scale_[feature]
+    threshold = np.where(is_leaf, np.inf, fold_thresholds(np.where(is_leaf, 0.0, tree.threshold), mean, scale))
+    nodes = np.arange(n_nodes)
+    children = np.column_stack([
+        np.where(is_leaf, nodes, tree.children_left),
+        np.where(is_leaf, nodes, tree.children_right),
+    ]).ravel()
+
+    return CompiledTree(
+        feature=feature,
+        threshold=threshold,
+        children=children,
+        missing_left=tree.missing_go_to_left.astype(bool),
+        leaf_class=np.argmax(tree.value[:, 0, :], axis=1),
+        classes_=steps[0].classes_,
+        feature_names_in_=getattr(model, "feature_names_in_", None),
+        max_depth=tree.max_depth,
+    )
@@ -1,12 +1,66 @@
 # File: src/data_split.py
 
+import numpy as np
 import pandas as pd
+import tempfile
+import zlib
 from sklearn.model_selection import train_test_split
 from typing import Tuple
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.dedup import row_hashes
+from src.file_utils import replace_file
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: spreads every input bit over the whole 64-bit output."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def hash_test_mask(df: pd.DataFrame, test_size: float = 0.3, random_state: int = 123, key=None) -> np.ndarray:
+    """
+    Test membership of each row as a pure function of its key and the seed.
+
+    The key columns of a row are hashed, mixed with ``random_state`` and
+    compared with a threshold at ``test_size`` of the 64-bit range. The
+    assignment of a row therefore never depends on the other rows: rows
+    appended to the data later do not move existing rows between splits.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The rows to assign.
+    test_size : float, optional
+        Expected proportion of rows assigned to the test split.
+        Defaults to 0.3 (30%).
+    random_state : int, optional
+        Seed mixed into the row hashes. Defaults to 123; None is taken as
+        0, since the assignment has to be reproducible.
+    key : str or list of str, optional
+        Columns identifying a row. Defaults to None (all columns, which
+        identify rows uniquely once duplicates have been dropped).
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask, True for the rows in the test split.
+
+    Examples
+    --------
+    >>> hash_test_mask(pd.DataFrame({"id": [1, 2, 3]}), key="id")
+    array([False,  True, False])
+    """
+    columns = df.columns if key is None else [key] if isinstance(key, str) else list(key)
+    hashes = row_hashes(df[columns])
+    with np.errstate(over="ignore"):
+        mixed = _mix64(hashes ^ _mix64(np.array([(random_state or 0) % 2**64], dtype=np.uint64)))
+    return mixed < np.uint64(min(int(test_size * 2.0**64), 2**64 - 1))
 
 
 def split_data(
-    df: pd.DataFrame, test_size: float = 0.3, random_state: int = 123
+    df: pd.DataFrame, test_size: float = 0.3, random_state: int = 123, method: str = "shuffle", key=None
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Splits a DataFrame into training and testing sets.
@@ -15,6 +69,13 @@ def split_data(
     train_test_split, ensuring consistent parameters are used
     across different scripts or projects.
 
+    With ``method="hash"`` each row is assigned by ``hash_test_mask``
+    instead: the split of a row is a pure function of its key and
+    ``random_state``, so appending rows to the data keeps every existing
+    row in the same split and only routes the new ones. The test fraction
+    is then ``test_size`` in expectation rather than exactly, and rows keep
+    their input order.
+
     Parameters
     ----------
     df : pandas.DataFrame
@@ -25,6 +86,12 @@ def split_data(
     random_state : int, optional
         Controls the shuffling applied to the data before splitting.
         Defaults to 123 for reproducibility.
+    method : {"shuffle", "hash"}, optional
+        Shuffle with ``train_test_split``, or assign rows by hashing their
+        key. Defaults to "shuffle".
+    key : str or list of str, optional
+        Columns identifying a row for ``method="hash"``. Defaults to None
+        (all columns).
 
     Returns
     -------
@@ -41,8 +108,219 @@ def split_data(
     8
     """
 
+    if method == "hash":
+        is_test = hash_test_mask(df, test_size=test_size, random_state=random_state, key=key)
+        return df[~is_test], df[is_test]
+    if method != "shuffle":
+        raise ValueError(f"Unknown split method {method!r}, expected 'shuffle' or 'hash'")
+
     train_df, test_df = train_test_split(
         df, test_size=test_size, random_state=random_state
     )
 
     return train_df, test_df
+
+
+def _stratum_key(label) -> int:
+    """Stable integer key of a stratum label, independent of where it first appears."""
+    return zlib.crc32(str(label).encode())
+
+
+def _page_test_mask(seed: int, key: int, page: int, test_size: float, window: int, windows_per_page: int):
+    """
+    Test membership of the rows of one page of a stratum.
+
+    A page is ``windows_per_page`` consecutive windows of ``window`` rows.
+    Window ``j`` receives a test quota by systematic rounding of
+    ``test_size * window * j`` with a random phase, so the quotas of any run
+    of windows add up to the exact test fraction within one row. The quota
+    is placed on random positions of the window, drawn from a generator
+    seeded by the split seed, the stratum and the page only.
+    """
+    phase = np.random.default_rng([seed, key]).random()
+    j = page * windows_per_page + np.arange(windows_per_page)
+    quota = np.floor(test_size * window * (j + 1) + phase) - np.floor(test_size * window * j + phase)
+    ranks = np.random.default_rng([seed, key, page]).random((windows_per_page, window)).argsort(axis=1).argsort(axis=1)
+    return (ranks < quota[:, None]).ravel()
+
+
+def split_data_streaming(
+    chunks,
+    train_path,
+    test_path,
+    test_size: float = 0.3,
+    random_state: int = 123,
+    stratify: str = None,
+    window: int = 20,
+    windows_per_page: int = 1024,
+) -> Tuple[int, int]:
+    """
+    Splits a stream of DataFrame chunks into train and test CSV files in a single pass.
+
+    Each row is assigned on its own, from its position within its stratum
+    (the ``stratify`` column, or the whole data set), so the assignment
+    only depends on the row order and ``random_state``, not on the chunk
+    boundaries, and memory stays bounded by the chunk size whatever the size
+    of the input. Every complete window of ``window`` consecutive rows of a
+    stratum contributes its exact share of test rows at random positions,
+    so the test fraction of each stratum is within one window of
+    ``test_size``, as with a stratified ``train_test_split``.
+
+    The rows keep their input order within each output. Outputs are written
+    to temporary files and renamed once the input is exhausted.
+
+    Parameters
+    ----------
+    chunks : iterable of pandas.DataFrame
+        The validated data, e.g. ``pd.read_csv(path, chunksize=100_000)``.
+    train_path, test_path : str or path-like
+        Destination CSV files of the train and test rows.
+    test_size : float, optional
+        The proportion of the data to include in the test split.
+        Defaults to 0.3 (30%).
+    random_state : int, optional
+        Seed of the assignment. Defaults to 123 for reproducibility; None
+        draws a fresh seed.
+    stratify : str, optional
+        Column whose classes each get ``test_size`` of their rows in the
+        test split, e.g. ``"species"``. Defaults to None (no stratification).
+    window : int, optional
+        Number of consecutive rows of a stratum over which the test
+        fraction is exact. Defaults to 20.
+    windows_per_page : int, optional
+        Number of windows whose random positions are drawn at once.
+        Defaults to 1024.
+
+    Returns
+    -------
+    tuple of (int, int)
+        The number of (train, test) rows written.
+
+    Examples
+    --------
+    >>> chunks = pd.read_csv("./data/raw/iris.csv", chunksize=50)
+    >>> split_data_streaming(chunks, "iris_train.csv", "iris_test.csv", stratify="species")
+    (105, 45)
+    """
+    seed = random_state if random_state is not None else np.random.SeedSequence().entropy
+    page_rows = window * windows_per_page
+    # Rows seen so far and the current page mask of each stratum
+    strata = {}
+    counts = [0, 0]
+
+    outputs = [train_path, test_path]
+    tmp_paths = []
+    for path in outputs:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.fspath(path)) or ".", suffix=".tmp")
+        os.close(fd)
+        tmp_paths.append(tmp_path)
+    try:
+        header = True
+        for chunk in chunks:
+            labels = np.zeros(len(chunk)) if stratify is None else chunk[stratify]
+            codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+            is_test = np.empty(len(chunk), dtype=bool)
+            for code, label in enumerate(uniques):
+                rows = np.flatnonzero(codes == code)
+                key = _stratum_key(label)
+                seen, page, mask = strata.get(key, (0, -1, None))
+                k = seen + np.arange(len(rows))
+                for p in np.unique(k // page_rows):
+                    if p != page:
+                        page, mask = p, _page_test_mask(seed, key, p, test_size, window, windows_per_page)
+                    in_page = k // page_rows == p
+                    is_test[rows[in_page]] = mask[k[in_page] - p * page_rows]
+                strata[key] = (seen + len(rows), page, mask)
+
+            for tmp_path, part in zip(tmp_paths, [chunk[~is_test], chunk[is_test]]):
+                part.to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+            counts[0] += int((~is_test).sum())
+            counts[1] += int(is_test.sum())
+            header = False
+
+        for tmp_path, path in zip(tmp_paths, outputs):
+            replace_file(tmp_path, path)
+    finally:
+        for tmp_path in tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return tuple(counts)
+
+
+def hash_split_streaming(
+    chunks,
+    train_path,
+    test_path,
+    test_size: float = 0.3,
+    random_state: int = 123,
+    key=None,
+    append: bool = False,
+) -> Tuple[int, int]:
+    """
+    Splits a stream of DataFrame chunks into train and test CSV files by ``hash_test_mask``.
+
+    Each row goes to the same split as with ``split_data(method="hash")``,
+    whatever the chunk boundaries, and memory stays bounded by the chunk
+    size. Outputs are written to temporary files and renamed once the input
+    is exhausted, unless ``append`` is set.
+
+    Parameters
+    ----------
+    chunks : iterable of pandas.DataFrame
+        The validated data, e.g. ``read_iris(path, chunksize=100_000)``.
+    train_path, test_path : str or path-like
+        Destination CSV files of the train and test rows.
+    test_size : float, optional
+        Expected proportion of rows assigned to the test split.
+        Defaults to 0.3 (30%).
+    random_state : int, optional
+        Seed mixed into the row hashes. Defaults to 123.
+    key : str or list of str, optional
+        Columns identifying a row. Defaults to None (all columns).
+    append : bool, optional
+        Append the rows to the existing files in place, e.g. the rows added
+        to the data since they were written, instead of replacing them. A
+        header is only written to a missing or empty file. Since the split
+        of a row does not depend on the other rows, the files are then the
+        same as a split of all the rows at once. Defaults to False.
+
+    Returns
+    -------
+    tuple of (int, int)
+        The number of (train, test) rows written.
+
+    Examples
+    --------
+    >>> chunks = read_iris("./data/raw/iris.csv", chunksize=50)
+    >>> hash_split_streaming(chunks, "iris_train.csv", "iris_test.csv")
+    """
+    counts = [0, 0]
+    outputs = [train_path, test_path]
+    if append:
+        targets = outputs
+        header = [not os.path.exists(path) or os.path.getsize(path) == 0 for path in outputs]
+    else:
+        targets = []
+        for path in outputs:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.fspath(path)) or ".", suffix=".tmp")
+            os.close(fd)
+            targets.append(tmp_path)
+        header = [True, True]
+    try:
+        for chunk in chunks:
+            is_test = hash_test_mask(chunk, test_size=test_size, random_state=random_state, key=key)
+            for i, part in enumerate([chunk[~is_test], chunk[is_test]]):
+                part.to_csv(targets[i], mode="a", header=header[i], index=False)
+                header[i] = False
+            counts[0] += int((~is_test).sum())
+            counts[1] += int(is_test.sum())
+
+        if not append:
+            for tmp_path, path in zip(targets, outputs):
+                replace_file(tmp_path, path)
+    finally:
+        if not append:
+            for tmp_path in targets:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+    return tuple(counts)
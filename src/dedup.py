@@ -0,0 +1,308 @@
+# src/dedup.py
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+
+HASH_BITS = 64
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Computes a 64-bit hash of every row, ignoring the index.
+
+    Float columns are normalised first so that ``-0.0`` and ``0.0`` hash
+    alike, matching the equality used by ``DataFrame.duplicated``.
+
+    Examples
+    --------
+    >>> row_hashes(pd.DataFrame({"a": [1.0, 1.0], "b": ["x", "x"]}))
+    array([..., ...], dtype=uint64)
+    """
+    normalised = {
+        col: df[col] + 0.0 if pd.api.types.is_float_dtype(df[col]) else df[col]
+        for col in df.columns
+    }
+    return pd.util.hash_pandas_object(pd.DataFrame(normalised), index=False).to_numpy()
+
+
+def _partition_of(hashes: np.ndarray, depth: int, bits: int) -> np.ndarray:
+    """Partition number of each hash at a given recursion depth."""
+    shift = HASH_BITS - bits * (depth + 1)
+    return ((hashes >> np.uint64(shift)) & np.uint64((1 << bits) - 1)).astype(np.int64)
+
+
+def _append_pieces(directory, prefix, positions, hashes, chunk, partitions):
+    """Appends each partition's rows of a chunk to that partition's spill file."""
+    order = np.argsort(partitions, kind="stable")
+    parts, starts = np.unique(partitions[order], return_index=True)
+    for part, rows in zip(parts, np.split(order, starts[1:])):
+        with open(os.path.join(directory, f"{prefix}{part}.pkl"), "ab") as f:
+            pickle.dump((positions[rows], hashes[rows], chunk.iloc[rows]), f)
+
+
+def _read_pieces(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _partition_duplicates(path, depth, bits, max_bytes):
+    """
+    Returns the positions of duplicate rows within one spill file.
+
+    Partitions larger than ``max_bytes`` are split again on the next bits of
+    the row hash and processed one sub-partition at a time. A partition in
+    which every row has the same hash cannot be split, and is de-duplicated
+    in memory regardless of size since its rows are almost certainly all
+    identical.
+    """
+    if os.path.getsize(path) > max_bytes and bits * (depth + 2) <= HASH_BITS:
+        directory = os.path.dirname(path)
+        prefix = f"{os.path.basename(path)[:-4]}_"
+        distinct = set()
+        for positions, hashes, chunk in _read_pieces(path):
+            if len(distinct) < 2:
+                distinct.update(np.unique(hashes)[:2].tolist())
+            partitions = _partition_of(hashes, depth + 1, bits)
+            _append_pieces(directory, prefix, positions, hashes, chunk, partitions)
+        children = [
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.startswith(prefix) and name.count("_") == prefix.count("_")
+        ]
+        if len(distinct) > 1:
+            os.remove(path)
+            return np.concatenate(
+                [_partition_duplicates(child, depth + 1, bits, max_bytes) for child in children]
+            )
+        for child in children:
+            os.remove(child)
+
+    pieces = list(_read_pieces(path))
+    os.remove(path)
+    positions = np.concatenate([piece[0] for piece in pieces])
+    rows = pd.concat([piece[2] for piece in pieces], ignore_index=True)
+    order = np.argsort(positions, kind="stable")
+    duplicated = rows.iloc[order].duplicated().to_numpy()
+    return positions[order][duplicated]
+
+
+class DiskDeduplicator:
+    """
+    Bounded-memory duplicate detection that spills rows to disk partitions.
+
+    Rows are hashed and appended to one of ``2**bits`` partition files on
+    disk according to the top bits of their hash, so identical rows always
+    land in the same partition. Each partition is then de-duplicated on its
+    own, in parallel when ``n_jobs > 1``, with ``DataFrame.duplicated``
+    ordered by original row position. Partitions that would exceed the
+    per-worker share of ``memory_limit`` are re-split on the next hash bits
+    before being loaded.
+
+    The result is identical to ``df.duplicated()`` on the concatenation of
+    all chunks (first occurrence kept), while peak memory is bounded by the
+    chunk size and ``memory_limit`` rather than by the dataset size.
+
+    Parameters
+    ----------
+    memory_limit : int, optional
+        Approximate bytes of row data held in memory at once across all
+        workers. Defaults to 256 MiB.
+    bits : int, optional
+        Number of hash bits used per partitioning level (``2**bits`` files).
+        Defaults to 6.
+    n_jobs : int, optional
+        Number of worker processes used to de-duplicate partitions.
+        Defaults to 1.
+    tmp_dir : str, optional
+        Directory in which spill files are created. Defaults to the system
+        temporary directory.
+    spool : bool, optional
+        Whether to also keep the added chunks in order on disk, which is
+        needed by ``unique_chunks``. Defaults to True.
+
+    Examples
+    --------
+    >>> with DiskDeduplicator(memory_limit=64 * 2**20) as dedup:
+    ...     for chunk in pd.read_csv("./data/raw/iris.csv", chunksize=50):
+    ...         dedup.add(chunk)
+    ...     cleaned = pd.concat(dedup.unique_chunks())
+    """
+
+    def __init__(
+        self, memory_limit: int = 256 * 2**20, bits: int = 6, n_jobs: int = 1, tmp_dir=None, spool: bool = True
+    ):
+        self.memory_limit = memory_limit
+        self.bits = bits
+        self.n_jobs = n_jobs
+        self.n_rows = 0
+        self._tmp = tempfile.TemporaryDirectory(prefix="dedup_", dir=tmp_dir)
+        self._spool = os.path.join(self._tmp.name, "spool.pkl") if spool else None
+        self._mask = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Removes all spill files."""
+        self._mask = None
+        self._tmp.cleanup()
+
+    def add(self, chunk: pd.DataFrame):
+        """Spills a chunk of rows to the hash partitions and the ordered spool."""
+        if self._mask is not None:
+            raise RuntimeError("Cannot add rows after duplicates have been computed")
+        positions = np.arange(self.n_rows, self.n_rows + len(chunk))
+        hashes = row_hashes(chunk)
+        _append_pieces(
+            self._tmp.name, "part_", positions, hashes, chunk, _partition_of(hashes, 0, self.bits)
+        )
+        if self._spool is not None:
+            with open(self._spool, "ab") as f:
+                pickle.dump(chunk, f)
+        self.n_rows += len(chunk)
+
+    def duplicated(self) -> np.ndarray:
+        """Boolean mask over all added rows, True for repeats of an earlier row."""
+        if self._mask is not None:
+            return self._mask
+
+        paths = [
+            os.path.join(self._tmp.name, f"part_{part}.pkl")
+            for part in range(1 << self.bits)
+            if os.path.exists(os.path.join(self._tmp.name, f"part_{part}.pkl"))
+        ]
+        # Spilled pickles are smaller than the loaded frames (object columns,
+        # the pieces plus their concatenation), hence the safety factor
+        max_bytes = self.memory_limit // (4 * max(self.n_jobs, 1))
+        args = [(path, 0, self.bits, max_bytes) for path in paths]
+        if self.n_jobs > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                results = list(pool.map(_partition_duplicates, *zip(*args)))
+        else:
+            results = [_partition_duplicates(*arg) for arg in args]
+
+        if self.n_rows == 0:
+            mask = np.zeros(0, dtype=bool)
+        else:
+            # One byte per row, kept on disk so huge inputs do not need it in RAM
+            mask = np.memmap(os.path.join(self._tmp.name, "mask.bin"), dtype=bool, mode="w+", shape=self.n_rows)
+        for positions in results:
+            mask[positions] = True
+        self._mask = mask
+        return mask
+
+    def unique_chunks(self):
+        """Yields the added chunks in order with duplicate rows removed."""
+        if self._spool is None:
+            raise RuntimeError("unique_chunks needs a deduplicator created with spool=True")
+        mask = self.duplicated()
+        start = 0
+        for chunk in _read_pieces(self._spool):
+            yield chunk[~mask[start:start + len(chunk)]]
+            start += len(chunk)
+
+
+def _merge_sorted(*runs) -> np.ndarray:
+    # Timsort merges sorted runs in linear time
+    return np.sort(np.concatenate(runs), kind="stable")
+
+
+class HashStore:
+    """
+    Persistent set of 64-bit row hashes, kept as a few sorted runs on disk.
+
+    Hashes added during a run are buffered in memory and written as one
+    new sorted run by ``flush``. In memory and on disk alike, a new run is
+    merged into the previous one while it is at least half as large, so
+    there are at most about ``log2(n)`` runs and each hash is rewritten
+    about ``log2(n)`` times over its lifetime, instead of the whole set
+    being rewritten on every append. The runs are memory-mapped, so a lookup reads only the pages
+    the binary searches touch.
+
+    Run files are never modified: ``flush`` writes new files and returns
+    the names to persist, and ``prune`` deletes the superseded files once
+    those names have been saved, so an interrupted run leaves the stored
+    set intact.
+
+    Parameters
+    ----------
+    directory : str or path-like
+        Directory holding the run files.
+    runs : list of str, optional
+        Names of the run files of the set, oldest first, as returned by a
+        previous ``flush``. Defaults to an empty set.
+
+    Examples
+    --------
+    >>> store = HashStore("./data/.cache/incremental/hashes", state["hash_runs"])
+    >>> hashes = row_hashes(chunk)
+    >>> is_new = ~store.isin(hashes)
+    >>> store.add(hashes[is_new])
+    >>> state["hash_runs"] = store.flush()
+    """
+
+    def __init__(self, directory, runs=()):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.runs = list(runs)
+        self._arrays = [np.load(os.path.join(directory, name), mmap_mode="r") for name in self.runs]
+        self._pending = []
+
+    def __len__(self):
+        return sum(map(len, self._arrays)) + sum(map(len, self._pending))
+
+    def isin(self, hashes: np.ndarray) -> np.ndarray:
+        """Boolean mask, True for the hashes already in the set."""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in [*self._arrays, *self._pending]:
+            if len(run):
+                pos = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+                found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray):
+        """Buffers hashes that are not in the set yet."""
+        self._pending.append(np.unique(hashes))
+        while len(self._pending) > 1 and 2 * len(self._pending[-1]) >= len(self._pending[-2]):
+            newest = self._pending.pop()
+            self._pending[-1] = _merge_sorted(self._pending[-1], newest)
+
+    def flush(self) -> list:
+        """Writes the buffered hashes as a new run and returns the names of the runs to persist."""
+        if not self._pending:
+            return list(self.runs)
+        new = _merge_sorted(*self._pending)
+        self._pending = []
+        while self._arrays and 2 * len(new) >= len(self._arrays[-1]):
+            new = _merge_sorted(self._arrays.pop(), new)
+            self.runs.pop()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix="hashes-", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, new)
+        name = os.path.basename(tmp_path)[:-len(".tmp")] + ".npy"
+        replace_file(tmp_path, os.path.join(self.directory, name))
+        self.runs.append(name)
+        self._arrays.append(np.load(os.path.join(self.directory, name), mmap_mode="r"))
+        return list(self.runs)
+
+    def prune(self):
+        """Deletes the run files that are not part of the set any more."""
+        keep = set(self.runs)
+        for name in os.listdir(self.directory):
+            if name.startswith("hashes-") and name not in keep:
+                os.remove(os.path.join(self.directory, name))
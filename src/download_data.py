@@ -1,16 +1,418 @@
 import click
-import pandas as pd
+import hashlib
+import http.client
+import json
 import os
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta: dict):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f)
+    replace_file(tmp_path, meta_path)
+
+
+def _remove(*paths):
+    for p in paths:
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def _expected_size(response):
+    """Total size of the resource announced by a 200 or 206 response, if any."""
+    content_range = response.headers.get("Content-Range")
+    if response.status == 206 and content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    length = response.headers.get("Content-Length")
+    return int(length) if response.status == 200 and length is not None else None
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections reused across requests, one per host and thread.
+
+    ``urllib`` opens a new connection, with a new TCP (and TLS) handshake,
+    for every request. Worker threads downloading many files from the same
+    host instead keep their connection open between files.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        Socket timeout in seconds. Defaults to 30.
+    max_redirects : int, optional
+        Number of redirects followed per request. Defaults to 5.
+
+    Examples
+    --------
+    >>> pool = ConnectionPool()
+    >>> with pool.request("https://example.com/iris.csv") as response:
+    ...     body = response.read()
+    """
+
+    def __init__(self, timeout: float = 30.0, max_redirects: int = 5):
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme, netloc, fresh=False):
+        connections = self._local.__dict__.setdefault("connections", {})
+        conn = connections.get((scheme, netloc))
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = connections[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+            with self._lock:
+                self._opened.append(conn)
+        return conn
+
+    def request(self, url: str, headers: dict = None):
+        """
+        Sends a GET request and returns the response once its headers are read.
+
+        The body must be read to the end before the thread sends another
+        request to the same host. Error statuses other than 304 and 416 are
+        raised as ``urllib.error.HTTPError``, like ``urllib.request.urlopen``.
+        """
+        for _ in range(self.max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+            for fresh in (False, True):
+                # A kept-alive connection may have been closed by the server
+                # or left unusable by an interrupted read; retry on a new one
+                conn = self._connection(parts.scheme, parts.netloc, fresh=fresh)
+                try:
+                    conn.request("GET", target, headers=headers or {})
+                    response = conn.getresponse()
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    if fresh:
+                        raise
+            if response.status in (301, 302, 303, 307, 308) and response.headers.get("Location"):
+                response.read()
+                url = urllib.parse.urljoin(url, response.headers["Location"])
+                continue
+            if response.status >= 400 and response.status != 416:
+                response.read()
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            return response
+        raise urllib.error.URLError(f"Too many redirects for {url}")
+
+    def close(self):
+        """Closes every connection of the pool, in all threads."""
+        with self._lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+
+
+def _open(url, headers, timeout, pool):
+    """Opens ``url`` through ``pool`` or urllib, returning 304 and 416 answers as responses."""
+    if pool is not None:
+        return pool.request(url, headers)
+    try:
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code in (304, 416):
+            return e
+        raise
+
+
+def download(
+    url: str, path, sha256: str = None, chunk_size: int = 2**16, timeout: float = 30.0, pool: ConnectionPool = None
+) -> bool:
+    """
+    Streams a remote file to disk, resuming partial downloads and skipping unchanged ones.
+
+    The response body is written to ``<path>.part`` in blocks of
+    ``chunk_size`` bytes and moved over ``path`` only once it is complete
+    and its SHA-256 matches ``sha256``, so ``path`` never holds a truncated
+    file. The ``ETag`` and ``Last-Modified`` validators of the response are
+    kept next to the file (``<path>.meta.json``):
+
+    - an interrupted download is resumed with a ``Range`` request, guarded
+      by ``If-Range`` so that a source that changed in the meantime is
+      fetched again from the start;
+    - a completed download is revalidated with ``If-None-Match`` /
+      ``If-Modified-Since``, and nothing is transferred when the server
+      answers ``304 Not Modified``.
+
+    Parameters
+    ----------
+    url : str
+        URL of the file to download.
+    path : str or path-like
+        Destination file. Its directory is created if it does not exist.
+    sha256 : str, optional
+        Expected hex SHA-256 of the file. A mismatch discards the download
+        and raises ValueError. Defaults to None (not checked).
+    chunk_size : int, optional
+        Number of bytes read and written at a time. Defaults to 64 KiB.
+    timeout : float, optional
+        Socket timeout in seconds. Defaults to 30.
+    pool : ConnectionPool, optional
+        Pool of keep-alive connections to send the request through. Defaults
+        to None (a new connection per call).
+
+    Returns
+    -------
+    bool
+        True if ``path`` was (re)written, False if the local copy was
+        already up to date.
+
+    Raises
+    ------
+    ValueError
+        If the downloaded content does not match ``sha256``.
+    urllib.error.URLError
+        If the server cannot be reached or answers with an error status.
+
+    Examples
+    --------
+    >>> download("https://example.com/iris.csv", "./data/raw/iris.csv")
+    True
+    >>> download("https://example.com/iris.csv", "./data/raw/iris.csv")
+    False
+    """
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    part_path, meta_path = f"{path}.part", f"{path}.meta.json"
+    part_meta_path = f"{part_path}.meta.json"
+
+    headers = {}
+    offset = 0
+    meta, part_meta = _read_meta(meta_path), _read_meta(part_meta_path)
+    if os.path.exists(part_path) and part_meta and part_meta["url"] == url:
+        validator = part_meta.get("etag") or part_meta.get("last_modified")
+        if validator:
+            offset = os.path.getsize(part_path)
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+    elif (
+        os.path.exists(path)
+        and meta
+        and meta["url"] == url
+        and meta["size"] == os.path.getsize(path)
+        and sha256 in (None, meta["sha256"])
+    ):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = _open(url, headers, timeout, pool)
+    if response.status in (304, 416):
+        with response:
+            response.read()
+        if response.status == 304:
+            return False
+        if not offset:
+            raise urllib.error.HTTPError(url, 416, response.reason, response.headers, None)
+        # The partial file is not a prefix of the current source
+        _remove(part_path, part_meta_path)
+        return download(url, path, sha256=sha256, chunk_size=chunk_size, timeout=timeout, pool=pool)
+
+    digest = hashlib.sha256()
+    with response:
+        if response.status == 206:
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(block)
+            mode = "ab"
+        else:
+            # Full body: a fresh download, or the source changed since the
+            # partial one was started
+            mode = "wb"
+            _write_meta(part_meta_path, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            })
+        expected_size = _expected_size(response)
+        with open(part_path, mode) as f:
+            for block in iter(lambda: response.read(chunk_size), b""):
+                f.write(block)
+                digest.update(block)
+
+    size = os.path.getsize(part_path)
+    if expected_size is not None and size != expected_size:
+        # Keep the partial file so the next call resumes it
+        raise urllib.error.URLError(f"Incomplete download of {url}: {size} of {expected_size} bytes")
+    if sha256 is not None and digest.hexdigest() != sha256.lower():
+        _remove(part_path, part_meta_path)
+        raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {digest.hexdigest()}")
+
+    part_meta = _read_meta(part_meta_path) or {}
+    os.replace(part_path, path)
+    _write_meta(meta_path, {
+        "url": url,
+        "etag": part_meta.get("etag"),
+        "last_modified": part_meta.get("last_modified"),
+        "size": size,
+        "sha256": digest.hexdigest(),
+    })
+    _remove(part_meta_path)
+    return True
+
+
+def read_manifest(source: str) -> list:
+    """
+    Reads a shard manifest: one shard URL per line, optionally followed by its SHA-256.
+
+    ``source`` is a local file or a URL. Blank lines and lines starting with
+    ``#`` are ignored, and relative shard URLs are resolved against the
+    manifest URL.
+
+    Examples
+    --------
+    >>> read_manifest("https://example.com/iris/manifest.txt")
+    [('https://example.com/iris/part-0.csv', '9c1f...'), ('https://example.com/iris/part-1.csv', None)]
+    """
+    if urllib.parse.urlsplit(source).scheme in ("http", "https", "file"):
+        with urllib.request.urlopen(source) as response:
+            text = response.read().decode()
+    else:
+        with open(source) as f:
+            text = f.read()
+
+    shards = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        shards.append((urllib.parse.urljoin(source, fields[0]), fields[1] if len(fields) > 1 else None))
+    return shards
+
+
+def _concatenate_csv(paths, path):
+    """Atomically writes the CSV files in ``paths`` to ``path``, keeping one header row."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            header = None
+            for shard_path in paths:
+                with open(shard_path, "rb") as f:
+                    first = f.readline()
+                    if header is None:
+                        header = first
+                        out.write(first)
+                    elif first.rstrip(b"\r\n") != header.rstrip(b"\r\n"):
+                        raise ValueError(f"Shard {shard_path} has header {first!r}, expected {header!r}")
+                    last = b"\n"
+                    for block in iter(lambda: f.read(2**20), b""):
+                        out.write(block)
+                        last = block[-1:]
+                    if last != b"\n":
+                        out.write(b"\n")
+        replace_file(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+def download_shards(
+    shards, path, shard_dir=None, concurrency: int = 8, chunk_size: int = 2**16, timeout: float = 30.0
+) -> bool:
+    """
+    Downloads the shards of a dataset concurrently and concatenates them into one CSV.
+
+    Each shard is fetched with ``download`` by one of ``concurrency`` worker
+    threads, so it is streamed, resumable, revalidated against its
+    ``ETag``/``Last-Modified`` and checksummed like a single file. Workers
+    keep a keep-alive connection per host across the shards they fetch.
+    Once every shard is on disk, they are concatenated in manifest order
+    into ``path`` (one header row), atomically, and only when a shard
+    changed or ``path`` does not exist yet.
+
+    Parameters
+    ----------
+    shards : list
+        Shard URLs, or ``(url, sha256)`` pairs as returned by
+        ``read_manifest``.
+    path : str or path-like
+        Destination of the concatenated CSV file.
+    shard_dir : str or path-like, optional
+        Directory in which the individual shards are kept between runs.
+        Defaults to a ``shards`` directory next to ``path``.
+    concurrency : int, optional
+        Maximum number of shards downloaded at the same time. Defaults to 8.
+    chunk_size : int, optional
+        Number of bytes read and written at a time. Defaults to 64 KiB.
+    timeout : float, optional
+        Socket timeout in seconds. Defaults to 30.
+
+    Returns
+    -------
+    bool
+        True if ``path`` was (re)written, False if every shard was unchanged.
+
+    Examples
+    --------
+    >>> download_shards(read_manifest("https://example.com/iris/manifest.txt"), "./data/raw/iris.csv")
+    True
+    """
+    if not shards:
+        raise ValueError("No shards to download")
+    path = os.fspath(path)
+    shard_dir = shard_dir or os.path.join(os.path.dirname(path) or ".", "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = [(shard, None) if isinstance(shard, str) else tuple(shard) for shard in shards]
+    shard_paths = [
+        os.path.join(shard_dir, f"{i:05d}_{os.path.basename(urllib.parse.urlsplit(url).path) or 'shard'}")
+        for i, (url, _) in enumerate(shards)
+    ]
+
+    pool = ConnectionPool(timeout=timeout)
+
+    def fetch(url, sha256, shard_path):
+        return download(url, shard_path, sha256=sha256, chunk_size=chunk_size, timeout=timeout, pool=pool)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            changed = list(executor.map(fetch, *zip(*shards), shard_paths))
+    finally:
+        pool.close()
+
+    if not any(changed) and os.path.exists(path):
+        return False
+    _concatenate_csv(shard_paths, path)
+    return True
 
 
 @click.command()
 @click.option(
     "--url",
     type=str,
-    help="URL of dataset to be downloaded",
-    default="https://raw.githubusercontent.com/mwaskom/seaborn-data/master/iris.csv",
+    multiple=True,
+    help="URL of dataset to be downloaded; repeat the option to download several shards",
+    default=["https://raw.githubusercontent.com/mwaskom/seaborn-data/master/iris.csv"],
     show_default=True,
 )
+@click.option(
+    "--manifest",
+    type=str,
+    help="Local path or URL of a manifest listing the shard URLs (and optional SHA-256) one per line",
+    default=None,
+)
 @click.option(
     "--path",
     type=str,
@@ -18,22 +420,42 @@ import os
     default="./data/raw/iris.csv",
     show_default=True,
 )
-def main(url, path):
-    """Downloads data csv data from the web to a local filepath and extracts it."""
-
-    data = pd.read_csv(url)
-
-    # output_path = "./data/raw/iris.csv"
+@click.option(
+    "--sha256",
+    type=str,
+    help="Expected SHA-256 of the downloaded file; sharded downloads take per-shard checksums from --manifest",
+    default=None,
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    help="Maximum number of shards downloaded at the same time",
+    default=8,
+    show_default=True,
+)
+def main(url, manifest, path, sha256, concurrency):
+    """Downloads data csv data from the web to a local filepath, resuming
+    interrupted downloads and skipping the transfer if the source is unchanged.
+    Sharded datasets are downloaded concurrently and concatenated into one file."""
 
-    # ensure path exists
-    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if sha256 and (manifest or len(url) > 1):
+        raise click.UsageError("--sha256 checks a single download; list per-shard checksums in a --manifest instead")
 
     try:
-        data.to_csv(path, index=False)
-        print(f"The Iris data is saved as {path}.")
+        if manifest or len(url) > 1:
+            shards = read_manifest(manifest) if manifest else list(url)
+            changed = download_shards(shards, path, concurrency=concurrency)
+        else:
+            changed = download(url[0], path, sha256=sha256)
+
+        if changed:
+            print(f"The Iris data is saved as {path}.")
+        else:
+            print(f"The Iris data at {path} is up to date.")
 
     except Exception as e:
         print("Failed to download or save data:", e)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,20 @@
 import click
-import pandas as pd
 import altair as alt
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.make_boxplot import make_boxplot
 from src.make_barplot import make_bar_plot
 from src.make_pairwise import make_pairwise_plot
+from src.load_data import read_iris
 
 @click.command()
-@click.option('--training-data', type=str, help="Path to processed training data", default = './data/processed/iris_train.csv', show_default=True)
+@click.option('--training-data', type=str, help="Path to processed training data (.cols or .csv)", default = './data/processed/iris_train.cols', show_default=True)
 @click.option('--plot-to', type=str, help="Path to directory where the plot will be written to", default = './results/figures/', show_default=True)
 def main(training_data, plot_to):
     ''' 
     Generate EDA plots and save them in results/figure folder.
     '''
-    train_data = pd.read_csv(training_data)
+    train_data = read_iris(training_data)
 
     bar_plot = make_bar_plot(train_data, 'count()', 'Count', 'species', 'Species', 'species')
 
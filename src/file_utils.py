@@ -0,0 +1,45 @@
+# src/file_utils.py
+import os
+import threading
+
+_UMASK_LOCK = threading.Lock()
+
+
+def current_umask() -> int:
+    """
+    The file mode creation mask of this process.
+
+    Read from ``/proc`` where available, since ``os.umask`` can only be
+    read by setting it, which briefly changes the mask of every thread.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    with _UMASK_LOCK:
+        mask = os.umask(0o022)
+        os.umask(mask)
+    return mask
+
+
+def replace_file(tmp_path, path):
+    """
+    Atomically moves a finished temporary file to ``path`` with the mode of a newly created file.
+
+    ``tempfile.mkstemp`` creates files readable by their owner only. The
+    file is given the mode ``open`` would have created it with under the
+    current umask, so other users and processes can read and map it, as
+    they could the files written directly before.
+
+    Examples
+    --------
+    >>> fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    >>> with os.fdopen(fd, "wb") as f:
+    ...     f.write(payload)
+    >>> replace_file(tmp_path, path)
+    """
+    os.chmod(tmp_path, 0o666 & ~current_umask())
+    os.replace(tmp_path, path)
@@ -0,0 +1,467 @@
+# src/knn_backends.py
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.utils.validation import check_is_fitted, validate_data
+
+# Up to this many features the KD-tree beats a blocked GEMM over all rows,
+# whatever the number of rows (see benchmarks/bench_knn_backends.py)
+TREE_MAX_FEATURES = 10
+# Approximate search only pays off on large training sets
+APPROXIMATE_MIN_ROWS = 100_000
+
+
+def _exact_top_k(X_fit, queries, candidates, n_neighbors):
+    """
+    Exact float64 distances to each query's candidate rows, keeping the ``n_neighbors`` nearest.
+
+    Ties are broken by training row index, so results do not depend on the
+    order the candidates were found in. Candidates of -1 are empty slots.
+    """
+    dist = np.sqrt(((X_fit[candidates] - queries[:, None, :]) ** 2).sum(axis=2))
+    # Empty candidate slots, marked -1, rank last
+    dist[candidates < 0] = np.inf
+    order = np.lexsort((candidates, dist), axis=1)[:, :n_neighbors]
+    return np.take_along_axis(dist, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+def _merge_top_k(dist, ind, k):
+    """
+    Keeps the ``k`` smallest distances of each row and their indices.
+
+    ``ind`` is either one index per distance or, for a block of contiguous
+    candidates shared by every row, a 1D array of the block's indices.
+    """
+    if dist.shape[1] <= k:
+        return dist, np.broadcast_to(ind, dist.shape) if ind.ndim == 1 else ind
+    keep = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    ind = ind[keep] if ind.ndim == 1 else np.take_along_axis(ind, keep, axis=1)
+    return np.take_along_axis(dist, keep, axis=1), ind
+
+
+def _merge_candidates(best_dist, best_ind, rows, dist, ind):
+    """
+    Merges scattered candidates into the full per-row shortlists ``best_dist`` and ``best_ind``, in place.
+
+    ``rows``, ``dist`` and ``ind`` list one candidate each; only the rows
+    they touch are merged.
+    """
+    touched = np.unique(rows)
+    width = best_dist.shape[1]
+    all_rows = np.concatenate([np.repeat(touched, width), rows])
+    all_dist = np.concatenate([best_dist[touched].ravel(), dist])
+    all_ind = np.concatenate([best_ind[touched].ravel(), ind])
+    order = np.lexsort((all_dist, all_rows))
+    all_rows = all_rows[order]
+    rank = np.arange(len(order)) - np.searchsorted(all_rows, all_rows)
+    keep = rank < width
+    best_dist[all_rows[keep], rank[keep]] = all_dist[order][keep]
+    best_ind[all_rows[keep], rank[keep]] = all_ind[order][keep]
+
+
+class BruteForceIndex:
+    """
+    Exact euclidean nearest neighbors from blocked float32 matrix products.
+
+    Candidates are ranked on ``|x|^2 - 2 q.x``, the squared distance less
+    the query's own ``|q|^2``, one tile of query rows by training rows at a
+    time, so BLAS does the work and the distance tile never exceeds
+    ``tile_mib``. Data is centered first to
+    limit float32 cancellation. Each tile updates a running shortlist of
+    the nearest candidates of every query, which is then ranked again with
+    exact float64 distances. Returned distances are therefore exact; only
+    rows within float32 rounding of the last neighbor could be swapped.
+
+    Parameters
+    ----------
+    n_neighbors : int, optional
+        Default number of neighbors of ``kneighbors``. Defaults to 5.
+    tile_mib : float, optional
+        Size bound of a float32 distance tile, in MiB. Defaults to 32.
+    """
+
+    def __init__(self, n_neighbors: int = 5, tile_mib: float = 32):
+        self.n_neighbors = n_neighbors
+        self.tile_mib = tile_mib
+
+    def fit(self, X):
+        self._fit_X = np.asarray(X, dtype=np.float64)
+        self._center = self._fit_X.mean(axis=0)
+        self._fit_X32 = (self._fit_X - self._center).astype(np.float32)
+        self._fit_norms = np.einsum("ij,ij->i", self._fit_X32, self._fit_X32)
+        return self
+
+    def _tiles(self, n_queries):
+        """Query and training block sizes keeping a tile within ``tile_mib``."""
+        n_fit = len(self._fit_X)
+        tile_items = max(1, int(self.tile_mib * 2**20) // 4)
+        query_block = max(1, min(n_queries, 1024, tile_items // min(n_fit, 4096)))
+        return query_block, max(1, min(n_fit, tile_items // query_block))
+
+    def _shortlist(self, queries32, shortlist):
+        """Indices of the ``shortlist`` nearest training rows of each query, in float32."""
+        n_fit = len(self._fit_X)
+        _, fit_block = self._tiles(len(queries32))
+        minus_2q = -2 * queries32
+        best_dist = best_ind = None
+        for start in range(0, n_fit, fit_block):
+            stop = min(start + fit_block, n_fit)
+            # |q|^2 is the same for every candidate of a query, so ranking skips it
+            dist = minus_2q @ self._fit_X32[start:stop].T
+            dist += self._fit_norms[start:stop]
+            if best_dist is None:
+                best_dist, best_ind = _merge_top_k(dist, np.arange(start, stop), shortlist)
+                best_dist, best_ind = best_dist.copy(), best_ind.copy()
+                continue
+            # Only candidates nearer than a query's current shortlist can enter it,
+            # and they become rare as the shortlists tighten
+            rows, cols = np.nonzero(dist < best_dist.max(axis=1, keepdims=True))
+            if len(rows):
+                _merge_candidates(best_dist, best_ind, rows, dist[rows, cols], cols + start)
+        return best_ind
+
+    def kneighbors(self, X, n_neighbors: int = None, return_distance: bool = True):
+        """Distances and indices of the ``n_neighbors`` nearest training rows of each row of ``X``, nearest first."""
+        n_neighbors = self.n_neighbors if n_neighbors is None else n_neighbors
+        if n_neighbors > len(self._fit_X):
+            raise ValueError(f"Expected n_neighbors <= n_samples_fit, got {n_neighbors} > {len(self._fit_X)}")
+        X = np.asarray(X, dtype=np.float64)
+        # A few spare candidates absorb float32 rounding before the exact ranking
+        shortlist = min(len(self._fit_X), n_neighbors + max(8, n_neighbors))
+        query_block, _ = self._tiles(len(X))
+        dist = np.empty((len(X), n_neighbors))
+        ind = np.empty((len(X), n_neighbors), dtype=np.intp)
+        for start in range(0, len(X), query_block):
+            queries = X[start:start + query_block]
+            queries32 = (queries - self._center).astype(np.float32)
+            candidates = self._shortlist(queries32, shortlist)
+            dist[start:start + query_block], ind[start:start + query_block] = _exact_top_k(
+                self._fit_X, queries, candidates, n_neighbors
+            )
+        return (dist, ind) if return_distance else ind
+
+
+class IVFIndex(BruteForceIndex):
+    """
+    Approximate euclidean nearest neighbors from an inverted-file index.
+
+    Training rows are grouped around ``n_lists`` k-means centroids. A query
+    only scans the rows of its ``n_probe`` nearest lists, with the blocked
+    float32 products of ``BruteForceIndex``, and the candidates found are
+    ranked with exact distances. ``fit`` picks the smallest ``n_probe``
+    whose recall of the true ``n_neighbors`` nearest neighbors, measured on
+    a sample of training rows (each leaving itself out), reaches
+    ``recall_target``.
+
+    Parameters
+    ----------
+    n_neighbors : int, optional
+        Default number of neighbors of ``kneighbors``. Defaults to 5.
+    recall_target : float, optional
+        Recall ``n_probe`` is tuned for. Defaults to 0.95.
+    n_lists : int, optional
+        Number of lists; about the square root of the number of rows when None.
+    tile_mib : float, optional
+        Size bound of a float32 distance tile, in MiB. Defaults to 32.
+    random_state : int, optional
+        Seed of the k-means and of the calibration sample. Defaults to 123.
+
+    Attributes
+    ----------
+    n_probe_ : int
+        Number of lists scanned per query.
+    recall_ : float
+        Recall measured with ``n_probe_`` on the calibration sample.
+    """
+
+    def __init__(self, n_neighbors: int = 5, recall_target: float = 0.95, n_lists: int = None, tile_mib: float = 32,
+                 random_state: int = 123):
+        super().__init__(n_neighbors, tile_mib)
+        self.recall_target = recall_target
+        self.n_lists = n_lists
+        self.random_state = random_state
+
+    def fit(self, X):
+        super().fit(X)
+        n_fit = len(self._fit_X)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n_fit)))
+        kmeans = KMeans(n_lists, n_init=1, max_iter=20, random_state=self.random_state)
+        sample = np.random.default_rng(self.random_state).choice(n_fit, min(n_fit, 50 * n_lists), replace=False)
+        kmeans.fit(self._fit_X32[sample])
+        self._centroids = kmeans.cluster_centers_.astype(np.float32)
+        labels = kmeans.predict(self._fit_X32)
+        self._list_rows = np.argsort(labels, kind="stable")
+        self._list_bounds = np.searchsorted(labels[self._list_rows], np.arange(n_lists + 1))
+        self._calibrate()
+        return self
+
+    def _calibrate(self):
+        """Picks the smallest ``n_probe`` reaching ``recall_target`` on a sample of training rows."""
+        n_fit = len(self._fit_X)
+        n_neighbors = min(self.n_neighbors, n_fit - 1)
+        sample = np.random.default_rng(self.random_state + 1).choice(n_fit, min(n_fit, 1000), replace=False)
+        queries = self._fit_X[sample]
+        n_lists = len(self._centroids)
+        if n_neighbors < 1:
+            self.n_probe_, self.recall_ = n_lists, 1.0
+            return
+
+        def neighbors_of_others(ind):
+            # A sampled row always finds itself, which would inflate the recall
+            return [row[row != own][:n_neighbors] for row, own in zip(ind, sample)]
+
+        exact = neighbors_of_others(BruteForceIndex.kneighbors(self, queries, n_neighbors + 1, return_distance=False))
+
+        def measure(n_probe):
+            self.n_probe_ = n_probe
+            found = neighbors_of_others(self.kneighbors(queries, n_neighbors + 1, return_distance=False))
+            self.recall_ = np.mean([len(np.intersect1d(a, b)) / n_neighbors for a, b in zip(found, exact)])
+            return self.recall_ >= self.recall_target
+
+        # Double n_probe until the target is met, then bisect back down
+        low, high = 0, 1
+        while high < n_lists and not measure(high):
+            low, high = high, min(n_lists, high * 2)
+        while high - low > 1:
+            mid = (low + high) // 2
+            if measure(mid):
+                high = mid
+            else:
+                low = mid
+        measure(high)
+
+    def kneighbors(self, X, n_neighbors: int = None, return_distance: bool = True):
+        """Approximate distances and indices of the ``n_neighbors`` nearest training rows, nearest first."""
+        n_neighbors = self.n_neighbors if n_neighbors is None else n_neighbors
+        if n_neighbors > len(self._fit_X):
+            raise ValueError(f"Expected n_neighbors <= n_samples_fit, got {n_neighbors} > {len(self._fit_X)}")
+        X = np.asarray(X, dtype=np.float64)
+        # Query blocks keep the tile of the largest list within tile_mib
+        largest_list = max(1, np.diff(self._list_bounds).max())
+        query_block = max(1, int(self.tile_mib * 2**20) // 4 // largest_list)
+        dist = np.empty((len(X), n_neighbors))
+        ind = np.empty((len(X), n_neighbors), dtype=np.intp)
+        for start in range(0, len(X), query_block):
+            dist[start:start + query_block], ind[start:start + query_block] = self._search(
+                X[start:start + query_block], n_neighbors
+            )
+        return (dist, ind) if return_distance else ind
+
+    def _search(self, X, n_neighbors):
+        """Approximate neighbors of one block of queries."""
+        minus_2q = -2 * (X - self._center).astype(np.float32)
+        centroid_dist = minus_2q @ self._centroids.T + (self._centroids ** 2).sum(axis=1)
+        n_probe = min(self.n_probe_, len(self._centroids))
+        probes = np.argpartition(centroid_dist, n_probe - 1, axis=1)[:, :n_probe]
+
+        # Scan list by list, each with every query probing it
+        shortlist = n_neighbors + max(8, n_neighbors)
+        best_dist = np.full((len(X), shortlist), np.inf, dtype=np.float32)
+        best_ind = np.zeros((len(X), shortlist), dtype=np.intp)
+        probe_queries = np.repeat(np.arange(len(X)), n_probe)
+        probe_lists = probes.ravel()
+        order = np.argsort(probe_lists, kind="stable")
+        list_starts = np.searchsorted(probe_lists[order], np.arange(len(self._centroids) + 1))
+        for list_id in range(len(self._centroids)):
+            queries = probe_queries[order[list_starts[list_id]:list_starts[list_id + 1]]]
+            rows = self._list_rows[self._list_bounds[list_id]:self._list_bounds[list_id + 1]]
+            if len(queries) == 0 or len(rows) == 0:
+                continue
+            dist = minus_2q[queries] @ self._fit_X32[rows].T
+            dist += self._fit_norms[rows]
+            dist, ind = _merge_top_k(dist, rows, shortlist)
+            best_dist[queries], best_ind[queries] = _merge_top_k(
+                np.hstack([best_dist[queries], dist]), np.hstack([best_ind[queries], ind]), shortlist
+            )
+
+        # Queries whose lists held fewer than n_neighbors rows are searched exactly
+        best_ind[np.isinf(best_dist)] = -1
+        short = (best_ind >= 0).sum(axis=1) < n_neighbors
+        dist, ind = _exact_top_k(self._fit_X, X, best_ind, n_neighbors)
+        if short.any():
+            dist[short], ind[short] = BruteForceIndex.kneighbors(self, X[short], n_neighbors)
+        return dist, ind
+
+
+class TreeIndex:
+    """
+    Exact nearest neighbors from a sklearn KD-tree or ball tree, with the interface of the other indexes.
+
+    Parameters
+    ----------
+    n_neighbors : int, optional
+        Default number of neighbors of ``kneighbors``. Defaults to 5.
+    algorithm : str, optional
+        ``"kd_tree"`` (default) or ``"ball_tree"``.
+    leaf_size : int, optional
+        Leaf size of the tree. Defaults to 30.
+    """
+
+    def __init__(self, n_neighbors: int = 5, algorithm: str = "kd_tree", leaf_size: int = 30):
+        self.n_neighbors = n_neighbors
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+
+    def fit(self, X):
+        self._neighbors = NearestNeighbors(
+            n_neighbors=self.n_neighbors, algorithm=self.algorithm, leaf_size=self.leaf_size
+        ).fit(np.asarray(X, dtype=np.float64))
+        return self
+
+    def kneighbors(self, X, n_neighbors: int = None, return_distance: bool = True):
+        """Distances and indices of the ``n_neighbors`` nearest training rows of each row of ``X``, nearest first."""
+        return self._neighbors.kneighbors(np.asarray(X, dtype=np.float64), n_neighbors, return_distance)
+
+
+# Neighbor index of each backend, built as BACKENDS[name](n_neighbors, **options)
+BACKENDS = {
+    "kd_tree": lambda n_neighbors, leaf_size=30, **_: TreeIndex(n_neighbors, "kd_tree", leaf_size),
+    "ball_tree": lambda n_neighbors, leaf_size=30, **_: TreeIndex(n_neighbors, "ball_tree", leaf_size),
+    "brute_blas": lambda n_neighbors, tile_mib=32, **_: BruteForceIndex(n_neighbors, tile_mib),
+    "ivf": lambda n_neighbors, tile_mib=32, recall_target=None, **_: IVFIndex(
+        n_neighbors, 0.95 if recall_target is None else recall_target, tile_mib=tile_mib
+    ),
+}
+
+
+def select_backend(n_samples: int, n_features: int, recall_target: float = None) -> str:
+    """
+    Picks a neighbor backend for a training set's size.
+
+    Training sets of up to ``TREE_MAX_FEATURES`` features, like iris, use a
+    ``"kd_tree"``; wider ones ``"brute_blas"``, or the approximate
+    ``"ivf"`` index when they have ``APPROXIMATE_MIN_ROWS`` rows or more
+    and a ``recall_target`` below 1 is given.
+
+    Examples
+    --------
+    >>> select_backend(120, 4)
+    'kd_tree'
+    """
+    if n_features <= TREE_MAX_FEATURES:
+        return "kd_tree"
+    if recall_target is not None and recall_target < 1 and n_samples >= APPROXIMATE_MIN_ROWS:
+        return "ivf"
+    return "brute_blas"
+
+
+def make_index(backend: str, n_samples: int, n_features: int, n_neighbors: int, **options):
+    """
+    Builds the unfitted neighbor index of a backend, resolving ``"auto"`` with ``select_backend``.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+    """
+    if backend == "auto":
+        backend = select_backend(n_samples, n_features, options.get("recall_target"))
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown neighbor backend {backend!r}, expected 'auto' or one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](n_neighbors, **options)
+
+
+def neighbor_weights(dist: np.ndarray, weights: str) -> np.ndarray:
+    """Vote weight of each neighbor, matching ``KNeighborsClassifier``."""
+    if weights == "uniform":
+        return np.ones_like(dist)
+    if weights != "distance":
+        raise ValueError(f"Unsupported weights {weights!r}, expected 'uniform' or 'distance'")
+    with np.errstate(divide="ignore"):
+        inverse = 1.0 / dist
+    # Rows with an exact match only vote with the exact matches. Neighbors
+    # are sorted by distance, so this holds for every prefix of the row.
+    exact = dist[:, 0] == 0
+    inverse[exact] = dist[exact] == 0
+    return inverse
+
+
+class BackendKNeighborsClassifier(KNeighborsClassifier):
+    """
+    Euclidean ``KNeighborsClassifier`` whose neighbor queries go through a pluggable backend.
+
+    ``kneighbors`` queries the index of ``backend``, chosen among
+    ``BACKENDS`` or by training-set size with ``"auto"``, and ``predict``
+    and ``predict_proba`` vote over its neighbors like
+    ``KNeighborsClassifier``, ties going to the first class.
+    ``NeighborGraphSearchCV`` queries its folds with the same backend.
+
+    Parameters
+    ----------
+    n_neighbors : int, optional
+        Number of neighbors. Defaults to 5.
+    weights : str, optional
+        ``"uniform"`` (default) or ``"distance"``.
+    backend : str, optional
+        ``"auto"`` (default), ``"kd_tree"``, ``"ball_tree"``, ``"brute_blas"``
+        or ``"ivf"``.
+    recall_target : float, optional
+        Recall the approximate ``"ivf"`` index is tuned for. With
+        ``"auto"``, None (default) keeps the search exact.
+    tile_mib : float, optional
+        Size bound of a distance tile of ``"brute_blas"`` and ``"ivf"``, in MiB. Defaults to 32.
+    leaf_size : int, optional
+        Leaf size of the trees. Defaults to 30.
+
+    Attributes
+    ----------
+    backend_ : str
+        Backend of the fitted index.
+
+    Examples
+    --------
+    >>> pipe = make_pipeline(StandardScaler(), BackendKNeighborsClassifier(backend = "brute_blas"))
+    """
+
+    def __init__(self, n_neighbors=5, *, weights="uniform", backend="auto", recall_target=None, tile_mib=32,
+                 leaf_size=30):
+        super().__init__(n_neighbors=n_neighbors, weights=weights, algorithm="brute", leaf_size=leaf_size)
+        self.backend = backend
+        self.recall_target = recall_target
+        self.tile_mib = tile_mib
+
+    def index_options(self) -> dict:
+        """Options passed to the backend's index."""
+        return {"recall_target": self.recall_target, "tile_mib": self.tile_mib, "leaf_size": self.leaf_size}
+
+    def fit(self, X, y):
+        super().fit(X, y)
+        self.backend_ = self.backend if self.backend != "auto" else select_backend(
+            *self._fit_X.shape, self.recall_target
+        )
+        self._index = make_index(self.backend_, *self._fit_X.shape, self.n_neighbors, **self.index_options())
+        self._index.fit(self._fit_X)
+        return self
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        """Neighbors of ``X`` from the backend index, like ``KNeighborsClassifier.kneighbors``."""
+        check_is_fitted(self)
+        if X is None:
+            raise ValueError("BackendKNeighborsClassifier.kneighbors needs query rows")
+        X = validate_data(self, X, reset=False, dtype=np.float64)
+        return self._index.kneighbors(X, n_neighbors or self.n_neighbors, return_distance)
+
+    def predict_proba(self, X):
+        """Class probabilities of ``X`` from the votes of its backend neighbors."""
+        dist, ind = self.kneighbors(X)
+        weights = neighbor_weights(dist, self.weights)
+        y = self._y if self.outputs_2d_ else self._y[:, None]
+        classes = self.classes_ if self.outputs_2d_ else [self.classes_]
+        rows = np.repeat(np.arange(len(ind)), ind.shape[1])
+        probabilities = []
+        for k, classes_k in enumerate(classes):
+            votes = np.zeros((len(ind), len(classes_k)))
+            np.add.at(votes, (rows, y[ind, k].ravel()), weights.ravel())
+            normalizer = votes.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0] = 1
+            probabilities.append(votes / normalizer)
+        return probabilities if self.outputs_2d_ else probabilities[0]
+
+    def predict(self, X):
+        """Class of each row of ``X`` with the most votes among its backend neighbors."""
+        probabilities = self.predict_proba(X)
+        if not self.outputs_2d_:
+            return self.classes_[probabilities.argmax(axis=1)]
+        return np.column_stack(
+            [classes_k[proba.argmax(axis=1)] for classes_k, proba in zip(self.classes_, probabilities)]
+        )
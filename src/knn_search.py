@@ -0,0 +1,138 @@
+# src/knn_search.py
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.knn_backends import BackendKNeighborsClassifier, make_index, neighbor_weights
+from src.search_utils import FoldSearchCV, safe_rows
+
+
+def prefix_predictions(indices: np.ndarray, dist: np.ndarray, y_train: np.ndarray, n_classes: int, ks, weights="uniform"):
+    """
+    Predicted class codes for several numbers of neighbors from one neighbor query.
+
+    ``indices`` and ``dist`` are the sorted neighbors of each query row up
+    to ``max(ks)``. Votes are accumulated one neighbor rank at a time, so
+    the prediction for ``k`` neighbors is read off after the ``k``-th rank.
+    Ties go to the lowest class code, as in ``KNeighborsClassifier``.
+
+    Returns
+    -------
+    dict
+        Mapping each ``k`` to the array of predicted class codes.
+    """
+    wanted = set(ks)
+    votes = np.zeros((len(indices), n_classes))
+    rows = np.arange(len(indices))
+    rank_weights = neighbor_weights(dist, weights)
+    labels = y_train[indices]
+    predictions = {}
+    for rank in range(max(ks)):
+        np.add.at(votes, (rows, labels[:, rank]), rank_weights[:, rank])
+        if rank + 1 in wanted:
+            predictions[rank + 1] = votes.argmax(axis=1)
+    return predictions
+
+
+class NeighborGraphSearchCV(FoldSearchCV):
+    """
+    Cross-validated search over ``n_neighbors`` of a KNN pipeline from one neighbor graph per fold.
+
+    ``RandomizedSearchCV`` refits the pipeline and queries the neighbors
+    again for every candidate in every fold. Here each fold fits the
+    preprocessing steps once, queries the ``max(n_neighbors)`` nearest
+    training rows of the validation (and training) rows once, and scores
+    every candidate from prefixes of those sorted neighbor lists. Search
+    cost is then about that of a single candidate. The best candidate is
+    refit on the full data like in ``RandomizedSearchCV``.
+
+    Attributes mirror the sklearn searches used by ``train``:
+    ``cv_results_``, ``best_index_``, ``best_params_``, ``best_score_``
+    and ``best_estimator_``. The shared fit and neighbor query time of a
+    fold is split evenly between the candidates in ``*_fit_time``; the
+    voting time of each candidate is in ``*_score_time``.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Pipeline whose last step is a ``KNeighborsClassifier``. Folds of a
+        ``BackendKNeighborsClassifier`` are queried with its backend.
+    param_grid : dict
+        ``{"<knn step>__n_neighbors": candidates}``; no other parameter
+        may be searched.
+    cv : int or cross-validation generator, optional
+        Folds, as in sklearn searches. Defaults to 5 (stratified).
+    return_train_score : bool, optional
+        Whether to also score the training folds. Defaults to True.
+
+    Examples
+    --------
+    >>> pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    >>> search = NeighborGraphSearchCV(pipe, {"kneighborsclassifier__n_neighbors": range(1, 20)})
+    >>> search.fit(X_train, y_train).best_params_
+    {'kneighborsclassifier__n_neighbors': 7}
+    """
+
+    def _candidates(self):
+        step_name, knn = self.pipeline.steps[-1]
+        if not isinstance(knn, KNeighborsClassifier):
+            raise ValueError(f"The last pipeline step must be a KNeighborsClassifier, got {type(knn).__name__}")
+        param = f"{step_name}__n_neighbors"
+        if set(self.param_grid) != {param}:
+            raise ValueError(f"NeighborGraphSearchCV only searches {param!r}, got {sorted(self.param_grid)}")
+        return param, [int(k) for k in self.param_grid[param]]
+
+    def _fold(self, X, y_codes, train_rows, test_rows):
+        """Fit and score times and test and train scores of every candidate on one fold."""
+        knn = self.pipeline[-1]
+        ks = self._values
+        fit_time = np.zeros(len(ks))
+        score_time = np.zeros(len(ks))
+        test_scores = np.full(len(ks), np.nan)
+        train_scores = np.full(len(ks), np.nan)
+
+        start = time.perf_counter()
+        # A passthrough final step makes the pipeline fit every preprocessing
+        # step through its memory, e.g. a FoldTransformCache
+        preprocessing = clone(self.pipeline[:-1])
+        preprocessing.steps.append(("neighbors", "passthrough"))
+        X_train = preprocessing.fit_transform(safe_rows(X, train_rows), y_codes[train_rows])
+        X_test = preprocessing.transform(safe_rows(X, test_rows))
+        # Candidates asking for more neighbors than training rows fail
+        # like they would in sklearn, with a NaN score
+        feasible = [k for k in ks if k <= len(train_rows)]
+        if not feasible:
+            return fit_time, score_time, test_scores, train_scores
+        if isinstance(knn, BackendKNeighborsClassifier):
+            neighbors = make_index(knn.backend, *X_train.shape, max(feasible), **knn.index_options())
+        else:
+            neighbors = NearestNeighbors(
+                n_neighbors=max(feasible),
+                algorithm=knn.algorithm,
+                leaf_size=knn.leaf_size,
+                metric=knn.metric,
+                p=knn.p,
+                metric_params=knn.metric_params,
+                n_jobs=knn.n_jobs,
+            )
+        neighbors.fit(X_train)
+        queries = [(test_scores, X_test, y_codes[test_rows])]
+        if self.return_train_score:
+            queries.append((train_scores, X_train, y_codes[train_rows]))
+        graphs = [(scores, *neighbors.kneighbors(X_query), y_true) for scores, X_query, y_true in queries]
+        fit_time[:] = (time.perf_counter() - start) / len(ks)
+
+        for scores, dist, indices, y_true in graphs:
+            start = time.perf_counter()
+            predictions = prefix_predictions(
+                indices, dist, y_codes[train_rows], y_codes.max() + 1, feasible, knn.weights
+            )
+            elapsed = (time.perf_counter() - start) / len(feasible)
+            for i, k in enumerate(ks):
+                if k in predictions:
+                    scores[i] = np.mean(predictions[k] == y_true)
+                    score_time[i] += elapsed
+        return fit_time, score_time, test_scores, train_scores
@@ -0,0 +1,122 @@
+# src/load_data.py
+import hashlib
+import io
+import numpy as np
+import pandas as pd
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.columnar import COLUMNAR_SUFFIX, read_columnar
+
+FEATURE_COLUMNS = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+CATEGORICAL_COLUMNS = ["species"]
+IRIS_DTYPES = {**{col: np.float32 for col in FEATURE_COLUMNS}, **{col: "category" for col in CATEGORICAL_COLUMNS}}
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts float64 columns to float32 and string label columns to categorical.
+
+    Columns that cannot be stored compactly, e.g. a feature column holding
+    unparseable strings, are left as they are for validation to report.
+
+    Examples
+    --------
+    >>> compact_dtypes(pd.read_csv("./data/raw/iris.csv")).dtypes
+    sepal_length     float32
+    ...
+    species         category
+    """
+    dtypes = {
+        col: np.float32 if dtype == np.float64 else "category"
+        for col, dtype in df.dtypes.items()
+        if dtype == np.float64 or (col in CATEGORICAL_COLUMNS and dtype == object)
+    }
+    return df.astype(dtypes) if dtypes else df
+
+
+def read_iris(path, columns=None, chunksize: int = None):
+    """
+    Loads iris data with compact dtypes: float32 features and a categorical species.
+
+    This is the loading layer shared by the pipeline stages. Columnar
+    ``.cols`` files are memory-mapped as they are. CSV features are parsed
+    directly as float32, and species as a categorical, i.e. one small
+    integer code per row instead of one Python string, so a frame takes
+    less than half the memory of a default ``pd.read_csv``. If the CSV does
+    not parse with these dtypes, e.g. because of a malformed value, it is
+    read with the default dtypes and compacted where possible, leaving the
+    malformed column for schema validation to report.
+
+    Parameters
+    ----------
+    path : str or path-like
+        A ``.cols`` file written by ``write_columnar``, or a CSV file.
+    columns : list of str, optional
+        Subset of the columns to load. Defaults to all columns.
+    chunksize : int, optional
+        If given, an iterator over frames of this many rows is returned
+        instead of a single frame.
+
+    Returns
+    -------
+    pandas.DataFrame or iterator of pandas.DataFrame
+        The data, or chunks of it when ``chunksize`` is given.
+
+    Examples
+    --------
+    >>> train_df = read_iris("./data/processed/iris_train.cols")
+    >>> raw_df = read_iris("./data/raw/iris.csv")
+    >>> raw_df["species"].dtype
+    CategoricalDtype(categories=['setosa', 'versicolor', 'virginica'], ordered=False, categories_dtype=object)
+    """
+    if os.fspath(path).endswith(COLUMNAR_SUFFIX):
+        df = read_columnar(path, columns=columns)
+        if chunksize is None:
+            return df
+        return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+
+    if chunksize is not None:
+        # Categories are inferred per chunk, so a malformed chunk only
+        # affects itself
+        return (compact_dtypes(chunk) for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize))
+    try:
+        return pd.read_csv(path, usecols=columns, dtype=IRIS_DTYPES)
+    except (ValueError, TypeError):
+        return compact_dtypes(pd.read_csv(path, usecols=columns))
+
+
+def read_appended(path, offset: int, columns, block_size: int):
+    """
+    Reads the complete lines of the CSV file ``path`` after byte ``offset`` in blocks.
+
+    If ``columns`` is None, the line at ``offset`` is read as the header.
+    Yields ``(chunk, end_offset)`` pairs, where ``end_offset`` is the byte
+    position just after the last complete line read so far. A trailing line
+    without a newline is left for the next run, as it may still be growing.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        if columns is None:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return
+            columns = header.decode().strip().split(",")
+            offset += len(header)
+        leftover = b""
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            data = leftover + block
+            cut = data.rfind(b"\n") + 1
+            leftover = data[cut:]
+            if cut:
+                offset += cut
+                yield pd.read_csv(io.BytesIO(data[:cut]), header=None, names=columns), offset
+
+
+def tail_digest(path, offset: int, window: int = 2**16) -> str:
+    """Digest of the ``window`` bytes before ``offset``, used to detect rewrites."""
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - window))
+        return hashlib.blake2b(f.read(min(offset, window))).hexdigest()
@@ -0,0 +1,191 @@
+# src/model_registry.py
+import datetime
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.save_model import MMAP_MODEL_SUFFIX, load_model, save_model
+from src.file_utils import replace_file
+from src.validation_cache import file_digest
+
+_SUFFIXES = {"mmap": MMAP_MODEL_SUFFIX, "pickle": ".pickle"}
+
+
+def _write_json(path, value):
+    """Writes a JSON file atomically."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(value, f, indent=2, default=str)
+    replace_file(tmp_path, path)
+
+
+class ModelRegistry:
+    """
+    Content-addressed store of trained models, with an in-process LRU cache of loaded models.
+
+    ``register`` saves a model with ``save_model`` under the BLAKE2b digest
+    of the saved file, next to a JSON record of the training-data hash, the
+    parameters and the CV scores, and appends it to the versions of a
+    name. Registering an unchanged model again stores nothing new. ``load``
+    returns models by id or by name (the latest version). A model's file is
+    checked against its id before it is loaded. Up to ``max_loaded``
+    deserialized models are kept in memory, so switching between versions
+    does not read, hash or unpickle them again. The cache is safe to use
+    from several threads; loaded models are shared, not copied.
+
+    Parameters
+    ----------
+    registry_dir : str or path-like
+        Directory of the registry. Created if it does not exist.
+    max_loaded : int, optional
+        Number of loaded models kept in memory. Defaults to 8.
+    format : str, optional
+        ``save_model`` format of the artifacts, ``"mmap"`` (default) or
+        ``"pickle"``.
+
+    Examples
+    --------
+    >>> registry = ModelRegistry("./results/models/registry")
+    >>> model_id = registry.register(knn, "knn", data_hash=file_digest(training_data), params=search.best_params_)
+    >>> registry.load("knn").predict(X_test)
+    """
+
+    def __init__(self, registry_dir, max_loaded: int = 8, format: str = "mmap"):
+        if format not in _SUFFIXES:
+            raise ValueError(f"Unknown model format {format!r}, expected 'mmap' or 'pickle'")
+        self.registry_dir = registry_dir
+        self.max_loaded = max_loaded
+        self.format = format
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(registry_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(registry_dir, "names"), exist_ok=True)
+
+    def _object_path(self, model_id, suffix):
+        return os.path.join(self.registry_dir, "objects", f"{model_id}{suffix}")
+
+    def _names_path(self, name):
+        return os.path.join(self.registry_dir, "names", f"{name}.json")
+
+    def register(self, model, name: str, data_hash: str = None, params: dict = None, cv_scores: dict = None) -> str:
+        """
+        Saves a model and its record, and makes it the latest version of ``name``.
+
+        Parameters
+        ----------
+        model : any
+            The trained model.
+        name : str
+            Name the model is a version of, e.g. ``"knn"``.
+        data_hash : str, optional
+            Digest of the training data, e.g. ``file_digest`` of the CSV.
+        params : dict, optional
+            Hyperparameters of the model, e.g. ``best_params_``.
+        cv_scores : dict, optional
+            Cross-validation scores, e.g. ``{"mean_test_score": ...}``.
+
+        Returns
+        -------
+        str
+            The model id, the digest of the saved artifact.
+        """
+        suffix = _SUFFIXES[self.format]
+        objects = os.path.join(self.registry_dir, "objects")
+        fd, tmp_path = tempfile.mkstemp(dir=objects, suffix=suffix)
+        os.close(fd)
+        try:
+            save_model(model, tmp_path, format=self.format)
+            model_id = file_digest(tmp_path)
+            if os.path.exists(self._object_path(model_id, suffix)):
+                os.remove(tmp_path)
+            else:
+                replace_file(tmp_path, self._object_path(model_id, suffix))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        record_path = self._object_path(model_id, ".json")
+        if not os.path.exists(record_path):
+            _write_json(record_path, {
+                "id": model_id,
+                "name": name,
+                "format": self.format,
+                "registered": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "data_hash": data_hash,
+                "params": params or {},
+                "cv_scores": cv_scores or {},
+            })
+        versions = self.versions(name)
+        if not versions or versions[-1] != model_id:
+            _write_json(self._names_path(name), versions + [model_id])
+        return model_id
+
+    def versions(self, name: str) -> list:
+        """Ids of the versions of ``name``, oldest first."""
+        try:
+            with open(self._names_path(name)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def resolve(self, name_or_id: str) -> str:
+        """The model id of an id, or of the latest version of a name."""
+        versions = self.versions(name_or_id)
+        if versions:
+            return versions[-1]
+        if os.path.exists(self._object_path(name_or_id, ".json")):
+            return name_or_id
+        raise KeyError(f"No model or model name {name_or_id!r} in {self.registry_dir}")
+
+    def record(self, name_or_id: str) -> dict:
+        """The record saved with a model: name, data hash, parameters, CV scores..."""
+        with open(self._object_path(self.resolve(name_or_id), ".json")) as f:
+            return json.load(f)
+
+    def load(self, name_or_id: str):
+        """
+        Returns a model by id, or the latest version of a name, loading it only if not in memory.
+
+        Before a model is loaded into memory, its file is hashed again and
+        compared with its id, the digest it was registered under, so a
+        corrupted or replaced artifact is never unpickled or cached. Models
+        already in memory are returned without reading the file.
+
+        Raises
+        ------
+        ValueError
+            If the file of the model no longer has the digest of its id.
+        """
+        model_id = self.resolve(name_or_id)
+        with self._lock:
+            if model_id in self._loaded:
+                self._loaded.move_to_end(model_id)
+                return self._loaded[model_id]
+
+        # Load outside the lock so other models stay available meanwhile
+        record = self.record(model_id)
+        path = self._object_path(model_id, _SUFFIXES[record["format"]])
+        digest = file_digest(path)
+        if digest != model_id:
+            raise ValueError(f"The artifact of model {model_id} is corrupted: its digest is now {digest}")
+        # The digest covers the whole file, so the mmap checksum would only repeat it
+        model = load_model(path, verify=False)
+        with self._lock:
+            model = self._loaded.setdefault(model_id, model)
+            self._loaded.move_to_end(model_id)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return model
+
+    def evict(self, name_or_id: str = None):
+        """Drops one loaded model, or all of them when ``name_or_id`` is None, from memory."""
+        with self._lock:
+            if name_or_id is None:
+                self._loaded.clear()
+            else:
+                self._loaded.pop(self.resolve(name_or_id), None)
@@ -1,8 +1,8 @@
 from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, RandomizedSearchCV
 from sklearn.metrics import confusion_matrix
 import pandas as pd
 import click
@@ -11,43 +11,130 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from src.save_model import save_model
+from src.save_model import MMAP_MODEL_SUFFIX, save_model
+from src.knn_search import NeighborGraphSearchCV
+from src.tree_search import DepthSweepSearchCV
+from src.search_utils import halving_time_report
+from src.search_store import SearchStore, fit_stored_search
+from src.transform_cache import FoldTransformCache
+from src.search_scheduler import fit_searches
+from src.load_data import read_iris
+from src.model_registry import ModelRegistry
+from src.compiled_tree import COMPILED_TREE_SUFFIX, compile_tree
+from src.knn_backends import BACKENDS, BackendKNeighborsClassifier
+from src.validation_cache import file_digest
 
-def train(X_train, y_train, pipeline, param_grid, n_iter = 50, cv = 5):
-    """Function that perform RandomizedSearchCV, fit model to data set, and return both model and the cross-validation dataframe."""
+def make_search(pipeline, param_grid, n_iter = 50, cv = 5, strategy = "random", budget = None, factor = 3):
+    """Function that builds the unfitted search object of a strategy.
+
+    ``strategy`` selects the search engine:
+
+    - ``"random"``: ``RandomizedSearchCV`` over ``n_iter`` candidates.
+    - ``"neighbor_graph"``: ``NeighborGraphSearchCV``, which scores every
+      ``n_neighbors`` candidate of a KNN pipeline from one neighbor query
+      per fold instead of refitting for each of them.
+    - ``"depth_sweep"``: ``DepthSweepSearchCV``, which scores every
+      ``max_depth`` candidate of a decision-tree pipeline from one fully
+      grown tree per fold, truncated at each candidate depth.
+    - ``"halving"``: ``HalvingGridSearchCV``, successive halving on the
+      number of training samples. Every grid point is evaluated on a small
+      sample, and only the best ``1 / factor`` of the candidates go on to
+      the next round with ``factor`` times more samples, up to ``budget``
+      samples (all of the training data when None). Suited to large grids
+      over several parameters, where the other engines do not apply.
+    """
     
-    search = RandomizedSearchCV(
-        pipeline, 
-        param_distributions = param_grid, 
-        n_jobs = -1, 
-        n_iter = n_iter, 
-        cv = cv, 
-        return_train_score = True, 
-        random_state = 123
-    )
+    if strategy == "random":
+        search = RandomizedSearchCV(
+            pipeline, 
+            param_distributions = param_grid, 
+            n_jobs = -1, 
+            n_iter = n_iter, 
+            cv = cv, 
+            return_train_score = True, 
+            random_state = 123
+        )
+    elif strategy == "neighbor_graph":
+        search = NeighborGraphSearchCV(pipeline, param_grid, cv = cv, return_train_score = True)
+    elif strategy == "depth_sweep":
+        search = DepthSweepSearchCV(pipeline, param_grid, cv = cv, return_train_score = True)
+    elif strategy == "halving":
+        search = HalvingGridSearchCV(
+            pipeline,
+            param_grid,
+            factor = factor,
+            max_resources = "auto" if budget is None else budget,
+            min_resources = "exhaust",
+            cv = cv,
+            n_jobs = -1,
+            return_train_score = True,
+            random_state = 123
+        )
+    else:
+        raise ValueError(f"Unknown search strategy {strategy!r}")
+
+    return search
 
-    search.fit(X_train, y_train)
+def result_table(search):
+    """Function that returns the cross-validation dataframe of the five best candidates of a fitted search.
 
-    result_df = pd.DataFrame(search.cv_results_)[[
-        'mean_fit_time', 'mean_score_time', 
+    Every engine returns the same ``cv_results_`` columns, so the table has
+    the same shape whichever is used. When the pipeline fits its
+    transformers through a ``FoldTransformCache``, the table also has the
+    fit seconds the cache saved per candidate and fold,
+    ``mean_fit_time_saved``. For successive halving the table
+    keeps each candidate's last round, ranking the candidates that survived
+    longest first, and the fit and score time spent is printed next to an
+    estimate for the exhaustive search.
+    """
+
+    results = pd.DataFrame(search.cv_results_)
+    if 'iter' in results:
+        report = halving_time_report(search)
+        print(
+            f"Successive halving spent {report['spent']:.2f}s fitting and scoring instead of an estimated "
+            f"{report['exhaustive']:.2f}s for the exhaustive search ({report['saved']:.2f}s saved)"
+        )
+        # Keep the last round of every candidate, the survivors first
+        results = results.sort_values(['iter', 'mean_test_score'], ascending = False)
+        results = results[~results['params'].map(str).duplicated()]
+    else:
+        results = results.sort_values('mean_test_score', ascending = False)
+
+    return results[[
+        'mean_fit_time', *[col for col in ['mean_fit_time_saved'] if col in results], 'mean_score_time', 
         *[col for col in search.cv_results_.keys() if col.startswith('param_')],
         'mean_test_score', 'mean_train_score'
-        ]].sort_values('mean_test_score', ascending = False).head()
-    
-    return search, result_df
+        ]].head()
+
+def train(X_train, y_train, pipeline, param_grid, n_iter = 50, cv = 5, strategy = "random", budget = None, factor = 3, store = None):
+    """Function that perform the search of a strategy, fit model to data set, and return both model and the cross-validation dataframe.
+
+    See ``make_search`` for the strategies and ``result_table`` for the
+    dataframe. ``fit_searches`` fits several searches in one worker pool.
+    Pipelines built with ``memory = FoldTransformCache()`` fit each fold's
+    transformers once for all candidates, and for every other pipeline
+    sharing the cache. With a ``SearchStore``, results already stored for
+    the same data, pipeline and search settings are read back instead of
+    computed, so an interrupted search resumes where it stopped.
+    """
+
+    search = make_search(pipeline, param_grid, n_iter, cv, strategy, budget, factor)
+    fit_stored_search(search, X_train, y_train, store)
+    return search, result_table(search)
 
 @click.command()
 @click.option(
     "--training-data",
     type=str,
-    help="Path to training data",
-    default="./data/processed/iris_train.csv",
+    help="Path to training data (.cols or .csv)",
+    default="./data/processed/iris_train.cols",
 )
 @click.option(
     "--test-data",
     type=str,
-    help="Path to test data",
-    default="./data/processed/iris_test.csv",
+    help="Path to test data (.cols or .csv)",
+    default="./data/processed/iris_test.cols",
 )
 @click.option(
     "--models-to",
@@ -61,8 +148,55 @@ def train(X_train, y_train, pipeline, param_grid, n_iter = 50, cv = 5):
     help="Path to directory where evaluation tables will be written to",
     default="./results/tables",
 )
+@click.option(
+    "--n-jobs",
+    type=int,
+    help="Number of worker processes shared by both model searches (-1 for all CPUs)",
+    default=-1,
+    show_default=True,
+)
+@click.option(
+    "--store-dir",
+    type=str,
+    help="Directory of the search result store; pass an empty string to disable it",
+    default="./results/.cache/search",
+    show_default=True,
+)
+@click.option(
+    "--refresh-store",
+    is_flag=True,
+    help="Discard every stored search result and score all candidates again",
+)
+@click.option(
+    "--model-format",
+    type=click.Choice(["mmap", "pickle", "both"]),
+    help="Format of the saved models: memory-mappable (.mmodel), pickle, or both",
+    default="both",
+    show_default=True,
+)
+@click.option(
+    "--registry-dir",
+    type=str,
+    help="Directory of the content-addressed model registry; pass an empty string to disable it",
+    default="./results/models/registry",
+    show_default=True,
+)
+@click.option(
+    "--knn-backend",
+    type=click.Choice(["auto", *BACKENDS]),
+    help="Neighbor index of the KNN model; auto picks one from the training set size",
+    default="auto",
+    show_default=True,
+)
+@click.option(
+    "--knn-recall-target",
+    type=float,
+    help="Recall the approximate ivf index is tuned for; also lets auto pick it on large training sets",
+    default=None,
+)
 
-def main(training_data, test_data, models_to, tables_to):
+def main(training_data, test_data, models_to, tables_to, n_jobs, store_dir, refresh_store, model_format, registry_dir,
+         knn_backend, knn_recall_target):
 
     # this script is for training model on train set and evaluate model on both train and test set
 
@@ -70,8 +204,8 @@ def main(training_data, test_data, models_to, tables_to):
     os.makedirs(models_to, exist_ok=True)
     os.makedirs(tables_to, exist_ok=True)
 
-    train_df = pd.read_csv(training_data)
-    test_df = pd.read_csv(test_data)
+    train_df = read_iris(training_data)
+    test_df = read_iris(test_data)
 
     X_train = train_df.drop("species", axis=1)
     y_train = train_df["species"]
@@ -79,23 +213,41 @@ def main(training_data, test_data, models_to, tables_to):
     X_test = test_df.drop("species", axis=1)
     y_test = test_df["species"]
 
+    # Folds scored by an earlier, possibly interrupted, run on the same data are reused
+    store = SearchStore(store_dir) if store_dir else None
+    if store is not None and refresh_store:
+        store.invalidate()
+
+    # Both pipelines fit the scaler of each CV fold once, through the shared cache
+    transform_cache = FoldTransformCache()
+
     # Decision Tree
     param_grid = {
         "decisiontreeclassifier__max_depth": range(1, 20)
         }
 
-    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123), memory = transform_cache)
 
-    ds_random_search, ds_result = train(X_train, y_train, pipe, param_grid)
+    ds_random_search = make_search(pipe, param_grid, strategy = "depth_sweep")
     
     #KNN
     param_grid = {
         "kneighborsclassifier__n_neighbors": range(1,20)
         }
 
-    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    # named like make_pipeline(StandardScaler(), KNeighborsClassifier()), keeping the grid and table columns
+    knn_classifier = BackendKNeighborsClassifier(backend = knn_backend, recall_target = knn_recall_target)
+    pipe = Pipeline(
+        [("standardscaler", StandardScaler()), ("kneighborsclassifier", knn_classifier)],
+        memory = transform_cache
+    )
+
+    knn_random_search = make_search(pipe, param_grid, strategy = "neighbor_graph")
 
-    knn_random_search, knn_result = train(X_train, y_train, pipe, param_grid)
+    # Both searches share one worker pool and one copy of the training data
+    fit_searches([ds_random_search, knn_random_search], X_train, y_train, n_jobs = n_jobs, store = store)
+    ds_result = result_table(ds_random_search)
+    knn_result = result_table(knn_random_search)
 
     #save decisiontree cross val result to table
     ds_result.to_csv(os.path.join(tables_to, "ds_results.csv"), index=False)
@@ -103,15 +255,36 @@ def main(training_data, test_data, models_to, tables_to):
     #save knn cross val result to table
     knn_result.to_csv(os.path.join(tables_to, "knn_results.csv"), index=False)
 
-    #assign best model
-    decision_tree = ds_random_search.best_estimator_
-    knn = knn_random_search.best_estimator_
+    #assign best model, detached from the transform cache
+    decision_tree = ds_random_search.best_estimator_.set_params(memory = None)
+    knn = knn_random_search.best_estimator_.set_params(memory = None)
+
+    #save decision_tree and knn_classifier models into the results/models file
+    for model, name in [(decision_tree, "decision_tree"), (knn, "knn")]:
+        if model_format in ("pickle", "both"):
+            save_model(model, f"{models_to}/{name}.pickle")
+        if model_format in ("mmap", "both"):
+            save_model(model, f"{models_to}/{name}{MMAP_MODEL_SUFFIX}", format = "mmap")
 
-    #save decision_tree model into the results/models file
-    save_model(decision_tree, f"{models_to}/decision_tree.pickle")
+    # array-based decision tree with the scaler folded in, for low-latency batch prediction
+    compile_tree(decision_tree).save(f"{models_to}/decision_tree{COMPILED_TREE_SUFFIX}")
 
-    #save knn_classifier_model results/models file
-    save_model(knn, f"{models_to}/knn.pickle")
+    # every trained version is also kept in the registry, with its data hash, parameters and CV scores
+    if registry_dir:
+        registry = ModelRegistry(registry_dir)
+        data_hash = file_digest(training_data)
+        for search, name in [(ds_random_search, "decision_tree"), (knn_random_search, "knn")]:
+            model_id = registry.register(
+                search.best_estimator_,
+                name,
+                data_hash = data_hash,
+                params = search.best_params_,
+                cv_scores = {
+                    "mean_test_score": float(search.best_score_),
+                    "mean_train_score": float(search.cv_results_["mean_train_score"][search.best_index_]),
+                },
+            )
+            print(f"Registered {name} as {model_id}")
 
     # Test on test set for both classification mode
 
@@ -0,0 +1,405 @@
+# src/prediction_server.py
+# Serves the saved models over HTTP, batching concurrent requests together
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+import numpy as np
+import pandas as pd
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.compiled_tree import COMPILED_TREE_SUFFIX, CompiledTree
+from src.save_model import load_model
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class ServingStats:
+    """
+    Latency and throughput counters of a served model.
+
+    Latencies of the last ``window`` requests give the percentiles;
+    counters cover the whole uptime.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def record_request(self, seconds: float, n_rows: int):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += n_rows
+
+    def snapshot(self) -> dict:
+        """Current counters, with latency percentiles in milliseconds."""
+        uptime = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (None, None)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_rows": self.rows / self.batches if self.batches else None,
+            "latency_p50_ms": p50,
+            "latency_p99_ms": p99,
+            "requests_per_s": self.requests / uptime,
+            "rows_per_s": self.rows / uptime,
+            "uptime_s": uptime,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into batches.
+
+    The first request waiting starts a batch, which takes every request
+    arriving within ``max_wait_ms`` of it, until ``max_batch_rows`` rows
+    are collected; a single larger request is predicted on its own. One
+    batch is predicted at a time, in a worker thread, so the event loop
+    keeps reading requests, which form the next batch.
+
+    Parameters
+    ----------
+    predict : callable
+        Predicts a 2D float array of rows, returning one prediction per row.
+    max_batch_rows : int, optional
+        Rows at which a batch is closed. Defaults to 256.
+    max_wait_ms : float, optional
+        Longest a request waits for others to join its batch. Defaults to 2.
+    stats : ServingStats, optional
+        Counters updated with every batch.
+    """
+
+    def __init__(self, predict, max_batch_rows: int = 256, max_wait_ms: float = 2.0, stats: ServingStats = None):
+        self.predict_rows = predict
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+        self.stats = stats if stats is not None else ServingStats()
+        self._queue = asyncio.Queue()
+        # A request too large to join the last batch starts the next one
+        self._carried = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def predict(self, rows: np.ndarray) -> np.ndarray:
+        """Predictions for ``rows``, computed within a batch."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((rows, future))
+        return await future
+
+    async def _collect(self):
+        """Waits for a request, then for the others joining its batch."""
+        loop = asyncio.get_running_loop()
+        if self._carried is not None:
+            batch, self._carried = [self._carried], None
+        else:
+            batch = [await self._queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait_ms / 1e3
+        while n_rows < self.max_batch_rows:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if n_rows + len(item[0]) > self.max_batch_rows:
+                self._carried = item
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    async def run(self):
+        """Predicts batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await self._collect()
+                X = np.concatenate([rows for rows, _ in batch])
+                self.stats.batches += 1
+                try:
+                    predictions = await loop.run_in_executor(self._executor, self.predict_rows, X)
+                except Exception as error:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                offsets = np.cumsum([0] + [len(rows) for rows, _ in batch])
+                for (rows, future), start, stop in zip(batch, offsets[:-1], offsets[1:]):
+                    if not future.done():
+                        future.set_result(predictions[start:stop])
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+class ServedModel:
+    """A model with the column order of its rows and its batcher."""
+
+    def __init__(self, model, max_batch_rows: int = 256, max_wait_ms: float = 2.0):
+        self.model = model
+        names = getattr(model, "feature_names_in_", None)
+        self.feature_names = None if names is None else [str(name) for name in names]
+        self.n_features = len(self.feature_names) if names is not None else model.n_features_in_
+        self.stats = ServingStats()
+        self.batcher = MicroBatcher(self._predict, max_batch_rows, max_wait_ms, self.stats)
+
+    def _predict(self, X):
+        if isinstance(self.model, CompiledTree) or self.feature_names is None:
+            return self.model.predict(X)
+        return self.model.predict(pd.DataFrame(X, columns=self.feature_names))
+
+    def parse_rows(self, rows) -> np.ndarray:
+        """
+        Rows of a request as a 2D float array in the model's column order.
+
+        Rows are lists of feature values in that order, or objects mapping
+        feature names to values.
+
+        Raises
+        ------
+        ValueError
+            If the rows do not have the model's features.
+        """
+        if isinstance(rows, list) and rows and isinstance(rows[0], dict):
+            if self.feature_names is None:
+                raise ValueError("This model takes rows as lists of feature values")
+            try:
+                rows = [[row[name] for name in self.feature_names] for row in rows]
+            except (KeyError, TypeError) as error:
+                raise ValueError(f"Rows must have the features {self.feature_names}") from error
+        try:
+            X = np.asarray(rows, dtype=np.float64)
+        except (TypeError, ValueError) as error:
+            raise ValueError("Rows must be numbers") from error
+        if X.ndim != 2 or X.shape[1] != self.n_features or len(X) == 0:
+            raise ValueError(f"Expected a non-empty list of rows of {self.n_features} features")
+        return X
+
+
+def load_models(models_dir, names, compiled_tree: bool = False) -> dict:
+    """
+    Loads the saved models to serve, once.
+
+    Parameters
+    ----------
+    models_dir : str
+        Directory of the ``{name}.pickle`` files written by training.
+    names : list of str
+        Models to load, e.g. ``["decision_tree", "knn"]``.
+    compiled_tree : bool, optional
+        Whether to serve ``decision_tree`` from its compiled ``.npz`` form.
+
+    Returns
+    -------
+    dict
+        Mapping each name to its model.
+    """
+    models = {}
+    for name in names:
+        if compiled_tree and name == "decision_tree":
+            models[name] = CompiledTree.load(os.path.join(models_dir, f"{name}{COMPILED_TREE_SUFFIX}"))
+        else:
+            models[name] = load_model(os.path.join(models_dir, f"{name}.pickle"))
+    return models
+
+
+async def read_request(reader):
+    """Reads one HTTP/1.1 request; returns None at the end of the connection."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode("latin-1").split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, version, headers, body
+
+
+def write_response(writer, status: int, payload: dict, close: bool = False):
+    """Writes a JSON HTTP/1.1 response."""
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class PredictionServer:
+    """
+    HTTP server predicting with micro-batched models.
+
+    Routes:
+
+    - ``POST /predict/<model>`` with ``{"rows": [...]}`` returns
+      ``{"predictions": [...]}``, one per row.
+    - ``GET /stats`` returns the ``ServingStats`` of every model.
+    - ``GET /health`` returns the served model names.
+
+    Connections are kept alive, so clients can send requests one after
+    another on the same connection. Start it with ``serve``.
+
+    Parameters
+    ----------
+    models : dict
+        Mapping names to fitted models, e.g. from ``load_models``.
+    max_batch_rows, max_wait_ms :
+        Batching settings of every model, see ``MicroBatcher``.
+
+    Examples
+    --------
+    >>> server = PredictionServer(load_models("./results/models", ["knn"]))
+    >>> asyncio.run(server.serve(port = 8000))
+    """
+
+    def __init__(self, models: dict, max_batch_rows: int = 256, max_wait_ms: float = 2.0):
+        self.models = {name: ServedModel(model, max_batch_rows, max_wait_ms) for name, model in models.items()}
+
+    async def _respond(self, method, path, body):
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "models": sorted(self.models)}
+        if path == "/stats" and method == "GET":
+            return 200, {name: served.stats.snapshot() for name, served in self.models.items()}
+        if not path.startswith("/predict/"):
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Predictions are requested with POST"}
+        served = self.models.get(path[len("/predict/"):])
+        if served is None:
+            return 404, {"error": f"Unknown model, expected one of {sorted(self.models)}"}
+
+        start = time.perf_counter()
+        try:
+            X = served.parse_rows(json.loads(body)["rows"])
+        except (ValueError, KeyError, TypeError) as error:
+            served.stats.errors += 1
+            return 400, {"error": str(error) or "Expected a JSON body with rows"}
+        try:
+            predictions = await served.batcher.predict(X)
+        except Exception as error:
+            served.stats.errors += 1
+            return 500, {"error": repr(error)}
+        served.stats.record_request(time.perf_counter() - start, len(X))
+        return 200, {"predictions": predictions.tolist()}
+
+    async def handle(self, reader, writer):
+        """Answers the requests of one connection."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (asyncio.IncompleteReadError, ValueError):
+                    write_response(writer, 400, {"error": "Malformed request"}, close=True)
+                    break
+                if request is None:
+                    break
+                method, path, version, headers, body = request
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                status, payload = await self._respond(method, path, body)
+                write_response(writer, status, payload, close)
+                await writer.drain()
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000, unix_socket: str = None):
+        """Starts the batchers and listens on a TCP port, or on a Unix socket if given."""
+        self._batchers = [asyncio.create_task(served.batcher.run()) for served in self.models.values()]
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server
+
+    async def stop(self):
+        """Stops listening and the batchers."""
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._batchers:
+            task.cancel()
+        await asyncio.gather(*self._batchers, return_exceptions=True)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000, unix_socket: str = None):
+        """Serves until cancelled."""
+        server = await self.start(host, port, unix_socket)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+async def request_json(reader, writer, method: str, path: str, payload: dict = None):
+    """
+    Sends one request on an open connection and returns the status and JSON answer.
+
+    Examples
+    --------
+    >>> reader, writer = await asyncio.open_connection("127.0.0.1", 8000)
+    >>> await request_json(reader, writer, "POST", "/predict/knn", {"rows": [[5.1, 3.5, 1.4, 0.2]]})
+    (200, {'predictions': ['setosa']})
+    """
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    answer = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split()[1]), json.loads(answer)
+
+
+@click.command()
+@click.option("--models-dir", type=str, default="./results/models", show_default=True,
+              help="Directory of the saved models")
+@click.option("--model", "names", type=str, multiple=True, default=["decision_tree", "knn"], show_default=True,
+              help="Model to serve; repeat for several")
+@click.option("--host", type=str, default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option("--port", type=int, default=8000, show_default=True, help="TCP port to listen on")
+@click.option("--unix-socket", type=str, default=None, help="Listen on this Unix socket instead of a TCP port")
+@click.option("--max-batch-rows", type=int, default=256, show_default=True, help="Rows at which a batch is closed")
+@click.option("--max-wait-ms", type=float, default=2.0, show_default=True,
+              help="Longest a request waits for others to join its batch")
+@click.option("--compiled-tree", is_flag=True, help="Serve decision_tree from its compiled .npz form")
+def main(models_dir, names, host, port, unix_socket, max_batch_rows, max_wait_ms, compiled_tree):
+    server = PredictionServer(load_models(models_dir, names, compiled_tree), max_batch_rows, max_wait_ms)
+    where = unix_socket or f"http://{host}:{port}"
+    print(f"Serving {', '.join(names)} on {where} (batches of up to {max_batch_rows} rows, {max_wait_ms} ms wait)")
+    try:
+        asyncio.run(server.serve(host, port, unix_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,26 @@
 # src/save_model.py
+import hashlib
+import json
+import mmap
 import pickle
 import os
+import sys
+import tempfile
 
-def save_model(model, path):
+import sklearn
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+
+MODEL_MAGIC = b"IRISMDL1"
+ALIGNMENT = 64
+MMAP_MODEL_SUFFIX = ".mmodel"
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_model(model, path, format = "pickle"):
     """
     This function saves the best model after optimizing its hyperparameters during training using pickle.
 
@@ -15,6 +33,10 @@ def save_model(model, path):
         The optimized trained model. After model.best_estimator_
     path : str
         The file path where the model is saved to. Usually it is models_to.
+    format : str, optional
+        ``"pickle"`` (default) for a plain pickle, or ``"mmap"`` for the
+        memory-mappable format of ``write_mmap_model``, conventionally with
+        the ``.mmodel`` suffix. ``load_model`` reads both.
 
     Returns
     -------
@@ -28,5 +50,141 @@ def save_model(model, path):
     """
     
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, 'wb') as f:
-        pickle.dump(model, f)
+    if format == "mmap":
+        write_mmap_model(model, path)
+    elif format == "pickle":
+        with open(path, 'wb') as f:
+            pickle.dump(model, f)
+    else:
+        raise ValueError(f"Unknown model format {format!r}, expected 'pickle' or 'mmap'")
+
+
+def write_mmap_model(model, path):
+    """
+    Writes a model to a single file whose arrays can be memory-mapped on load.
+
+    The model is pickled with protocol 5, which hands the raw memory of
+    every NumPy array (KNN training data and its tree index, tree node
+    arrays, scaler statistics...) to the writer instead of copying it into
+    the pickle stream. The file starts with a JSON header holding the
+    offsets and sizes of the pickle stream and of each array buffer, a
+    BLAKE2b checksum of both and the sklearn version, followed by the
+    stream and one 64-byte aligned buffer per array. The file is written to
+    a temporary name and renamed, so readers never see a partial file.
+
+    Parameters
+    ----------
+    model : any
+        The model to save, e.g. a fitted pipeline.
+    path : str or path-like
+        Destination file, conventionally with the ``.mmodel`` suffix.
+
+    Examples
+    --------
+    >>> write_mmap_model(knn_search.best_estimator_, "./results/models/knn.mmodel")
+    """
+    buffers = []
+    stream = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+    buffers = [buffer.raw() for buffer in buffers]
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(stream)
+    offset = _aligned(len(stream))
+    layout = []
+    for buffer in buffers:
+        digest.update(buffer)
+        layout.append([offset, buffer.nbytes])
+        offset = _aligned(offset + buffer.nbytes)
+    header = json.dumps({
+        "stream_length": len(stream),
+        "buffers": layout,
+        "checksum": digest.hexdigest(),
+        "sklearn_version": sklearn.__version__,
+    }).encode()
+    data_start = _aligned(len(MODEL_MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.fspath(path)) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MODEL_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.seek(data_start)
+            f.write(stream)
+            for (buffer_offset, _), buffer in zip(layout, buffers):
+                f.seek(data_start + buffer_offset)
+                f.write(buffer)
+            f.truncate(data_start + offset)
+        replace_file(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_mmap_model(path, verify = True):
+    """
+    Loads a model written by ``write_mmap_model`` without copying its arrays.
+
+    The file is mapped read-only and the arrays of the model are views of
+    the mapping, so loading takes about the time to unpickle the small
+    stream, and processes loading the same file share its pages through
+    the page cache instead of each holding a private copy. The arrays are
+    read-only. Sklearn's tree estimators still copy their node arrays into
+    memory they own.
+
+    Parameters
+    ----------
+    path : str or path-like
+        A ``.mmodel`` file.
+    verify : bool, optional
+        Whether to check the checksum first, which reads the whole file.
+        Defaults to True; processes loading a file already verified can
+        skip it.
+
+    Returns
+    -------
+    any
+        The model.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a model file or fails the checksum.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MODEL_MAGIC)) != MODEL_MAGIC:
+            raise ValueError(f"{path} is not a memory-mapped model file")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    data_start = _aligned(len(MODEL_MAGIC) + 8 + header_length)
+    stream = view[data_start:data_start + header["stream_length"]]
+    buffers = [view[data_start + offset:data_start + offset + nbytes] for offset, nbytes in header["buffers"]]
+    if verify:
+        digest = hashlib.blake2b(digest_size=20)
+        for buffer in [stream, *buffers]:
+            digest.update(buffer)
+        if digest.hexdigest() != header["checksum"]:
+            raise ValueError(f"Checksum mismatch for {path}")
+    return pickle.loads(stream, buffers=buffers)
+
+
+def load_model(path, verify = True):
+    """
+    Loads a model saved by ``save_model`` in either format.
+
+    Files with the ``.mmodel`` suffix are read with ``read_mmap_model``,
+    anything else is unpickled.
+
+    Examples
+    --------
+    >>> knn = load_model("./results/models/knn.mmodel")
+    """
+    if os.fspath(path).endswith(MMAP_MODEL_SUFFIX):
+        return read_mmap_model(path, verify)
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,161 @@
+# src/search_scheduler.py
+import copy
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.search_store import fit_stored_search
+from src.search_utils import FoldSearchCV
+
+
+def _shared_fold(search, train_rows, test_rows, x_name: str, shape: tuple, dtype: str, y_name: str):
+    """Worker side of ``fit_searches``: scores the candidates of ``search`` on one fold of the shared data."""
+    # Workers share the parent's resource tracker, which unlinks the segments
+    # only if the parent dies without doing it
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    y_shm = shared_memory.SharedMemory(name=y_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=x_shm.buf)
+    y_codes = np.ndarray(shape[0], dtype=np.int64, buffer=y_shm.buf)
+    try:
+        return search._run_fold(X, y_codes, train_rows, test_rows)
+    finally:
+        del X, y_codes
+        x_shm.close()
+        y_shm.close()
+
+
+def _candidate_chunk(search, chunk):
+    """A copy of a planned search scoring only the candidates at positions ``chunk``."""
+    part = copy.copy(search)
+    part._values = [search._values[i] for i in chunk]
+    return part
+
+
+def _merge_chunks(results: list):
+    """Joins the ``_run_fold`` results of consecutive candidate chunks of one fold."""
+    *parts, saved = zip(*results)
+    return (
+        *(np.concatenate(part) for part in parts),
+        None if None in saved else sum(saved),
+    )
+
+
+def fit_searches(searches: list, X, y, n_jobs: int = -1, store=None, pool=None) -> list:
+    """
+    Fits several searches on the same data with one shared worker pool.
+
+    The fold tasks of every ``FoldSearchCV`` engine, across all model
+    families, go to a single process pool. A task scores one chunk of
+    consecutive candidates of one search on one fold. The candidates are
+    split into as many chunks as it takes to give every worker a task, so
+    a few folds can still use many cores; a chunk only grows its fold's
+    model as far as its own candidates need. ``X`` and the target codes
+    are copied once into shared memory, and workers map them instead of
+    unpickling a copy per task. A ``FoldTransformCache`` only saves fits
+    within a task there, since a pickled cache starts empty. Other
+    searches (``RandomizedSearchCV``, halving) are fitted in the parent
+    with their own ``n_jobs`` while the pool works. The best candidate of
+    each search is refit in the parent on ``X``. With a ``SearchStore``,
+    stored folds are not scored again, and each scored fold is stored as
+    soon as all its chunks complete.
+
+    Workers see ``X`` as a plain array, so pipelines must not select
+    columns by name.
+
+    Parameters
+    ----------
+    searches : list
+        Unfitted search objects, all fitted on ``X`` and ``y``.
+    X : pandas.DataFrame or numpy.ndarray
+        Training features.
+    y : array-like
+        Training target.
+    n_jobs : int, optional
+        Number of worker processes; -1 uses every CPU and 1 fits every
+        fold in the parent. A new pool gets no more workers than tasks.
+        Defaults to -1.
+    store : SearchStore, optional
+        Store to resume the searches from and record them in.
+    pool : concurrent.futures.ProcessPoolExecutor, optional
+        Running pool to submit the tasks to instead of starting one, e.g.
+        to reuse its workers across calls. It is left running; ``n_jobs``
+        should be its number of workers.
+
+    Returns
+    -------
+    list
+        The fitted searches, in input order.
+
+    Examples
+    --------
+    >>> tree = DepthSweepSearchCV(tree_pipe, {"decisiontreeclassifier__max_depth": range(1, 20)})
+    >>> knn = NeighborGraphSearchCV(knn_pipe, {"kneighborsclassifier__n_neighbors": range(1, 20)})
+    >>> with ProcessPoolExecutor(max_workers=8) as pool:
+    ...     tree, knn = fit_searches([tree, knn], X_train, y_train, n_jobs=8, pool=pool)
+    """
+    n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+    pooled = [search for search in searches if isinstance(search, FoldSearchCV)]
+    if (n_jobs == 1 and pool is None) or not pooled:
+        return [fit_stored_search(search, X, y, store) for search in searches]
+
+    plans = [search._plan(X, y) for search in pooled]
+    keys = [store.key(search, X, y) if store is not None else None for search in pooled]
+    folds = [
+        [store.load_fold(key, split, search._values) if store is not None else None for split in range(len(plan))]
+        for search, plan, key in zip(pooled, plans, keys)
+    ]
+    missing = [(i, split) for i, fold_results in enumerate(folds) for split, fold in enumerate(fold_results)
+               if fold is None]
+    # Enough candidate chunks per missing fold to keep every worker busy
+    n_chunks = -(-n_jobs // max(len(missing), 1))
+    tasks = [
+        (i, split, chunk)
+        for i, split in missing
+        for chunk in np.array_split(np.arange(len(pooled[i]._values)), min(n_chunks, len(pooled[i]._values)))
+    ]
+    values = np.ascontiguousarray(X)
+    y_codes = np.unique(np.asarray(y), return_inverse=True)[1].astype(np.int64)
+
+    x_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    y_shm = shared_memory.SharedMemory(create=True, size=max(y_codes.nbytes, 1))
+    own_pool = None
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=x_shm.buf)[:] = values
+        np.ndarray(y_codes.shape, dtype=np.int64, buffer=y_shm.buf)[:] = y_codes
+        if pool is None and tasks:
+            pool = own_pool = ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)))
+        futures = {
+            pool.submit(
+                _shared_fold, _candidate_chunk(pooled[i], chunk), *plans[i][split],
+                x_shm.name, values.shape, values.dtype.str, y_shm.name,
+            ): (i, split, position)
+            for position, (i, split, chunk) in enumerate(tasks)
+        }
+        for search in searches:
+            if not isinstance(search, FoldSearchCV):
+                fit_stored_search(search, X, y, store)
+        n_fold_chunks = Counter((i, split) for i, split, _ in tasks)
+        chunks = {}
+        for future in as_completed(futures):
+            i, split, position = futures[future]
+            done = chunks.setdefault((i, split), {})
+            done[position] = future.result()
+            if len(done) == n_fold_chunks[i, split]:
+                folds[i][split] = _merge_chunks([done[position] for position in sorted(done)])
+                if store is not None:
+                    store.save_fold(keys[i], split, pooled[i]._values, folds[i][split])
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+        x_shm.close()
+        x_shm.unlink()
+        y_shm.close()
+        y_shm.unlink()
+
+    for search, fold_results in zip(pooled, folds):
+        search._finish(X, y, fold_results)
+    return searches
@@ -0,0 +1,185 @@
+# src/search_store.py
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+from sklearn.base import clone
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+from src.search_utils import FoldSearchCV, fit_reporting_cache
+from src.transform_cache import data_key
+
+# Search parameters that change how a search runs, not what it computes
+_EXECUTION_PARAMS = {"estimator", "pipeline", "n_jobs", "verbose", "pre_dispatch", "error_score"}
+
+
+def pipeline_definition(pipeline) -> dict:
+    """
+    The steps and parameters of an unfitted pipeline, without its ``memory``.
+
+    Examples
+    --------
+    >>> pipeline_definition(make_pipeline(StandardScaler(), KNeighborsClassifier()))["steps"]
+    [['standardscaler', 'StandardScaler'], ['kneighborsclassifier', 'KNeighborsClassifier']]
+    """
+    params = pipeline.get_params(deep=True)
+    return {
+        "steps": [[name, type(step).__qualname__ if step != "passthrough" else step] for name, step in pipeline.steps],
+        "params": {name: value for name, value in params.items() if "__" in name},
+    }
+
+
+def search_key(search, X, y) -> str:
+    """
+    Builds the store key of a search on some data.
+
+    The key covers the content of ``X`` and ``y``, the search engine and
+    its settings (grid, folds, number of candidates...) and the pipeline
+    definition; the candidate values and fold indices key the records
+    stored under it. The pipeline's ``memory`` and the search's
+    ``n_jobs`` do not change results and are left out.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the search.
+    """
+    pipeline = getattr(search, "pipeline", getattr(search, "estimator", None))
+    settings = {name: value for name, value in search.get_params(deep=False).items() if name not in _EXECUTION_PARAMS}
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(data_key(X, y).encode())
+    digest.update(json.dumps(
+        {"engine": type(search).__qualname__, "settings": settings, "pipeline": pipeline_definition(pipeline)},
+        sort_keys=True,
+        default=str,
+    ).encode())
+    return digest.hexdigest()
+
+
+class SearchStore:
+    """
+    Persistent store of hyperparameter search results.
+
+    Searches built on ``FoldSearchCV`` store one record per candidate and
+    fold as soon as the fold is scored, so a search that is interrupted
+    resumes with the folds still missing, and a repeated search on
+    unchanged data only refits its best candidate. Records of a search
+    live in a directory named after ``search_key``, one file per fold,
+    written atomically. Other sklearn searches are stored whole once they
+    finish.
+
+    Parameters
+    ----------
+    store_dir : str or path-like
+        Directory holding the stored searches. Created if it does not exist.
+
+    Examples
+    --------
+    >>> store = SearchStore("./results/.cache/search")
+    >>> search, result = train(X_train, y_train, pipe, param_grid, strategy = "depth_sweep", store = store)
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+    def key(self, search, X, y) -> str:
+        """The ``search_key`` of a search on some data."""
+        return search_key(search, X, y)
+
+    def _path(self, key, name):
+        return os.path.join(self.store_dir, key, f"{name}.pkl")
+
+    def _load(self, key, name):
+        try:
+            with open(self._path(key, name), "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _save(self, key, name, value):
+        directory = os.path.join(self.store_dir, key)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        replace_file(tmp_path, self._path(key, name))
+
+    def load_fold(self, key, fold: int, values: list):
+        """
+        Returns a fold's ``_run_fold`` result assembled from the stored records of ``values``.
+
+        Returns None unless every candidate value has a record for the fold.
+        """
+        records = self._load(key, f"fold{fold}") or {}
+        try:
+            rows = [records[json.dumps(value)] for value in values]
+        except KeyError:
+            return None
+        fit_time, score_time, test_scores, train_scores, saved = (np.array(column) for column in zip(*rows))
+        return fit_time, score_time, test_scores, train_scores, None if np.isnan(saved).any() else saved.sum()
+
+    def save_fold(self, key, fold: int, values: list, result):
+        """Stores one record per candidate value from a fold's ``_run_fold`` result, keeping other records."""
+        fit_time, score_time, test_scores, train_scores, saved = result
+        records = self._load(key, f"fold{fold}") or {}
+        for i, value in enumerate(values):
+            records[json.dumps(value)] = (
+                fit_time[i], score_time[i], test_scores[i], train_scores[i],
+                np.nan if saved is None else saved / len(values),
+            )
+        self._save(key, f"fold{fold}", records)
+
+    def load_results(self, key):
+        """Returns the stored ``cv_results_`` of a whole search, or None."""
+        return self._load(key, "cv_results")
+
+    def save_results(self, key, cv_results: dict):
+        """Stores the ``cv_results_`` of a whole search."""
+        self._save(key, "cv_results", cv_results)
+
+    def invalidate(self, key=None):
+        """Removes one stored search, or all of them when ``key`` is None."""
+        keys = [key] if key is not None else os.listdir(self.store_dir)
+        for k in keys:
+            with contextlib.suppress(FileNotFoundError):
+                shutil.rmtree(os.path.join(self.store_dir, k))
+
+
+def fit_stored_search(search, X, y, store: SearchStore = None):
+    """
+    Fits a search, or restores it from ``store`` if it already ran on the same data.
+
+    ``FoldSearchCV`` engines resume fold by fold. Other sklearn searches
+    are restored whole: they get the stored ``cv_results_`` and the
+    ``best_index_``, ``best_params_``, ``best_score_`` and refit
+    ``best_estimator_`` they imply, like a fitted one.
+    """
+    if isinstance(search, FoldSearchCV):
+        return search.fit(X, y, store=store)
+    if store is None:
+        return fit_reporting_cache(search, X, y)
+    key = search_key(search, X, y)
+    cv_results = store.load_results(key)
+    if cv_results is None:
+        fit_reporting_cache(search, X, y)
+        store.save_results(key, search.cv_results_)
+        return search
+
+    search.cv_results_ = cv_results
+    search.n_splits_ = sum(name.startswith("split") and name.endswith("_test_score") for name in cv_results)
+    # Successive halving picks the best candidate of its last round
+    last_round = np.asarray(cv_results.get("iter", np.zeros(len(cv_results["params"]))))
+    scores = np.asarray(cv_results["mean_test_score"], dtype=float)
+    scores = np.where((last_round == last_round.max()) & ~np.isnan(scores), scores, -np.inf)
+    search.best_index_ = int(np.argmax(scores))
+    search.best_params_ = cv_results["params"][search.best_index_]
+    search.best_score_ = cv_results["mean_test_score"][search.best_index_]
+    search.best_estimator_ = clone(search.estimator).set_params(**search.best_params_).fit(X, y)
+    return search
@@ -0,0 +1,210 @@
+# src/search_utils.py
+import hashlib
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.model_selection import check_cv
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.transform_cache import FoldTransformCache, data_key
+
+
+def safe_rows(X, rows):
+    """Selects rows by position from a DataFrame or an array."""
+    return X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+
+
+def rank_scores(mean_test: np.ndarray) -> np.ndarray:
+    """Ranks candidates like sklearn searches: ties share the best rank, NaN scores come last."""
+    order = np.where(np.isnan(mean_test), -np.inf, mean_test)
+    return np.array([1 + np.sum(order > value) for value in order], dtype=np.int32)
+
+
+def build_cv_results(param: str, values, fit_time, score_time, test_scores, train_scores=None, fit_time_saved=None) -> dict:
+    """
+    Assembles a ``cv_results_`` dict with the keys of sklearn's searches for a single searched parameter.
+
+    Parameters
+    ----------
+    param : str
+        Name of the searched parameter, e.g. ``"kneighborsclassifier__n_neighbors"``.
+    values : list
+        The candidate values, in candidate order.
+    fit_time, score_time, test_scores : numpy.ndarray
+        ``(n_candidates, n_splits)`` arrays of times and validation scores.
+    train_scores : numpy.ndarray, optional
+        ``(n_candidates, n_splits)`` training scores. Omitted when None.
+    fit_time_saved : numpy.ndarray, optional
+        ``(n_candidates, n_splits)`` fit seconds saved by a
+        ``FoldTransformCache``, reported as ``mean_fit_time_saved``.
+        Omitted when None.
+
+    Returns
+    -------
+    dict
+        The ``cv_results_`` dict.
+    """
+    n_splits = test_scores.shape[1]
+    mean_test = test_scores.mean(axis=1)
+    cv_results = {
+        "mean_fit_time": fit_time.mean(axis=1),
+        **({} if fit_time_saved is None else {"mean_fit_time_saved": fit_time_saved.mean(axis=1)}),
+        "std_fit_time": fit_time.std(axis=1),
+        "mean_score_time": score_time.mean(axis=1),
+        "std_score_time": score_time.std(axis=1),
+        f"param_{param}": np.array(values, dtype=object),
+        "params": [{param: value} for value in values],
+        **{f"split{i}_test_score": test_scores[:, i] for i in range(n_splits)},
+        "mean_test_score": mean_test,
+        "std_test_score": test_scores.std(axis=1),
+        "rank_test_score": rank_scores(mean_test),
+    }
+    if train_scores is not None:
+        cv_results.update({
+            **{f"split{i}_train_score": train_scores[:, i] for i in range(n_splits)},
+            "mean_train_score": train_scores.mean(axis=1),
+            "std_train_score": train_scores.std(axis=1),
+        })
+    return cv_results
+
+
+def refit_best(search, X, y):
+    """Sets ``best_index_``, ``best_params_``, ``best_score_`` and a refit ``best_estimator_`` from ``search.cv_results_``."""
+    search.best_index_ = int(np.argmin(search.cv_results_["rank_test_score"]))
+    search.best_params_ = search.cv_results_["params"][search.best_index_]
+    search.best_score_ = search.cv_results_["mean_test_score"][search.best_index_]
+    search.best_estimator_ = clone(search.pipeline).set_params(**search.best_params_).fit(X, y)
+    return search
+
+
+def transform_cache_of(estimator):
+    """The ``FoldTransformCache`` a pipeline, or the pipeline of a search, fits its transformers through, or None."""
+    pipeline = getattr(estimator, "pipeline", getattr(estimator, "estimator", estimator))
+    memory = getattr(pipeline, "memory", None)
+    return memory if isinstance(memory, FoldTransformCache) else None
+
+
+def fit_reporting_cache(search, X, y):
+    """
+    Fits a sklearn search and adds the time its pipeline's transform cache saved to ``cv_results_``.
+
+    The seconds saved over the whole search are split evenly between the
+    candidates and folds, like ``FoldSearchCV`` does, in
+    ``mean_fit_time_saved``. Only savings in this process are seen, so a
+    search fitting in worker processes reports little.
+    """
+    cache = transform_cache_of(search)
+    if cache is None or isinstance(search, FoldSearchCV):
+        return search.fit(X, y)
+    before = cache.time_saved
+    search.fit(X, y)
+    n_evaluations = len(search.cv_results_["params"]) * search.n_splits_
+    search.cv_results_["mean_fit_time_saved"] = np.full(
+        len(search.cv_results_["params"]), (cache.time_saved - before) / n_evaluations
+    )
+    return search
+
+
+class FoldSearchCV(BaseEstimator):
+    """
+    Base of the search engines that score all candidates of a fold from one fit.
+
+    A search is split into tasks a scheduler can run anywhere:
+    ``_plan`` validates the grid and returns the folds, ``_fold`` scores
+    every candidate on one fold from plain arrays, and ``_finish`` builds
+    ``cv_results_`` from the per-fold results and refits the best
+    candidate. Subclasses implement ``_candidates``, which returns the
+    searched parameter name and its values, and ``_fold``.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        The pipeline to tune.
+    param_grid : dict
+        ``{parameter: candidates}`` for the single parameter the engine
+        searches.
+    cv : int or cross-validation generator, optional
+        Folds, as in sklearn searches. Defaults to 5 (stratified).
+    return_train_score : bool, optional
+        Whether to also score the training folds. Defaults to True.
+    """
+
+    def __init__(self, pipeline, param_grid: dict, cv=5, return_train_score: bool = True):
+        self.pipeline = pipeline
+        self.param_grid = param_grid
+        self.cv = cv
+        self.return_train_score = return_train_score
+
+    def _plan(self, X, y) -> list:
+        """Validates the grid and returns the ``(train_rows, test_rows)`` folds."""
+        self._param, self._values = self._candidates()
+        # Folds of the same data get the same transform cache scope in every search
+        self._data_key = data_key(X, y) if transform_cache_of(self.pipeline) is not None else None
+        return list(check_cv(self.cv, y, classifier=True).split(X, y))
+
+    def _run_fold(self, X, y_codes, train_rows, test_rows):
+        """``_fold`` followed by the fit seconds the pipeline's transform cache saved on it, if it has one."""
+        cache = transform_cache_of(self.pipeline)
+        if cache is None:
+            return (*self._fold(X, y_codes, train_rows, test_rows), None)
+        before = cache.time_saved
+        fold_key = hashlib.blake2b(np.ascontiguousarray(train_rows).tobytes(), digest_size=20).hexdigest()
+        with cache.fold_scope(f"{self._data_key}:{fold_key}"):
+            result = self._fold(X, y_codes, train_rows, test_rows)
+        return (*result, cache.time_saved - before)
+
+    def _finish(self, X, y, folds):
+        """Builds ``cv_results_`` from the ``_run_fold`` result of every fold and refits the best candidate."""
+        *parts, saved = zip(*folds)
+        fit_time, score_time, test_scores, train_scores = (np.column_stack(part) for part in parts)
+        self.cv_results_ = build_cv_results(
+            self._param, self._values, fit_time, score_time, test_scores,
+            train_scores if self.return_train_score else None,
+            None if None in saved else np.tile(np.array(saved) / len(self._values), (len(self._values), 1)),
+        )
+        return refit_best(self, X, y)
+
+    def fit(self, X, y, store=None):
+        """
+        Scores every candidate on every fold and refits the best one.
+
+        With a ``SearchStore``, folds whose candidates are all stored are
+        read back instead of scored, and each scored fold is stored.
+        """
+        splits = self._plan(X, y)
+        y_codes = np.unique(np.asarray(y), return_inverse=True)[1]
+        key = store.key(self, X, y) if store is not None else None
+        folds = []
+        for split, (train_rows, test_rows) in enumerate(splits):
+            result = store.load_fold(key, split, self._values) if store is not None else None
+            if result is None:
+                result = self._run_fold(X, y_codes, train_rows, test_rows)
+                if store is not None:
+                    store.save_fold(key, split, self._values, result)
+            folds.append(result)
+        return self._finish(X, y, folds)
+
+
+def halving_time_report(search) -> dict:
+    """
+    Fit and score time of a fitted successive-halving search against an estimate for the exhaustive search.
+
+    The exhaustive search would evaluate every candidate on
+    ``search.max_resources_`` samples in every fold. Each candidate's cost
+    there is extrapolated linearly from its last round, which
+    underestimates models that scale worse than linearly, so the saving
+    reported is conservative. The final refit is left out of both sides.
+
+    Returns
+    -------
+    dict
+        ``spent``, ``exhaustive`` and ``saved`` times in seconds, summed
+        over folds.
+    """
+    results = pd.DataFrame(search.cv_results_)
+    cost = (results["mean_fit_time"] + results["mean_score_time"]) * search.n_splits_
+    last_round = results.groupby(results["params"].map(str))["iter"].idxmax()
+    exhaustive = (cost[last_round] * search.max_resources_ / results["n_resources"][last_round]).sum()
+    spent = cost.sum()
+    return {"spent": spent, "exhaustive": exhaustive, "saved": exhaustive - spent}
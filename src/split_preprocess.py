@@ -1,9 +1,18 @@
 import click
-import pandas as pd
+import json
 import sys, os
+import tempfile
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from validate_iris import validate_data
-from data_split import split_data
+from validate_iris import validate_data, validate_data_chunked, validate_data_incremental, validation_params
+from validation_cache import ValidationCache, cache_key, capture_output
+from data_split import split_data, split_data_streaming, hash_split_streaming
+from columnar import write_columnar, write_columnar_chunks
+from load_data import compact_dtypes, read_appended, read_iris, tail_digest
+
+# Rows per chunk when rebuilding the columnar splits of incremental runs without --chunksize
+STREAM_CHUNKSIZE = 100_000
+# Bytes of newly cleaned rows split at a time in incremental runs
+STREAM_BLOCK_SIZE = 2**24
 
 
 @click.command()
@@ -35,7 +44,93 @@ from data_split import split_data
     default=123,
     show_default=True,
 )
-def main(rawdata, path, test_size, random_state):
+@click.option(
+    "--split-method",
+    type=click.Choice(["shuffle", "hash"]),
+    help="Shuffle rows into the splits, or assign each row by a hash of its key so appended rows do not move existing ones",
+    default="shuffle",
+    show_default=True,
+)
+@click.option(
+    "--split-key",
+    type=str,
+    multiple=True,
+    help="Column identifying a row for --split-method=hash; repeat for several columns (default: all columns)",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["columnar", "csv", "both"]),
+    help="Format of the train and test files: memory-mappable columnar (.cols), CSV, or both",
+    default="both",
+    show_default=True,
+)
+@click.option(
+    "--chunksize",
+    type=int,
+    help="Validate and split the raw data in chunks of this many rows instead of loading it at once",
+    default=None,
+)
+@click.option(
+    "--sketch-k",
+    type=int,
+    help="Use approximate KLL quartiles of this size in chunked validation; requires --chunksize",
+    default=None,
+)
+@click.option(
+    "--memory-limit",
+    type=int,
+    help="Spill duplicate detection to disk, keeping about this many MiB in memory",
+    default=None,
+)
+@click.option(
+    "--n-jobs",
+    type=int,
+    help="Number of worker processes used for validation",
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--cache-dir",
+    type=str,
+    help="Directory of the validation cache; pass an empty string to disable caching",
+    default="./data/.cache/validation",
+    show_default=True,
+)
+@click.option(
+    "--refresh-cache",
+    is_flag=True,
+    help="Ignore and overwrite any cached validation result for the raw data",
+)
+@click.option(
+    "--cache-max-mb",
+    type=int,
+    help="Size bound of the validation cache directory in MiB",
+    default=512,
+    show_default=True,
+)
+@click.option(
+    "--incremental-state",
+    type=str,
+    help="Directory of persisted validation state; only rows appended since the last run are validated and split (requires --split-method=hash)",
+    default=None,
+)
+def main(
+    rawdata,
+    path,
+    test_size,
+    random_state,
+    split_method,
+    split_key,
+    output_format,
+    chunksize,
+    sketch_k,
+    memory_limit,
+    n_jobs,
+    cache_dir,
+    refresh_cache,
+    cache_max_mb,
+    incremental_state,
+):
     """Perform data validation on raw data, clean up the data column names,
     and split the data into train and test data set
 
@@ -52,13 +147,61 @@ def main(rawdata, path, test_size, random_state):
     random_state : int
         Seed used by the random number generator to ensure reproducible
         train/test splits.
+    split_method : {"shuffle", "hash"}
+        ``"shuffle"`` uses ``train_test_split``, or a stratified single-pass
+        split by species when the data is streamed. ``"hash"`` assigns each row
+        from a hash of its key and ``random_state``: rows appended to the
+        raw data keep the existing rows in their split and are routed on
+        their own, so the outputs only change by the new rows.
+    split_key : tuple of str
+        Columns identifying a row for the hash split. All columns are used
+        when empty.
+    output_format : {"columnar", "csv", "both"}
+        Format of the saved splits. The columnar ``.cols`` files store the
+        features as float32 and ``species`` as a categorical, and are read
+        memory-mapped by the downstream stages; CSV is kept as an export
+        format.
+    chunksize : int, optional
+        If given, the raw data is validated and split out-of-core in chunks
+        of this many rows: the cleaned rows are streamed into the train and
+        test files, so no step holds the full data in memory. The
+        validation cache, which stores whole frames, is not used.
+    sketch_k : int, optional
+        Size of the KLL quantile sketches used by the chunked IQR outlier
+        check. Requires ``chunksize``: an in-memory frame always gets exact
+        quartiles. Exact quartiles are also used when omitted.
+    memory_limit : int, optional
+        Memory budget in MiB for duplicate detection, in-memory or chunked.
+        When given, rows are spilled to hash partitions on disk instead of
+        keeping every row hash in memory.
+    n_jobs : int
+        Number of worker processes. Statistics of in-memory validation are
+        computed over shared-memory row partitions in parallel, and spilled
+        duplicate partitions are processed in parallel.
+    cache_dir : str
+        Directory of the validation cache. If the raw data, the schema and
+        the check parameters are unchanged since a cached run, the cleaned
+        data and the validation report are taken from the cache instead of
+        validating again. An empty string disables the cache.
+    refresh_cache : bool
+        Revalidate even if a cached result exists, replacing it.
+    cache_max_mb : int
+        Size bound of the cache directory in MiB; the least recently used
+        entries are evicted beyond it.
+    incremental_state : str, optional
+        If given, the raw data is treated as append-only: only the rows
+        added since the previous run are validated against running
+        statistics persisted in this directory, and the cache is bypassed.
+        The newly cleaned rows are hash split and appended to the CSV
+        splits, which requires ``split_method="hash"``; the columnar files
+        are rewritten from them, as their layout cannot be appended to.
 
     Returns
     -------
     None
         This function saves the processed train and test datasets to disk
-        as ``iris_train.csv`` and ``iris_test.csv`` in the specified path.
-        No value is returned.
+        as ``iris_train.cols``/``iris_test.cols`` and/or ``iris_train.csv``/
+        ``iris_test.csv`` in the specified path. No value is returned.
 
     Examples
     --------
@@ -66,20 +209,167 @@ def main(rawdata, path, test_size, random_state):
     The train and test data are saved in data/processed/ folder
     """
 
-    df = pd.read_csv(rawdata)
+    if sketch_k is not None and chunksize is None:
+        raise click.UsageError("--sketch-k only applies to chunked validation; give --chunksize too")
+    if incremental_state and split_method != "hash":
+        raise click.UsageError("--incremental-state appends new rows to hash splits; give --split-method=hash too")
+
+    os.makedirs(path, exist_ok=True)
+    split_options = dict(
+        test_size=test_size, random_state=random_state, method=split_method, key=list(split_key) or None
+    )
+
+    if incremental_state:
+        validate_data_incremental(
+            rawdata, incremental_state, select=lambda chunk: chunk.loc[:, "sepal_length":]
+        )
+        _append_splits_incremental(
+            incremental_state, path, chunksize or STREAM_CHUNKSIZE, output_format, **split_options
+        )
+    elif chunksize is not None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cleaned_path = _validate_chunked(rawdata, tmp_dir, chunksize, sketch_k, memory_limit, n_jobs)
+            _save_splits_streaming(cleaned_path, path, chunksize, output_format, **split_options)
+    else:
+        if cache_dir:
+            cache = ValidationCache(cache_dir, cache_max_mb * 2**20)
+            # Parallelism and the dedup memory budget do not change the result
+            key = cache_key(rawdata, validation_params())
+            if refresh_cache:
+                cache.invalidate(key)
+            entry = cache.get(key)
+            if entry is not None:
+                print(f"Using cached validation result for unchanged {rawdata}:\n")
+                print(entry["report"], end="")
+                validated_data = entry["data"]
+            else:
+                with capture_output() as report:
+                    validated_data = _validate(rawdata, memory_limit, n_jobs)
+                cache.put(key, validated_data, report.getvalue())
+        else:
+            validated_data = _validate(rawdata, memory_limit, n_jobs)
+        _save_splits(validated_data, path, output_format, **split_options)
+    print(f"The train and test data are saved in {path} folder")
+
+
+def _validate(rawdata, memory_limit, n_jobs):
+    memory_limit = None if memory_limit is None else memory_limit * 2**20
+    df = read_iris(rawdata)
     df = df.loc[:, "sepal_length":]
-    validated_data = validate_data(df)
+    return validate_data(df, n_jobs=n_jobs, memory_limit=memory_limit)
+
 
-    train_df, test_df = split_data(
-        validated_data, test_size=test_size, random_state=random_state
+def _validate_chunked(rawdata, tmp_dir, chunksize, sketch_k, memory_limit, n_jobs):
+    memory_limit = None if memory_limit is None else memory_limit * 2**20
+    chunks = (
+        chunk.loc[:, "sepal_length":]
+        for chunk in read_iris(rawdata, chunksize=chunksize)
+    )
+    cleaned_path = os.path.join(tmp_dir, "iris_validated.csv")
+    validate_data_chunked(
+        chunks,
+        cleaned_path,
+        sketch_k=sketch_k,
+        memory_limit=memory_limit,
+        n_jobs=n_jobs,
     )
+    return cleaned_path
 
-    # output_dir = "./data/processed/"
-    os.makedirs(path, exist_ok=True)
 
-    train_df.to_csv(os.path.join(path, "iris_train.csv"), index=False)
-    test_df.to_csv(os.path.join(path, "iris_test.csv"), index=False)
-    print(f"The train and test data are saved in {path} folder")
+def _save_splits(validated_data, path, output_format, test_size, random_state, method, key):
+    train_df, test_df = split_data(validated_data, test_size=test_size, random_state=random_state, method=method, key=key)
+
+    if output_format in ("columnar", "both"):
+        write_columnar(train_df, os.path.join(path, "iris_train.cols"))
+        write_columnar(test_df, os.path.join(path, "iris_test.cols"))
+    if output_format in ("csv", "both"):
+        train_df.to_csv(os.path.join(path, "iris_train.csv"), index=False)
+        test_df.to_csv(os.path.join(path, "iris_test.csv"), index=False)
+
+
+def _save_splits_streaming(cleaned_path, path, chunksize, output_format, test_size, random_state, method, key):
+    """Streams the cleaned CSV rows into the train and test files, chunk by chunk."""
+    chunks = read_iris(cleaned_path, chunksize=chunksize)
+    with tempfile.TemporaryDirectory(dir=path) as tmp_dir:
+        csv_dir = path if output_format in ("csv", "both") else tmp_dir
+        train_csv = os.path.join(csv_dir, "iris_train.csv")
+        test_csv = os.path.join(csv_dir, "iris_test.csv")
+        if method == "hash":
+            hash_split_streaming(chunks, train_csv, test_csv, test_size, random_state, key=key)
+        else:
+            split_data_streaming(chunks, train_csv, test_csv, test_size, random_state, stratify="species")
+
+        if output_format in ("columnar", "both"):
+            for name, csv_path in [("train", train_csv), ("test", test_csv)]:
+                write_columnar_chunks(
+                    lambda: read_iris(csv_path, chunksize=chunksize), os.path.join(path, f"iris_{name}.cols")
+                )
+
+
+def _append_splits_incremental(state_dir, path, chunksize, output_format, test_size, random_state, method, key):
+    """
+    Hash splits the rows cleaned since the previous run and appends them to the CSV splits.
+
+    The byte offset up to which ``iris_validated.csv`` in ``state_dir`` has
+    been split, and the sizes of the split files, are kept in
+    ``split_state.json``. The splits are rewritten from the start if the
+    cleaned file was rebuilt, the split parameters changed or a split file
+    was modified.
+    """
+    cleaned_path = os.path.join(state_dir, "iris_validated.csv")
+    csv_dir = path if output_format in ("csv", "both") else state_dir
+    split_paths = [os.path.join(csv_dir, "iris_train.csv"), os.path.join(csv_dir, "iris_test.csv")]
+    state_path = os.path.join(state_dir, "split_state.json")
+    params = {
+        "paths": [os.path.abspath(split_path) for split_path in split_paths],
+        "test_size": test_size,
+        "random_state": random_state,
+        "key": key,
+    }
+
+    state = None
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        if (
+            state["params"] != params
+            or os.path.getsize(cleaned_path) < state["offset"]
+            or tail_digest(cleaned_path, state["offset"]) != state["tail"]
+            or any(
+                not os.path.exists(split_path) or os.path.getsize(split_path) < size
+                for split_path, size in zip(split_paths, state["sizes"])
+            )
+        ):
+            state = None
+    if state is None:
+        state = {"params": params, "offset": 0, "columns": None, "sizes": [0, 0]}
+    # Drop split rows appended by an interrupted run that never saved its state
+    for split_path, size in zip(split_paths, state["sizes"]):
+        with open(split_path, "ab") as f:
+            f.truncate(size)
+
+    new_rows = 0
+    offset = state["offset"]
+    for chunk, offset in read_appended(cleaned_path, state["offset"], state["columns"], STREAM_BLOCK_SIZE):
+        state["columns"] = list(chunk.columns)
+        counts = hash_split_streaming(
+            [compact_dtypes(chunk)], *split_paths, test_size, random_state, key=key, append=True
+        )
+        new_rows += sum(counts)
+
+    if output_format in ("columnar", "both") and (
+        new_rows or not all(os.path.exists(os.path.join(path, f"iris_{name}.cols")) for name in ("train", "test"))
+    ):
+        for name, csv_path in zip(["train", "test"], split_paths):
+            write_columnar_chunks(
+                lambda: read_iris(csv_path, chunksize=chunksize), os.path.join(path, f"iris_{name}.cols")
+            )
+
+    state.update(offset=offset, tail=tail_digest(cleaned_path, offset), sizes=[os.path.getsize(p) for p in split_paths])
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(state_path + ".tmp", state_path)
+    print(f"{new_rows} newly cleaned rows appended to the splits.")
 
 
 if __name__ == "__main__":
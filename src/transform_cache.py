@@ -0,0 +1,210 @@
+# src/transform_cache.py
+import contextlib
+import copy
+import functools
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _array_digest(digest, values):
+    """Feeds the column names, shape, dtype and content of an array or DataFrame to a digest."""
+    if values is None:
+        digest.update(b"none")
+        return
+    if hasattr(values, "columns"):
+        digest.update(json.dumps([str(col) for col in values.columns]).encode())
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        # Hash the codes rather than materialising the labels
+        digest.update(json.dumps([str(level) for level in values.cat.categories]).encode())
+        values = values.cat.codes
+    values = np.ascontiguousarray(np.asarray(values))
+    if values.dtype == object:
+        digest.update(f"{values.shape}object".encode())
+        digest.update(memoryview(pd.util.hash_array(values.ravel())).cast("B"))
+    else:
+        digest.update(f"{values.shape}{values.dtype.str}".encode())
+        digest.update(memoryview(values).cast("B"))
+
+
+def data_key(X, y) -> str:
+    """
+    Builds a digest of the content of a feature matrix and its target.
+
+    Examples
+    --------
+    >>> data_key(X_train, y_train)
+    '3b1e...'
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    _array_digest(digest, X)
+    _array_digest(digest, y)
+    return digest.hexdigest()
+
+
+def transform_key(func, transformer, input_key: str, params) -> str:
+    """
+    Builds the cache key of one pipeline transformer fit.
+
+    The key covers the unfitted transformer's class and parameters, the
+    fit parameters and ``input_key``, which identifies the data the
+    transformer is fitted on. Together they determine the fitted
+    transformer and the transformed matrix.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the fit.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(func.__qualname__.encode())
+    digest.update(type(transformer).__qualname__.encode())
+    digest.update(json.dumps(transformer.get_params(), sort_keys=True, default=str).encode())
+    digest.update(input_key.encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class FoldTransformCache:
+    """
+    Size-bounded in-memory cache of fitted pipeline transformers and their transformed matrices.
+
+    Pass it as the ``memory`` of the pipelines being tuned. A pipeline then
+    fits each of its transformers through the cache, so a scaler fitted on
+    a CV fold is fitted once and reused by every candidate and every model
+    family fitting on the same fold rows, as long as they share the cache.
+    Unlike ``joblib.Memory``, nothing is written to disk and transformed
+    matrices are not copied on a hit. When the transformed matrices held
+    grow past ``max_bytes``, the least recently used entries are evicted
+    first.
+
+    The data a transformer is fitted on is identified, from cheapest to
+    dearest, as the output of an earlier cached fit (the next step of a
+    pipeline), by the key of the enclosing ``fold_scope`` (the search
+    engines open one per fold, so the fold's rows are never hashed), or by
+    hashing the content of ``X`` and ``y``. Hashing costs about as much as
+    fitting a ``StandardScaler``, so plain sklearn searches only gain on
+    dearer transformers or pipelines with several of them.
+
+    A hit hands out the very matrix that was cached, which must not be
+    modified in place, with its own copy of the fitted transformer, so
+    pipelines built from the cache, e.g. the best estimators of two
+    searches, never share a transformer. ``clone`` keeps sharing the cache
+    rather than copying it. A pickled cache, e.g. sent to a worker
+    process, starts empty.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Upper bound on the total size of the cached transformed matrices.
+        Defaults to 256 MiB.
+
+    Attributes
+    ----------
+    hits, misses : int
+        Number of transformer fits served from the cache and computed.
+    time_saved : float
+        Seconds of fitting the hits avoided, never negative.
+    overhead : float
+        Seconds spent on lookups, hashing inputs and copying the cached
+        transformers, tracked apart from ``time_saved``.
+
+    Examples
+    --------
+    >>> cache = FoldTransformCache()
+    >>> pipe = make_pipeline(StandardScaler(), KNeighborsClassifier(), memory=cache)
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+        self.overhead = 0.0
+        self._scope = None
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_entries=OrderedDict(), _nbytes=0, hits=0, misses=0, time_saved=0.0, overhead=0.0, _scope=None)
+        return state
+
+    def __len__(self):
+        return len(self._entries)
+
+    @contextlib.contextmanager
+    def fold_scope(self, key: str):
+        """
+        Keys the transformer fits of the block on ``key`` instead of the content of their input.
+
+        Inside the block, every fit on raw input data must be on the same
+        rows, e.g. the training rows of one CV fold, which ``key`` must
+        identify together with the data they come from.
+        """
+        previous, self._scope = self._scope, key
+        try:
+            yield self
+        finally:
+            self._scope = previous
+
+    def _input_key(self, X, y) -> str:
+        for key, (result, _, _) in self._entries.items():
+            # The output of a cached fit is identified by that fit, which
+            # already covers y
+            if result[0] is X:
+                return key
+        if self._scope is None:
+            return data_key(X, y)
+        columns = list(map(str, X.columns)) if hasattr(X, "columns") else None
+        return json.dumps([self._scope, list(np.shape(X)), columns])
+
+    def cache(self, func):
+        """Wraps ``func`` like ``joblib.Memory.cache``, which is the interface ``Pipeline`` uses."""
+        return functools.partial(self._call, func)
+
+    def _call(self, func, transformer, X, y, *args, params=None, **kwargs):
+        start = time.perf_counter()
+        key = transform_key(func, transformer, self._input_key(X, y), params)
+        if key in self._entries:
+            result, cost, _ = self._entries[key]
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.time_saved += cost
+            result = result[0], copy.deepcopy(result[1])
+            self.overhead += time.perf_counter() - start
+            return result
+        self.overhead += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = func(transformer, X, y, *args, params=params, **kwargs)
+        cost = time.perf_counter() - start
+        self.misses += 1
+        nbytes = getattr(result[0], "nbytes", 0)
+        if nbytes <= self.max_bytes:
+            # The caller owns the returned transformer and may refit it
+            self._entries[key] = ((result[0], copy.deepcopy(result[1])), cost, nbytes)
+            self._nbytes += nbytes
+            self.evict()
+        return result
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits in ``max_bytes``."""
+        while self._nbytes > self.max_bytes:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+
+    def clear(self):
+        """Removes every entry and resets the statistics."""
+        self._entries.clear()
+        self._nbytes = 0
+        self.hits = self.misses = 0
+        self.time_saved = 0.0
+        self.overhead = 0.0
@@ -0,0 +1,165 @@
+# src/tree_search.py
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.tree import DecisionTreeClassifier
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.search_utils import FoldSearchCV, safe_rows
+
+
+def depth_predictions(tree, X, depths) -> dict:
+    """
+    Predicted class codes of a fitted tree truncated at each of several depths.
+
+    Every node of a fitted tree stores the class distribution of its
+    training samples, so stopping the descent of a row at depth ``d``
+    predicts the majority class of the node reached, exactly what a leaf at
+    that depth would predict. One ``decision_path`` call gives the
+    root-to-leaf path of every row and serves all depths.
+
+    Parameters
+    ----------
+    tree : sklearn.tree.DecisionTreeClassifier
+        The fitted, fully grown tree.
+    X : array-like
+        Rows to predict, in the representation the tree was fitted on.
+    depths : iterable of int or None
+        Depths to predict at; None means no truncation.
+
+    Returns
+    -------
+    dict
+        Mapping each depth to the array of predicted class codes.
+    """
+    structure = tree.tree_
+    paths = tree.decision_path(X).tocsr()
+    lengths = np.diff(paths.indptr)
+    # Node ids increase along a path, so each row's nodes are in depth order
+    max_length = lengths.max() if len(lengths) else 1
+    positions = np.minimum(np.arange(max_length)[None, :], lengths[:, None] - 1)
+    nodes = paths.indices[paths.indptr[:-1, None] + positions]
+    node_class = structure.value[:, 0, :].argmax(axis=1)
+    return {
+        depth: node_class[nodes[:, max_length - 1 if depth is None else min(depth, max_length - 1)]]
+        for depth in depths
+    }
+
+
+def truncation_matches_refit(tree) -> bool:
+    """
+    Whether truncating a deeper tree at a depth grows the same tree as refitting with that ``max_depth``.
+
+    That holds for the depth-first builder with the best splitter over
+    every feature, where the split of a node only depends on its samples.
+    Feature subsampling and the random splitter draw from a generator
+    consumed node by node, so an extra level changes every later branch.
+    ``max_leaf_nodes`` switches to the best-first builder and ``ccp_alpha``
+    prunes the grown tree as a whole. Trees with ``min_impurity_decrease``
+    are conservatively treated the same way.
+    """
+    return (
+        tree.splitter == "best"
+        and tree.max_features is None
+        and tree.max_leaf_nodes is None
+        and tree.min_impurity_decrease == 0
+        and tree.ccp_alpha == 0
+    )
+
+
+class DepthSweepSearchCV(FoldSearchCV):
+    """
+    Cross-validated search over ``max_depth`` of a decision-tree pipeline from one tree per fold.
+
+    ``RandomizedSearchCV`` fits a separate tree for every candidate depth in
+    every fold. Here each fold grows a single tree to the largest candidate
+    depth and scores every candidate by truncating the descent of each row
+    at that depth, predicting the majority class of the internal node
+    reached. A tree of depth ``d`` is the top ``d`` levels of the deeper
+    tree: the split of a node only depends on its samples, never on how
+    deep the tree may grow. The exception is a tie between equally good
+    splits, which sklearn breaks with a random feature order consumed node
+    by node; a deeper tree can then pick the other split in a later
+    branch. Trees for which truncation differs from refitting, see
+    ``truncation_matches_refit``, fall back to one fit per candidate depth
+    in every fold, like ``GridSearchCV``. The best candidate is refit on
+    the full data with its own ``max_depth``, like in
+    ``RandomizedSearchCV``.
+
+    Attributes mirror the sklearn searches used by ``train``:
+    ``cv_results_``, ``best_index_``, ``best_params_``, ``best_score_``
+    and ``best_estimator_``. The fit time of a fold's tree is split evenly
+    between the candidates in ``*_fit_time``.
+
+    Parameters
+    ----------
+    pipeline : sklearn.pipeline.Pipeline
+        Pipeline whose last step is a ``DecisionTreeClassifier``.
+    param_grid : dict
+        ``{"<tree step>__max_depth": candidates}``; no other parameter may
+        be searched.
+    cv : int or cross-validation generator, optional
+        Folds, as in sklearn searches. Defaults to 5 (stratified).
+    return_train_score : bool, optional
+        Whether to also score the training folds. Defaults to True.
+
+    Examples
+    --------
+    >>> pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    >>> search = DepthSweepSearchCV(pipe, {"decisiontreeclassifier__max_depth": range(1, 20)})
+    >>> search.fit(X_train, y_train).best_params_
+    {'decisiontreeclassifier__max_depth': 2}
+    """
+
+    def _candidates(self):
+        step_name, tree = self.pipeline.steps[-1]
+        if not isinstance(tree, DecisionTreeClassifier):
+            raise ValueError(f"The last pipeline step must be a DecisionTreeClassifier, got {type(tree).__name__}")
+        param = f"{step_name}__max_depth"
+        if set(self.param_grid) != {param}:
+            raise ValueError(f"DepthSweepSearchCV only searches {param!r}, got {sorted(self.param_grid)}")
+        return param, [None if depth is None else int(depth) for depth in self.param_grid[param]]
+
+    def _fold(self, X, y_codes, train_rows, test_rows):
+        """Fit and score times and test and train scores of every candidate on one fold."""
+        if not truncation_matches_refit(self.pipeline[-1]):
+            return self._fold_per_depth(X, y_codes, train_rows, test_rows)
+        depths = self._values
+        deepest = None if None in depths else max(depths)
+        score_time = np.zeros(len(depths))
+        test_scores = np.zeros(len(depths))
+        train_scores = np.zeros(len(depths))
+
+        start = time.perf_counter()
+        model = clone(self.pipeline).set_params(**{self._param: deepest})
+        model.fit(safe_rows(X, train_rows), y_codes[train_rows])
+        fit_time = np.full(len(depths), (time.perf_counter() - start) / len(depths))
+
+        queries = [(test_scores, test_rows)]
+        if self.return_train_score:
+            queries.append((train_scores, train_rows))
+        for scores, rows in queries:
+            start = time.perf_counter()
+            X_query = model[:-1].transform(safe_rows(X, rows)) if len(model) > 1 else safe_rows(X, rows)
+            predictions = depth_predictions(model[-1], X_query, depths)
+            for i, depth in enumerate(depths):
+                scores[i] = np.mean(predictions[depth] == y_codes[rows])
+            score_time += (time.perf_counter() - start) / len(depths)
+        return fit_time, score_time, test_scores, train_scores
+
+    def _fold_per_depth(self, X, y_codes, train_rows, test_rows):
+        """Like ``_fold``, fitting a separate tree for every candidate depth."""
+        depths = self._values
+        fit_time, score_time, test_scores, train_scores = (np.zeros(len(depths)) for _ in range(4))
+        X_train, X_test = safe_rows(X, train_rows), safe_rows(X, test_rows)
+        for i, depth in enumerate(depths):
+            start = time.perf_counter()
+            model = clone(self.pipeline).set_params(**{self._param: depth}).fit(X_train, y_codes[train_rows])
+            fit_time[i] = time.perf_counter() - start
+            start = time.perf_counter()
+            test_scores[i] = np.mean(model.predict(X_test) == y_codes[test_rows])
+            if self.return_train_score:
+                train_scores[i] = np.mean(model.predict(X_train) == y_codes[train_rows])
+            score_time[i] = time.perf_counter() - start
+        return fit_time, score_time, test_scores, train_scores
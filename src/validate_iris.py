@@ -1,21 +1,166 @@
 import pandas as pd
 import pandera.pandas as pa
-from pandera import Column, Check
+from pandera import dtypes
+from pandera.engines import pandas_engine
 import numpy as np
+import hashlib
+import inspect
+import json
+import pickle
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.column_stats import ColumnStats, count_empty_rows
+from src.quantile_sketch import KLLSketch
+from src.dedup import DiskDeduplicator, HashStore, row_hashes
+from src.load_data import read_appended, tail_digest
+
+
+_COMPACT_FLOATS = (np.dtype("float32"), np.dtype("float64"))
+
+
+def _native_dtype(pandera_dtype):
+    try:
+        return pandas_engine.Engine.dtype(pandera_dtype).type
+    except TypeError:
+        return None
+
+
+@pandas_engine.Engine.register_dtype
+@dtypes.immutable
+class CompactFloat(pandas_engine.DataType, dtypes.Float):
+    """Float column kept as float32 or float64; anything else is coerced like ``float``."""
+
+    type = np.dtype("float64")
+
+    def check(self, pandera_dtype, data_container=None):
+        return _native_dtype(pandera_dtype) in _COMPACT_FLOATS
+
+    def coerce(self, data_container):
+        if data_container.dtype in _COMPACT_FLOATS:
+            return data_container
+        return pandas_engine.Engine.dtype(float).coerce(data_container)
+
+    def __str__(self):
+        return "float32|float64"
+
+
+@pandas_engine.Engine.register_dtype
+@dtypes.immutable
+class Label(pandas_engine.DataType):
+    """String column kept as object strings or categorical; anything else is coerced like ``str``."""
+
+    type = np.dtype("object")
+
+    def check(self, pandera_dtype, data_container=None):
+        native = _native_dtype(pandera_dtype)
+        return native == np.dtype("object") or isinstance(native, pd.CategoricalDtype)
+
+    def coerce(self, data_container):
+        if isinstance(data_container.dtype, pd.CategoricalDtype):
+            return data_container
+        return pandas_engine.Engine.dtype(str).coerce(data_container)
+
+    def __str__(self):
+        return "str|category"
 
 
 class IrisPreSplitSchema(pa.DataFrameModel):
-    sepal_length: float = pa.Field(ge=0, le=10, nullable=False)
-    sepal_width: float = pa.Field(ge=0, le=10, nullable=False)
-    petal_length: float = pa.Field(ge=0, le=10, nullable=False)
-    petal_width: float = pa.Field(ge=0, le=10, nullable=False)
-    species: str = pa.Field(isin=["setosa", "versicolor", "virginica"], nullable=False)
+    # Compact float32 features and a categorical species pass as they are,
+    # without being upcast to float64 and object strings
+    sepal_length: CompactFloat = pa.Field(ge=0, le=10, nullable=False)
+    sepal_width: CompactFloat = pa.Field(ge=0, le=10, nullable=False)
+    petal_length: CompactFloat = pa.Field(ge=0, le=10, nullable=False)
+    petal_width: CompactFloat = pa.Field(ge=0, le=10, nullable=False)
+    species: Label = pa.Field(isin=["setosa", "versicolor", "virginica"], nullable=False)
 
     class Config:
         strict = True  # No extra columns allowed
         coerce = True  # Convert types if possible
 
 
+_IRIS_SCHEMA = IrisPreSplitSchema.to_schema()
+
+
+# Vectorized equivalents of the pandera built-in checks used by the schema
+_FAST_CHECKS = {
+    "greater_than_or_equal_to": lambda values, stats: values >= stats["min_value"],
+    "less_than_or_equal_to": lambda values, stats: values <= stats["max_value"],
+    "greater_than": lambda values, stats: values > stats["min_value"],
+    "less_than": lambda values, stats: values < stats["max_value"],
+    "isin": lambda values, stats: pd.Series(values).isin(stats["allowed_values"]).to_numpy(),
+}
+
+
+def _conforms_to_schema(df: pd.DataFrame, schema) -> bool:
+    """
+    Checks without copying whether ``df`` already passes ``schema`` as is.
+
+    Returns False, rather than raising, as soon as anything would need
+    coercion or fails a check, and whenever the schema uses a feature this
+    fast path does not reproduce, so that the caller can fall back to pandera.
+    """
+    if schema.ordered or schema.unique or schema.checks or schema.index is not None:
+        return False
+    if not df.columns.is_unique or set(df.columns) != set(schema.columns):
+        return False
+
+    for name, column in schema.columns.items():
+        series = df[name]
+        if _native_dtype(series.dtype) is None or not column.dtype.check(series.dtype) or column.regex or column.unique:
+            return False
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Check the categories in use instead of one string per row
+            codes = series.cat.codes.to_numpy()
+            if (codes < 0).any() and not column.nullable:
+                return False
+            values = series.cat.categories.to_numpy()[np.unique(codes[codes >= 0])]
+        else:
+            values = series.to_numpy()
+        missing = pd.isna(values)
+        if missing.any() and not column.nullable:
+            return False
+        for check in column.checks:
+            if check.name not in _FAST_CHECKS:
+                return False
+            with np.errstate(invalid="ignore"):
+                passed = _FAST_CHECKS[check.name](values, check.statistics)
+            if not (passed | missing).all():
+                return False
+    return True
+
+
+def validate_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validates ``df`` against ``IrisPreSplitSchema``, skipping pandera when possible.
+
+    When the columns and dtypes already match the schema, the range, null
+    and ``isin`` checks run as vectorized NumPy masks on the existing data
+    and ``df`` is returned unchanged, without pandera's per-call overhead or
+    the copies made by coercion. Otherwise, or if any check fails, the frame
+    goes through ``IrisPreSplitSchema.validate`` so coercion and the detailed
+    error report are exactly pandera's.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The Iris dataset to validate.
+
+    Returns
+    -------
+    pd.DataFrame
+        The validated (and, if needed, type-coerced) DataFrame.
+
+    Raises
+    ------
+    pandera.errors.SchemaError
+        If the schema validation fails.
+    """
+    if _conforms_to_schema(df, _IRIS_SCHEMA):
+        return df
+    return IrisPreSplitSchema.validate(df)
+
+
 def check_zscore(series: pd.Series, threshold: float = 3.0) -> pd.Series:
     """Returns True for each value that is NOT an outlier by Z-score."""
     z = (series - series.mean()) / series.std()
@@ -23,48 +168,89 @@ def check_zscore(series: pd.Series, threshold: float = 3.0) -> pd.Series:
 
 
 def check_iqr(series: pd.Series, factor: float = 1.5) -> pd.Series:
-    """Returns True for each value that is NOT an outlier by IQR."""
+    """
+    Returns True for each value that is NOT an outlier by IQR.
+
+    The quartiles are exact: the column is already in memory, where a
+    quantile sketch would be slower and only add approximation error.
+    Sketches are used by ``validate_data_chunked``, which never holds a
+    whole column.
+    """
     q1 = series.quantile(0.25)
     q3 = series.quantile(0.75)
     iqr = q3 - q1
     return (series >= q1 - factor * iqr) & (series <= q3 + factor * iqr)
 
 
-def check_empty_rows(df: pd.DataFrame):
+def check_empty_rows(df: pd.DataFrame, stats: ColumnStats = None):
     """Checks for and raises an error if completely empty rows are found."""
-    empty_rows = (df == "").all(axis=1).sum()
+    empty_rows = stats.empty_rows if stats is not None else count_empty_rows(df)
     if empty_rows > 0:
         raise ValueError(f"Found {empty_rows} completely empty rows")
     print("Check: No completely empty rows found.")
 
 
-def check_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    """Checks for duplicates and drops them, returning the cleaned DataFrame."""
-    duplicate_count = df.duplicated().sum()
+def check_duplicates(df: pd.DataFrame, memory_limit: int = None, n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Checks for duplicates and drops them, returning the cleaned DataFrame.
+
+    By default the duplicates are found with ``DataFrame.duplicated``, which
+    keeps a hash table of every row in memory. If ``memory_limit`` (in bytes)
+    is given, rows are instead spilled to hash partitions on disk by a
+    ``DiskDeduplicator`` and each partition is de-duplicated on its own,
+    using ``n_jobs`` worker processes. Both paths drop the same rows.
+    """
+    if memory_limit is None:
+        duplicated = df.duplicated()
+    else:
+        # Feed the frame in slices so the copies made while spilling a slice
+        # stay within the limit
+        row_bytes = df.memory_usage(index=False, deep=True).sum() / max(len(df), 1)
+        step = max(1, int(memory_limit / max(row_bytes, 1)))
+        with DiskDeduplicator(memory_limit=memory_limit, n_jobs=n_jobs, spool=False) as dedup:
+            for start in range(0, len(df), step):
+                dedup.add(df.iloc[start:start + step])
+            duplicated = pd.Series(np.array(dedup.duplicated()), index=df.index)
+    duplicate_count = duplicated.sum()
+    if duplicate_count > 0:
+        cleaned_df = df[~duplicated]
+        _report_duplicates(duplicate_count, cleaned_df.shape)
+        return cleaned_df
+    else:
+        _report_duplicates(0, df.shape)
+        return df
+
+
+def _report_duplicates(duplicate_count: int, shape: tuple):
     if duplicate_count > 0:
-        cleaned_df = df.drop_duplicates()
         print(
             f"Check: {duplicate_count} duplicate rows found and dropped. "
-            f"New shape: {cleaned_df.shape}"
+            f"New shape: {shape}"
         )
-        return cleaned_df
     else:
         print("Check: No duplicate rows found.")
-        return df
 
 
-def check_species_levels(df: pd.DataFrame):
+def check_species_levels(df: pd.DataFrame, stats: ColumnStats = None):
     """Checks if the 'species' column contains only expected category levels."""
-    species_levels = df["species"].unique()
+    if stats is None:
+        species_levels = df["species"].unique()
+    else:
+        species_levels = stats.class_counts.index.to_numpy()
+        if stats.nan_counts["species"] > 0:
+            species_levels = np.append(species_levels, np.nan)
     expected_levels = ["setosa", "versicolor", "virginica"]
     if not set(species_levels).issubset(set(expected_levels)):
         raise ValueError(f"Unexpected species levels found: {species_levels}")
     print("Check: Species categories OK.")
 
 
-def check_target_distribution(df: pd.DataFrame, min_proportion: float = 0.1):
+def check_target_distribution(df: pd.DataFrame, min_proportion: float = 0.1, stats: ColumnStats = None):
     """Checks if any species is underrepresented below a minimum proportion."""
-    target_counts = df["species"].value_counts(normalize=True)
+    if stats is None:
+        target_counts = df["species"].value_counts(normalize=True)
+    else:
+        target_counts = stats.target_proportions()
     if (target_counts < min_proportion).any():
         print(
             f"Warning: Target distribution issue. Some species under {min_proportion*100:.0f}%:\n"
@@ -74,80 +260,63 @@ def check_target_distribution(df: pd.DataFrame, min_proportion: float = 0.1):
         print("Check: Target variable distribution looks reasonable.")
 
 
-def check_outliers(df: pd.DataFrame):
-    """Performs Z-score and IQR outlier checks using pandera."""
-    float_cols = df.select_dtypes(include="float").columns
-
-    # Only validate numeric columns
-    outlier_schema = pa.DataFrameSchema(
-        {
-            col: Column(
-                dtype=float,
-                checks=[
-                    Check(
-                        lambda s: check_zscore(s), error=f"{col} has Z-score outliers"
-                    ),
-                    Check(lambda s: check_iqr(s), error=f"{col} has IQR outliers"),
-                ],
-            )
-            for col in float_cols
-        }
-    )
+def check_outliers(df: pd.DataFrame, stats: ColumnStats = None):
+    """
+    Performs Z-score and IQR outlier checks on the numeric columns.
 
-    try:
-        # Use only the float columns for validation
-        outlier_schema.validate(df[float_cols], lazy=True)
-        print("Check: No significant outliers detected!")
-    except pa.errors.SchemaErrors as err:
+    A column has a Z-score (IQR) outlier exactly when its minimum or maximum
+    falls outside the Z-score (IQR) bounds, so the verdict is read from the
+    extremes, moments and quantiles in ``stats`` instead of building a
+    per-value mask for every column.
+    """
+    if stats is None:
+        stats = ColumnStats.from_frame(df)
+
+    if stats.zscore_outliers() or stats.iqr_outliers():
         print(
             "Warning: Outliers detected! Consider using StandardScaler transformation for the affected features."
         )
+    else:
+        print("Check: No significant outliers detected!")
 
 
-def check_missing_data(df: pd.DataFrame, threshold: float = 0.05):
+def check_missing_data(df: pd.DataFrame, threshold: float = 0.05, stats: ColumnStats = None):
     """Checks if missingness in any column exceeds the allowed threshold."""
-    missing_schema = pa.DataFrameSchema(
-        {
-            col: Column(
-                dtype=df[col].dtype,
-                checks=[
-                    Check(
-                        lambda s: s.isna().mean() < threshold,
-                        error=f"Missingness exceeds allowed threshold of {threshold:.2f}",
-                    )
-                ],
-            )
-            for col in df.columns
-        }
-    )
-    try:
-        missing_schema.validate(df, lazy=True)
+    if stats is None:
+        missing_fraction = df.isna().mean()
+    else:
+        missing_fraction = stats.missing_fraction()
+
+    if (missing_fraction < threshold).all():
         print("Check: Missingness is within allowed limits.")
-    except pa.errors.SchemaErrors as err:
+    else:
         print(
             "Warning: Missingness exceeds threshold in one or more columns! "
             "Consider using an imputer when training the model."
         )
 
 
-def check_correlations(df: pd.DataFrame, threshold: float = 0.95):
+def check_correlations(df: pd.DataFrame, threshold: float = 0.95, stats: ColumnStats = None):
     """
     Checks for high target-feature and feature-feature correlations.
 
-    This combines two correlation checks into one function for efficiency.
+    This combines two correlation checks into one function for efficiency:
+    both are read from the co-moment matrix of the features and the species
+    code held in ``stats``.
     """
-    feature_df = df.drop(columns="species", errors="ignore")
-    num_cols = feature_df.select_dtypes(include=np.number).columns
+    if stats is None:
+        stats = ColumnStats.from_frame(df)
 
-    if feature_df.empty or len(num_cols) < 2:
+    if stats.n_rows == 0 or len(stats.columns) < 2:
         print(
             "Warning: Skipping correlation checks due to insufficient numeric features."
         )
         return
 
+    corr = stats.corr()
+
     # 1. Target–Feature Correlations
-    target_species = df["species"].astype("category").cat.codes
-    target_corr = feature_df[num_cols].corrwith(target_species, method="pearson")
+    target_corr = corr.loc[stats.columns, "species"].rename(None)
 
     high_target_corr = target_corr[target_corr.abs() > threshold]
     if not high_target_corr.empty:
@@ -159,7 +328,7 @@ def check_correlations(df: pd.DataFrame, threshold: float = 0.95):
         print("Check: Target-feature correlations are in an acceptable range.")
 
     # 2. Feature-Feature Correlations (Multicollinearity)
-    corr_matrix = feature_df[num_cols].corr().abs()
+    corr_matrix = corr.loc[stats.columns, stats.columns].abs()
     # Filter for upper triangle (k=1) and correlations > threshold
     upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
     high_corr_pairs = upper[upper > threshold].stack()
@@ -173,7 +342,60 @@ def check_correlations(df: pd.DataFrame, threshold: float = 0.95):
         print("Check: Feature-feature correlations are in an acceptable range.")
 
 
-def validate_data(df: pd.DataFrame) -> pd.DataFrame:
+def _run_non_blocking_checks(df: pd.DataFrame, stats: ColumnStats):
+    check_species_levels(df, stats=stats)
+    check_target_distribution(df, stats=stats)
+    check_outliers(df, stats=stats)
+    check_missing_data(df, stats=stats)
+    check_correlations(df, stats=stats)
+
+
+def validation_params() -> dict:
+    """
+    Describes everything the outcome of ``validate_data`` depends on.
+
+    Returns the schema definition, the default thresholds of the checks and
+    a digest of the source of this module and of the modules computing the
+    verdicts (statistics, quantile sketches, deduplication and the parsing
+    of appended rows), so that a
+    change to any of them invalidates results cached under
+    ``validation_cache.cache_key``.
+    """
+    checks = [
+        check_zscore,
+        check_iqr,
+        check_target_distribution,
+        check_outliers,
+        check_missing_data,
+        check_correlations,
+    ]
+    source = hashlib.blake2b()
+    modules = [__name__, ColumnStats.__module__, KLLSketch.__module__, DiskDeduplicator.__module__, read_appended.__module__]
+    for module in modules:
+        source.update(inspect.getsource(sys.modules[module]).encode())
+    schema = IrisPreSplitSchema.to_schema()
+    return {
+        "schema": {
+            "columns": {
+                name: [str(column.dtype), column.nullable, [(c.name, c.statistics) for c in column.checks]]
+                for name, column in schema.columns.items()
+            },
+            "strict": schema.strict,
+            "coerce": schema.coerce,
+        },
+        "checks": {
+            check.__name__: {
+                name: param.default
+                for name, param in inspect.signature(check).parameters.items()
+                if param.default is not inspect.Parameter.empty
+            }
+            for check in checks
+        },
+        "source": source.hexdigest(),
+    }
+
+
+def validate_data(df: pd.DataFrame, n_jobs: int = 1, memory_limit: int = None) -> pd.DataFrame:
     """
     Orchestrates data validation checks.
 
@@ -185,6 +407,14 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
     ----------
     df : pd.DataFrame
         The Iris dataset to validate.
+    n_jobs : int, optional
+        Number of worker processes computing the statistics behind the
+        non-blocking checks, one row partition of shared memory at a time.
+        Defaults to 1 (computed in this process).
+    memory_limit : int, optional
+        Memory budget in bytes of duplicate detection. When given, rows are
+        spilled to hash partitions on disk, processed by ``n_jobs`` worker
+        processes, instead of hashing every row in memory. Defaults to None.
 
     Returns
     -------
@@ -202,21 +432,263 @@ def validate_data(df: pd.DataFrame) -> pd.DataFrame:
 
     # 1. Mandatory Schema Validation (Pandera handles column/type checks)
     # The returned df is type-coerced and validated against basic ranges (0-10).
-    df = IrisPreSplitSchema.validate(df)
+    df = validate_schema(df)
     print("Check: Initial schema validation passed (columns + types + ranges).\n")
 
     # 2. Checks that modify or block data processing
-    check_empty_rows(df.copy())  # Use a copy so original validation is maintained
-    df = check_duplicates(df)
+    check_empty_rows(df)
+    df = check_duplicates(df, memory_limit=memory_limit, n_jobs=n_jobs)
 
     print("\n--- Running Non-Blocking Checks ---\n")
 
-    # 3. Non-blocking checks (issue warnings or print status)
-    check_species_levels(df)
-    check_target_distribution(df)
-    check_outliers(df)
-    check_missing_data(df)
-    check_correlations(df)
+    # 3. Non-blocking checks (issue warnings or print status), all read from
+    # statistics gathered in a single pass over the cleaned data
+    stats = ColumnStats.from_frame(df, n_jobs=n_jobs)
+    _run_non_blocking_checks(df, stats)
 
     print("\n--- Data Validation Complete ---")
     return df
+
+
+def validate_data_chunked(
+    chunks, output_path=None, sketch_k: int = None, memory_limit: int = None, n_jobs: int = 1
+) -> ColumnStats:
+    """
+    Out-of-core version of ``validate_data`` for files that do not fit in memory.
+
+    Each chunk is validated against ``IrisPreSplitSchema`` and checked for empty
+    rows as soon as it is read. Duplicates are dropped across chunk boundaries
+    using a set of 64-bit row hashes (or a ``DiskDeduplicator`` when
+    ``memory_limit`` is given), and the de-duplicated rows are summarised
+    in a mergeable ``ColumnStats``. Once every chunk has been seen, the
+    dataset-level checks are evaluated from the merged statistics, so they
+    report the same verdicts as ``validate_data`` on the full frame while only
+    one chunk is held in memory at a time.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        The Iris dataset split into chunks, e.g.
+        ``pd.read_csv(path, chunksize=100_000)``.
+    output_path : str or path-like, optional
+        If given, the cleaned and validated rows are appended to this CSV file
+        chunk by chunk.
+    sketch_k : int, optional
+        If given, the IQR outlier check uses ``KLLSketch`` quartiles of this
+        size, so memory stays constant even when the features have very many
+        distinct values. Defaults to None (exact quartiles).
+    memory_limit : int, optional
+        If given, duplicates are found by a ``DiskDeduplicator`` that spills
+        the rows to disk partitions and keeps about this many bytes in memory,
+        instead of an in-memory set of row hashes. The chunks are then
+        summarised in a second pass over the spilled rows.
+    n_jobs : int, optional
+        Worker processes used to de-duplicate partitions when
+        ``memory_limit`` is given. Defaults to 1.
+
+    Returns
+    -------
+    ColumnStats
+        Statistics of the cleaned dataset (duplicates removed).
+
+    Raises
+    ------
+    ValueError
+        If completely empty rows or unexpected species levels are found.
+    pandera.errors.SchemaErrors
+        If the schema validation of any chunk fails.
+
+    Examples
+    --------
+    >>> chunks = pd.read_csv("./data/raw/iris.csv", chunksize=50)
+    >>> stats = validate_data_chunked(chunks, "./data/processed/iris_clean.csv")
+    """
+    print("--- Starting Chunked Data Validation ---\n")
+
+    stats = None
+    duplicate_count = 0
+    header = True
+
+    def summarise(chunk):
+        nonlocal stats, header
+        chunk_stats = ColumnStats.from_frame(chunk, sketch_k=sketch_k)
+        stats = chunk_stats if stats is None else stats.merge(chunk_stats)
+        if output_path is not None:
+            chunk.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+
+    seen_rows = set()
+    dedup = None if memory_limit is None else DiskDeduplicator(memory_limit=memory_limit, n_jobs=n_jobs)
+
+    try:
+        for chunk in chunks:
+            # 1. Schema validation and blocking checks, one chunk at a time
+            chunk = validate_schema(chunk)
+            empty_rows = count_empty_rows(chunk)
+            if empty_rows > 0:
+                raise ValueError(f"Found {empty_rows} completely empty rows")
+
+            if dedup is not None:
+                dedup.add(chunk)
+                continue
+
+            # 2. Drop duplicates within the chunk and against earlier chunks
+            hashes = row_hashes(chunk)
+            is_new = ~pd.Series(hashes).duplicated().to_numpy()
+            is_new &= np.fromiter(
+                (h not in seen_rows for h in hashes.tolist()), dtype=bool, count=len(hashes)
+            )
+            seen_rows.update(hashes[is_new].tolist())
+            duplicate_count += int((~is_new).sum())
+            summarise(chunk[is_new])
+
+        if dedup is not None:
+            # 2. Second pass over the spilled rows once every duplicate is known
+            duplicate_count = int(dedup.duplicated().sum())
+            for chunk in dedup.unique_chunks():
+                summarise(chunk)
+    finally:
+        if dedup is not None:
+            dedup.close()
+
+    if stats is None:
+        raise ValueError("No data to validate")
+
+    print("Check: Initial schema validation passed (columns + types + ranges).\n")
+    print("Check: No completely empty rows found.")
+    _report_duplicates(duplicate_count, (stats.n_rows, len(stats.nan_counts)))
+
+    print("\n--- Running Non-Blocking Checks ---\n")
+
+    # 3. Dataset-level checks evaluated from the merged statistics
+    _run_non_blocking_checks(None, stats)
+
+    print("\n--- Data Validation Complete ---")
+    return stats
+
+
+def validate_data_incremental(rawdata, state_dir, block_size: int = 2**24, select=None) -> ColumnStats:
+    """
+    Validates only the rows appended to ``rawdata`` since the previous run.
+
+    The running state is persisted in ``state_dir`` between runs: the merged
+    ``ColumnStats`` (Chan/Welford moments and co-moments for the Z-score and
+    correlation checks, class counts for the target distribution, quantile
+    tables) and the byte offset up to which the raw file was read, in a
+    small pickle, and the 64-bit hashes of every row kept so far for
+    duplicate detection, in a ``HashStore``. Each run parses,
+    schema-validates and de-duplicates only the new lines, folds them into
+    the state and re-evaluates the dataset-level checks from the merged
+    statistics. New hashes are buffered and written to the store once per
+    run, which only rewrites runs of hashes of a similar size, so the cost
+    of a run grows with the size of the new data rather than with the total
+    history. The cleaned rows are appended to
+    ``iris_validated.csv`` in ``state_dir``.
+
+    The state is rebuilt from scratch if the raw file no longer extends the
+    data seen so far (it is shorter, or the bytes just before the stored
+    offset changed) or if ``validation_params`` changed.
+
+    Parameters
+    ----------
+    rawdata : str or path-like
+        Path to the append-only raw CSV file.
+    state_dir : str or path-like
+        Directory holding the persisted state and the cleaned rows.
+    block_size : int, optional
+        Bytes of new data parsed and validated at a time. Defaults to 16 MiB.
+    select : callable, optional
+        Applied to each chunk before validation, e.g. to drop leading columns.
+
+    Returns
+    -------
+    ColumnStats
+        Statistics of all cleaned rows validated so far.
+
+    Raises
+    ------
+    ValueError
+        If completely empty rows or unexpected species levels are found.
+    pandera.errors.SchemaErrors
+        If the schema validation of the new rows fails.
+
+    Examples
+    --------
+    >>> stats = validate_data_incremental("./data/raw/iris.csv", "./data/.cache/incremental")
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    state_path = os.path.join(state_dir, "state.pkl")
+    cleaned_path = os.path.join(state_dir, "iris_validated.csv")
+    params = hashlib.blake2b(json.dumps(validation_params(), sort_keys=True, default=str).encode()).hexdigest()
+
+    state = None
+    if os.path.exists(state_path):
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+        if (
+            state["params"] != params
+            or os.path.getsize(rawdata) < state["offset"]
+            or tail_digest(rawdata, state["offset"]) != state["tail"]
+        ):
+            print("Raw data or validation parameters changed; rebuilding the incremental state.\n")
+            state = None
+    if state is None:
+        state = {"params": params, "offset": 0, "columns": None, "stats": None,
+                 "hash_runs": [], "duplicates": 0, "cleaned_bytes": 0}
+    store = HashStore(os.path.join(state_dir, "hashes"), state["hash_runs"])
+
+    # Drop cleaned rows appended by an interrupted run that never saved its state
+    with open(cleaned_path, "ab") as f:
+        f.truncate(state["cleaned_bytes"])
+
+    print("--- Starting Incremental Data Validation ---\n")
+    previous_rows = 0 if state["stats"] is None else state["stats"].n_rows
+
+    new_rows = 0
+    offset = state["offset"]
+    for chunk, offset in read_appended(rawdata, state["offset"], state["columns"], block_size):
+        state["columns"] = list(chunk.columns)
+        if select is not None:
+            chunk = select(chunk)
+        new_rows += len(chunk)
+
+        chunk = validate_schema(chunk)
+        empty_rows = count_empty_rows(chunk)
+        if empty_rows > 0:
+            raise ValueError(f"Found {empty_rows} completely empty rows")
+
+        # Duplicates within the chunk and against every row kept so far
+        hashes = row_hashes(chunk)
+        is_new = ~pd.Series(hashes).duplicated().to_numpy() & ~store.isin(hashes)
+        store.add(hashes[is_new])
+        state["duplicates"] += int((~is_new).sum())
+        chunk = chunk[is_new]
+
+        chunk_stats = ColumnStats.from_frame(chunk)
+        state["stats"] = chunk_stats if state["stats"] is None else state["stats"].merge(chunk_stats)
+        chunk.to_csv(cleaned_path, mode="a", header=os.path.getsize(cleaned_path) == 0, index=False)
+
+    stats = state["stats"]
+    if stats is None:
+        raise ValueError("No data to validate")
+
+    state["offset"] = offset
+    state["tail"] = tail_digest(rawdata, offset)
+    state["cleaned_bytes"] = os.path.getsize(cleaned_path)
+    state["hash_runs"] = store.flush()
+    # Write the new state atomically so an interrupted run is simply redone
+    with open(state_path + ".tmp", "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(state_path + ".tmp", state_path)
+    store.prune()
+
+    print(f"Check: {new_rows} new rows validated ({previous_rows} cleaned rows already validated).")
+    print("Check: Initial schema validation passed (columns + types + ranges).\n")
+    print("Check: No completely empty rows found.")
+    _report_duplicates(state["duplicates"], (stats.n_rows, len(stats.nan_counts)))
+
+    print("\n--- Running Non-Blocking Checks ---\n")
+    _run_non_blocking_checks(None, stats)
+
+    print("\n--- Data Validation Complete ---")
+    return stats
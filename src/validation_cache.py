@@ -0,0 +1,149 @@
+# src/validation_cache.py
+import contextlib
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.file_utils import replace_file
+
+
+def file_digest(path, block_size: int = 2**20) -> str:
+    """
+    Computes a BLAKE2b digest of a file's content, reading it block by block.
+
+    Examples
+    --------
+    >>> file_digest("./data/raw/iris.csv")
+    '5f0c...'
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path, params: dict) -> str:
+    """
+    Builds a cache key from the content of a file and a dict of parameters.
+
+    Parameters
+    ----------
+    path : str or path-like
+        The input file whose content the cached result depends on.
+    params : dict
+        JSON-serialisable parameters the result depends on, e.g. the schema
+        definition and check thresholds.
+
+    Returns
+    -------
+    str
+        Hex digest identifying the (content, parameters) combination.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(file_digest(path).encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+@contextlib.contextmanager
+def capture_output():
+    """Captures everything printed inside the block while still printing it."""
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(_Tee(sys.stdout, buffer)):
+        yield buffer
+
+
+class ValidationCache:
+    """
+    Size-bounded on-disk cache of validation results.
+
+    Each entry holds the cleaned DataFrame returned by the validation step
+    and the report it printed, stored under a key built with ``cache_key``.
+    Entries are written atomically. When the directory grows past
+    ``max_bytes``, the least recently used entries are evicted first.
+
+    Parameters
+    ----------
+    cache_dir : str or path-like
+        Directory holding the cache entries. Created if it does not exist.
+    max_bytes : int, optional
+        Upper bound on the total size of the cache directory.
+        Defaults to 512 MiB.
+
+    Examples
+    --------
+    >>> cache = ValidationCache("./data/.cache/validation")
+    >>> key = cache_key("./data/raw/iris.csv", {"test_size": 0.3})
+    >>> entry = cache.get(key)
+    """
+
+    def __init__(self, cache_dir, max_bytes: int = 512 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Returns the stored ``{"data", "report"}`` entry, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        # Mark the entry as recently used for the eviction order
+        os.utime(path)
+        return entry
+
+    def put(self, key, data, report: str):
+        """Stores an entry atomically and evicts old entries over the size bound."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"data": data, "report": report}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        replace_file(tmp_path, self._path(key))
+        self.evict(keep=key)
+
+    def invalidate(self, key=None):
+        """Removes one entry, or every entry when ``key`` is None."""
+        keys = [key] if key is not None else [name[:-4] for name in os.listdir(self.cache_dir) if name.endswith(".pkl")]
+        for k in keys:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._path(k))
+
+    def evict(self, keep=None):
+        """Deletes least recently used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.invalidate(key)
+            total -= size
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.column_stats import ColumnStats, quantile_from_counts, count_empty_rows
+from src.validate_iris import validate_data, validate_data_chunked, check_outliers, check_zscore, check_iqr
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris() -> pd.DataFrame:
+    """Fixture with the raw iris data shipped in the repository."""
+    return pd.read_csv(RAW_DATA)
+
+
+def merged_stats(df, chunksize):
+    stats = ColumnStats.from_frame(df.iloc[:chunksize])
+    for start in range(chunksize, len(df), chunksize):
+        stats.merge(ColumnStats.from_frame(df.iloc[start:start + chunksize]))
+    return stats
+
+
+def test_quantile_from_counts_matches_pandas():
+    """Verifies the value-count quantile matches pandas linear interpolation."""
+    series = pd.Series([3.0, 1.0, 2.0, 2.0, 5.0, 1.0, 4.0])
+    counts = series.value_counts().sort_index()
+    for q in [0, 0.1, 0.25, 0.5, 0.75, 0.9, 1]:
+        assert quantile_from_counts(counts.index.to_numpy(), counts.to_numpy(), q) == pytest.approx(series.quantile(q))
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 50, 150])
+def test_merged_stats_match_full_frame(iris, chunksize):
+    """Verifies that merging per-chunk statistics gives the full-frame statistics."""
+    stats = merged_stats(iris, chunksize)
+    features = iris.drop(columns="species")
+
+    assert stats.n_rows == len(iris)
+    np.testing.assert_allclose(stats.std(), features.std())
+    np.testing.assert_allclose(stats.quantile(0.25), features.quantile(0.25))
+    np.testing.assert_allclose(stats.quantile(0.75), features.quantile(0.75))
+    np.testing.assert_allclose(stats.corr().loc[features.columns, features.columns], features.corr())
+    pd.testing.assert_series_equal(
+        stats.target_proportions(), iris["species"].value_counts(normalize=True), check_exact=False
+    )
+
+
+def test_merge_rejects_different_columns(iris):
+    """Verifies that statistics over different columns cannot be merged."""
+    stats = ColumnStats.from_frame(iris)
+    other = ColumnStats.from_frame(iris.drop(columns="petal_width"))
+    with pytest.raises(ValueError):
+        stats.merge(other)
+
+
+def test_from_frame_counts_missing_and_empty_rows():
+    """Verifies NaN counts and empty-row counts gathered in the single pass."""
+    df = pd.DataFrame({
+        "sepal_length": [5.1, np.nan, 4.7, 4.6],
+        "species": ["setosa", "versicolor", None, "setosa"],
+    })
+    stats = ColumnStats.from_frame(df)
+    pd.testing.assert_series_equal(stats.nan_counts, df.isna().sum())
+    assert stats.empty_rows == 0
+    assert count_empty_rows(pd.DataFrame({"a": ["", "x", ""], "b": ["", "", ""]})) == 2
+
+
+def test_parallel_from_frame_matches_serial(iris):
+    """Verifies statistics computed by workers over shared-memory partitions match the serial pass."""
+    df = iris.copy()
+    df.loc[3, "petal_width"] = np.nan
+    df.loc[7, "species"] = None
+    expected = ColumnStats.from_frame(df)
+    stats = ColumnStats.from_frame(df, n_jobs=2, partition_rows=40)
+
+    assert stats.n == expected.n and stats.n_rows == expected.n_rows
+    pd.testing.assert_series_equal(stats.nan_counts, expected.nan_counts)
+    pd.testing.assert_series_equal(stats.class_counts, expected.class_counts)
+    pd.testing.assert_series_equal(stats.quantile(0.25), expected.quantile(0.25))
+    np.testing.assert_allclose(stats.corr(), expected.corr())
+    np.testing.assert_allclose(stats.std(), expected.std())
+
+
+def test_parallel_validation_matches_serial(iris, capsys):
+    """Verifies validate_data prints the same verdicts and keeps the same rows with worker processes."""
+    expected = validate_data(iris)
+    expected_output = capsys.readouterr().out
+
+    pd.testing.assert_frame_equal(validate_data(iris, n_jobs=2), expected)
+    assert capsys.readouterr().out == expected_output
+
+
+@pytest.mark.parametrize("outlier", [None, 5.0, 50.0, "constant", "one_row"])
+def test_outlier_verdict_matches_per_value_masks(outlier, capsys):
+    """Verifies the stats-based outlier verdict agrees with the per-value Z-score and IQR masks."""
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(rng.uniform(1, 2, size=(200, 2)), columns=["sepal_length", "sepal_width"])
+    df["species"] = "setosa"
+    if outlier == "constant":
+        df["sepal_width"] = 3.0
+    elif outlier == "one_row":
+        df = df.iloc[:1]
+    elif outlier is not None:
+        df.loc[0, "sepal_width"] = outlier
+    features = df.drop(columns="species")
+    expected = not all(check_zscore(features[c]).all() and check_iqr(features[c]).all() for c in features)
+
+    check_outliers(df)
+    assert ("Outliers detected" in capsys.readouterr().out) == expected
+
+
+def test_chunked_validation_matches_in_memory(iris, tmp_path, capsys):
+    """Verifies chunked validation prints the same verdicts and keeps the same rows."""
+    expected = validate_data(iris)
+    expected_output = capsys.readouterr().out
+
+    output_path = tmp_path / "iris_clean.csv"
+    validate_data_chunked(pd.read_csv(RAW_DATA, chunksize=20), output_path)
+    chunked_output = capsys.readouterr().out
+
+    assert chunked_output.split("\n", 1)[1] == expected_output.split("\n", 1)[1]
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), expected.reset_index(drop=True))
+
+
+def test_chunked_validation_drops_duplicates_across_chunks(iris):
+    """Verifies that a row repeated in a later chunk is dropped."""
+    chunks = [iris.iloc[:10], iris.iloc[:5]]
+    stats = validate_data_chunked(chunks)
+    assert stats.n_rows == 10
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.columnar import read_columnar, write_columnar, write_columnar_chunks
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris() -> pd.DataFrame:
+    """Fixture with the raw iris data shipped in the repository."""
+    return pd.read_csv(RAW_DATA)
+
+
+def mapped(array) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_columnar_round_trip_uses_compact_types(iris, tmp_path):
+    """Verifies the columnar file restores the values with float32 features and categorical species."""
+    path = tmp_path / "iris.cols"
+    write_columnar(iris, path)
+    df = read_columnar(path)
+
+    assert list(df.columns) == list(iris.columns)
+    assert (df.drop(columns="species").dtypes == np.float32).all()
+    assert isinstance(df["species"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        df, iris.astype({col: np.float32 for col in iris.columns[:-1]} | {"species": "category"})
+    )
+
+
+def test_columnar_read_is_zero_copy(iris, tmp_path):
+    """Verifies the loaded columns are views of the memory-mapped file, and writes do not reach the file."""
+    path = tmp_path / "iris.cols"
+    write_columnar(iris, path)
+    df = read_columnar(path)
+
+    assert mapped(df["sepal_length"].to_numpy())
+    assert mapped(df["species"].cat.codes.to_numpy())
+
+    df.loc[0, "sepal_length"] = 100.0
+    assert read_columnar(path).loc[0, "sepal_length"] == np.float32(iris.loc[0, "sepal_length"])
+
+
+def test_columnar_handles_missing_values_and_column_subsets(tmp_path):
+    """Verifies NaN features, missing categories, empty frames and column selection."""
+    df = pd.DataFrame({"a": [1.5, np.nan, 3.0], "species": ["setosa", None, "virginica"]})
+    write_columnar(df, tmp_path / "missing.cols")
+    loaded = read_columnar(tmp_path / "missing.cols", columns=["species"])
+
+    assert list(loaded.columns) == ["species"]
+    assert loaded["species"].isna().tolist() == [False, True, False]
+    assert np.isnan(read_columnar(tmp_path / "missing.cols")["a"][1])
+
+    write_columnar(df.iloc[:0], tmp_path / "empty.cols")
+    assert read_columnar(tmp_path / "empty.cols").shape == (0, 2)
+
+
+def test_read_columnar_rejects_other_files(tmp_path):
+    """Verifies a file that is not in the columnar format raises a ValueError."""
+    path = tmp_path / "iris.cols"
+    path.write_text("sepal_length,species\n5.1,setosa\n")
+    with pytest.raises(ValueError, match="not a columnar"):
+        read_columnar(path)
+
+
+def test_chunked_write_matches_whole_frame(iris, tmp_path):
+    """Verifies writing chunks whose species categories differ gives the same file as writing the whole frame."""
+    write_columnar(iris, tmp_path / "whole.cols")
+    # Each chunk of 40 rows sees a different subset of the species
+    write_columnar_chunks(
+        lambda: (iris.iloc[start:start + 40] for start in range(0, len(iris), 40)), tmp_path / "chunked.cols"
+    )
+
+    assert (tmp_path / "chunked.cols").read_bytes() == (tmp_path / "whole.cols").read_bytes()
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.compiled_tree import CompiledTree, compile_tree, fold_thresholds
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+@pytest.fixture
+def tree_pipeline(iris):
+    """Fixture with a deep scaled decision tree pipeline fitted on noisy iris rows."""
+    X, y = iris
+    rng = np.random.default_rng(123)
+    noisy = pd.concat([X + rng.normal(0, 0.3, X.shape) for _ in range(20)], ignore_index=True)
+    return make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123)).fit(noisy, pd.concat([y] * 20))
+
+
+def boundary_rows(compiled, X):
+    """Rows of ``X`` with one feature set to a node's threshold or the float right above or below it."""
+    internal = np.flatnonzero(np.isfinite(compiled.threshold))
+    rows = X.sample(3 * len(internal), replace=True, random_state=123).to_numpy(copy=True)
+    for i, node in enumerate(np.repeat(internal, 3)):
+        rows[i, compiled.feature[node]] = np.nextafter(compiled.threshold[node], [-np.inf, 0, np.inf][i % 3]) \
+            if i % 3 != 1 else compiled.threshold[node]
+    return pd.DataFrame(rows, columns=X.columns)
+
+
+def test_compiled_tree_matches_pipeline_exactly(iris, tree_pipeline):
+    """Verifies the compiled tree predicts like the pipeline, including rows right at every threshold."""
+    X, _ = iris
+    compiled = compile_tree(tree_pipeline)
+    rows = boundary_rows(compiled, X)
+
+    assert compiled.max_depth > 5
+    np.testing.assert_array_equal(compiled.predict(X), tree_pipeline.predict(X))
+    np.testing.assert_array_equal(compiled.predict(rows), tree_pipeline.predict(rows))
+    np.testing.assert_array_equal(compiled.apply(rows), tree_pipeline[-1].apply(tree_pipeline[0].transform(rows)))
+    # Reordered columns and plain arrays work too; small chunks give the same result
+    np.testing.assert_array_equal(compiled.predict(rows[rows.columns[::-1]], chunk_rows=7), tree_pipeline.predict(rows))
+    np.testing.assert_array_equal(compiled.predict(rows.to_numpy()), tree_pipeline.predict(rows))
+
+
+def test_compiled_tree_sends_missing_values_like_the_tree(iris, tree_pipeline):
+    """Verifies rows with missing values follow the same branches as in the pipeline."""
+    X, _ = iris
+    rows = X.to_numpy(copy=True)
+    rows[::3, 2] = np.nan
+    rows[::5, 0] = np.nan
+    rows = pd.DataFrame(rows, columns=X.columns)
+
+    np.testing.assert_array_equal(compile_tree(tree_pipeline).predict(rows), tree_pipeline.predict(rows))
+
+
+def test_fold_thresholds_is_exact_where_the_formula_is_not():
+    """Verifies folded thresholds are the last raw values passing the scaled float32 test."""
+    threshold, mean, scale = np.array([0.1, -1.7, 3e38]), np.array([5.8, 3.0, 0.0]), np.array([0.83, 0.43, 1.0])
+    folded = fold_thresholds(threshold, mean, scale)
+
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    with np.errstate(over="ignore"):
+        assert goes_left(folded).all()
+        assert not goes_left(np.nextafter(folded, np.inf)).any()
+
+
+def test_compiled_tree_round_trips_through_npz(iris, tree_pipeline, tmp_path):
+    """Verifies a saved compiled tree loads without pickle and predicts the same."""
+    X, _ = iris
+    compiled = compile_tree(tree_pipeline)
+    compiled.save(tmp_path / "tree.npz")
+    loaded = CompiledTree.load(tmp_path / "tree.npz")
+
+    np.testing.assert_array_equal(loaded.predict(X), tree_pipeline.predict(X))
+    np.testing.assert_array_equal(loaded.feature_names_in_, X.columns)
+    assert loaded.predict(X).dtype == tree_pipeline.predict(X).dtype
+
+
+@pytest.mark.parametrize("labels", [[3, 7, 11], [1.0, 2.0, 3.0], [False, True, True]])
+def test_compiled_tree_round_trip_keeps_label_dtype(iris, tmp_path, labels):
+    """Verifies non-string class labels load with their own dtype and predict like the pipeline."""
+    X, y = iris
+    y = y.map(dict(zip(sorted(y.unique()), labels)))
+    pipeline = make_pipeline(StandardScaler(), DecisionTreeClassifier(max_depth=3, random_state=123)).fit(X, y)
+    compile_tree(pipeline).save(tmp_path / "tree.npz")
+    predictions = CompiledTree.load(tmp_path / "tree.npz").predict(X)
+
+    np.testing.assert_array_equal(predictions, pipeline.predict(X))
+    assert predictions.dtype == pipeline.predict(X).dtype
+
+
+def test_compile_tree_rejects_other_models(iris):
+    """Verifies models other than a scaled decision tree raise a ValueError."""
+    X, y = iris
+    with pytest.raises(ValueError):
+        compile_tree(make_pipeline(StandardScaler(), KNeighborsClassifier()).fit(X, y))
+    # A bare tree compiles without a scaler
+    tree = DecisionTreeClassifier(random_state=123).fit(X, y)
+    np.testing.assert_array_equal(compile_tree(tree).predict(X), tree.predict(X))
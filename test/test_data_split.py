@@ -1,9 +1,10 @@
+import numpy as np
 import pandas as pd
 import pytest
 import sys, os
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from src.data_split import split_data
+from src.data_split import split_data, split_data_streaming, hash_split_streaming, hash_test_mask
 
 
 @pytest.fixture
@@ -56,3 +57,97 @@ def test_split_data_reproducibility(sample_data):
 
     pd.testing.assert_frame_equal(train1, train2)
     pd.testing.assert_frame_equal(test1, test2)
+
+
+
+def chunked(df, chunksize):
+    return (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+
+
+def stream_split(df, tmp_path, chunksize, **kwargs):
+    counts = split_data_streaming(chunked(df, chunksize), tmp_path / "train.csv", tmp_path / "test.csv", **kwargs)
+    return counts, pd.read_csv(tmp_path / "train.csv"), pd.read_csv(tmp_path / "test.csv")
+
+
+def test_streaming_split_is_independent_of_chunking(sample_data, tmp_path):
+    """Verifies that the streamed split does not depend on the chunk size and is reproducible."""
+    counts, train, test = stream_split(sample_data, tmp_path, chunksize=100, random_state=7)
+    for chunksize in [1, 13]:
+        other_counts, other_train, other_test = stream_split(sample_data, tmp_path, chunksize, random_state=7)
+        assert other_counts == counts
+        pd.testing.assert_frame_equal(other_train, train)
+        pd.testing.assert_frame_equal(other_test, test)
+
+    assert counts == (len(train), len(test)) == (70, 30)
+    assert sorted([*train["feature_a"], *test["feature_a"]]) == list(range(100))
+    assert stream_split(sample_data, tmp_path, 100, random_state=8)[2]["feature_a"].tolist() != test["feature_a"].tolist()
+
+
+def test_streaming_split_stratifies_classes(tmp_path):
+    """Verifies each class gets the test proportion of its rows, however unbalanced the classes are."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "feature_a": rng.normal(size=20_000),
+        "target": rng.choice(["a", "b", "c"], size=20_000, p=[0.8, 0.15, 0.05]),
+    })
+    _, _, test = stream_split(df, tmp_path, chunksize=3_000, test_size=0.25, stratify="target", window=20)
+
+    for label, n in df["target"].value_counts().items():
+        assert abs((test["target"] == label).sum() - 0.25 * n) <= 20 * 0.25 + 1
+
+
+def test_hash_split_keeps_existing_rows_when_appending(sample_data):
+    """Verifies that appended rows do not move existing rows between the hash splits."""
+    train, test = split_data(sample_data, method="hash")
+    appended = pd.concat([sample_data, sample_data.assign(feature_a=sample_data["feature_a"] + 100)])
+    new_train, new_test = split_data(appended, method="hash")
+
+    pd.testing.assert_frame_equal(new_train.iloc[:len(train)], train)
+    pd.testing.assert_frame_equal(new_test.iloc[:len(test)], test)
+    assert len(new_train) + len(new_test) == 200
+
+
+def test_hash_split_is_a_function_of_key_and_seed(sample_data):
+    """Verifies the hash assignment depends only on the key columns and the seed."""
+    mask = hash_test_mask(sample_data, key="feature_a")
+    shuffled = sample_data.sample(frac=1, random_state=0).assign(feature_b=0)
+    reordered = hash_test_mask(shuffled, key="feature_a")
+
+    np.testing.assert_array_equal(reordered, mask[shuffled.index])
+    assert not np.array_equal(hash_test_mask(sample_data, random_state=1, key="feature_a"), mask)
+
+
+def test_hash_split_size_matches_test_size():
+    """Verifies the hash split puts about test_size of the rows in the test set."""
+    df = pd.DataFrame({"id": range(20_000)})
+    for test_size in [0.1, 0.3, 0.5]:
+        assert hash_test_mask(df, test_size=test_size, key="id").mean() == pytest.approx(test_size, abs=0.01)
+
+
+def test_split_data_rejects_unknown_method(sample_data):
+    """Verifies an unknown split method raises a ValueError."""
+    with pytest.raises(ValueError, match="Unknown split method"):
+        split_data(sample_data, method="random")
+
+
+def test_streaming_hash_split_matches_in_memory_hash_split(sample_data, tmp_path):
+    """Verifies the streamed hash split writes the rows split_data(method="hash") assigns, whatever the chunk size."""
+    train, test = split_data(sample_data, method="hash", random_state=5)
+    for chunksize in [1, 13, 100]:
+        counts = hash_split_streaming(
+            chunked(sample_data, chunksize), tmp_path / "train.csv", tmp_path / "test.csv", random_state=5
+        )
+        assert counts == (len(train), len(test))
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "train.csv"), train.reset_index(drop=True))
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "test.csv"), test.reset_index(drop=True))
+
+
+def test_streaming_hash_split_appends_new_rows(sample_data, tmp_path):
+    """Verifies appending the split of new rows gives the files of a split of all the rows."""
+    paths = tmp_path / "train.csv", tmp_path / "test.csv"
+    hash_split_streaming(chunked(sample_data.iloc[:60], 25), *paths, append=True)
+    hash_split_streaming(chunked(sample_data.iloc[60:], 25), *paths, append=True)
+
+    train, test = split_data(sample_data, method="hash")
+    pd.testing.assert_frame_equal(pd.read_csv(paths[0]), train.reset_index(drop=True))
+    pd.testing.assert_frame_equal(pd.read_csv(paths[1]), test.reset_index(drop=True))
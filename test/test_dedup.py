@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.dedup import DiskDeduplicator, HashStore, row_hashes
+import src.validate_iris as validate_iris
+from src.validate_iris import check_duplicates, validate_data, validate_data_chunked
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def repeated_data() -> pd.DataFrame:
+    """Fixture with many repeated rows drawn from a small pool of distinct rows."""
+    rng = np.random.default_rng(123)
+    pool = pd.DataFrame({
+        "sepal_length": rng.uniform(4, 8, 500).round(1),
+        "sepal_width": rng.uniform(2, 4, 500).round(1),
+        "species": rng.choice(["setosa", "versicolor", "virginica"], 500),
+    })
+    return pool.iloc[rng.integers(0, len(pool), 20_000)].reset_index(drop=True)
+
+
+def test_row_hashes_treat_signed_zero_as_equal():
+    """Verifies -0.0 and 0.0 hash alike, as DataFrame.duplicated treats them as equal."""
+    hashes = row_hashes(pd.DataFrame({"a": [0.0, -0.0], "b": ["x", "x"]}))
+    assert hashes[0] == hashes[1]
+
+
+@pytest.mark.parametrize("memory_limit, n_jobs", [(256 * 2**20, 1), (2**18, 1), (2**18, 2)])
+def test_disk_dedup_matches_pandas(repeated_data, memory_limit, n_jobs):
+    """Verifies spilled, partitioned duplicate detection gives the pandas mask, also when re-splitting."""
+    with DiskDeduplicator(memory_limit=memory_limit, n_jobs=n_jobs, bits=2) as dedup:
+        for start in range(0, len(repeated_data), 3000):
+            dedup.add(repeated_data.iloc[start:start + 3000])
+        mask = np.array(dedup.duplicated())
+        unique = pd.concat(dedup.unique_chunks())
+
+    np.testing.assert_array_equal(mask, repeated_data.duplicated().to_numpy())
+    pd.testing.assert_frame_equal(unique, repeated_data.drop_duplicates())
+
+
+def test_check_duplicates_disk_path_matches_pandas(repeated_data, capsys):
+    """Verifies check_duplicates drops and reports the same rows with a memory limit."""
+    expected = check_duplicates(repeated_data)
+    expected_output = capsys.readouterr().out
+    spilled = check_duplicates(repeated_data, memory_limit=2**18)
+
+    pd.testing.assert_frame_equal(spilled, expected)
+    assert capsys.readouterr().out == expected_output
+
+
+def test_chunked_validation_with_memory_limit(tmp_path):
+    """Verifies chunked validation keeps the same rows when duplicates are spilled to disk."""
+    in_memory, spilled = tmp_path / "in_memory.csv", tmp_path / "spilled.csv"
+    validate_data_chunked(pd.read_csv(RAW_DATA, chunksize=40), in_memory)
+    stats = validate_data_chunked(pd.read_csv(RAW_DATA, chunksize=40), spilled, memory_limit=2**20)
+
+    assert stats.n_rows == 149
+    pd.testing.assert_frame_equal(pd.read_csv(spilled), pd.read_csv(in_memory))
+
+
+def test_validate_data_spills_duplicates_under_memory_limit(monkeypatch, capsys):
+    """Verifies in-memory validation detects duplicates on disk with a memory limit, with the same result."""
+    spilling = []
+
+    class RecordingDeduplicator(DiskDeduplicator):
+        def __init__(self, *args, **kwargs):
+            spilling.append(kwargs["memory_limit"])
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(validate_iris, "DiskDeduplicator", RecordingDeduplicator)
+    df = pd.read_csv(RAW_DATA)
+    expected = validate_data(df)
+    expected_output = capsys.readouterr().out
+    pd.testing.assert_frame_equal(validate_data(df, memory_limit=2**20), expected)
+    assert capsys.readouterr().out == expected_output
+    assert spilling == [2**20]
+
+
+
+def test_hash_store_keeps_few_runs_across_appends(tmp_path):
+    """Verifies the store answers membership like a set over many flushes, with logarithmically many run files."""
+    rng = np.random.default_rng(0)
+    directory = tmp_path / "hashes"
+    runs, seen = [], set()
+    for _ in range(60):
+        store = HashStore(directory, runs)
+        for _ in range(3):
+            hashes = rng.integers(0, 5_000, 40).astype(np.uint64)
+            expected = np.array([h in seen for h in hashes.tolist()])
+            np.testing.assert_array_equal(store.isin(hashes), expected)
+            is_new = ~expected & ~pd.Series(hashes).duplicated().to_numpy()
+            store.add(hashes[is_new])
+            seen.update(hashes.tolist())
+        runs = store.flush()
+        store.prune()
+
+        assert len(store) == len(seen)
+        assert sorted(os.listdir(directory)) == sorted(runs)
+        assert len(runs) <= np.log2(len(seen)) + 1
+
+
+def test_hash_store_is_unchanged_until_the_new_runs_are_used(tmp_path):
+    """Verifies flushing leaves the files of the previous runs, so a state that still names them stays valid."""
+    store = HashStore(tmp_path, [])
+    store.add(np.array([1, 2, 3], dtype=np.uint64))
+    runs = store.flush()
+
+    store.add(np.array([4, 5, 6, 7], dtype=np.uint64))
+    store.flush()
+    previous = HashStore(tmp_path, runs)
+    np.testing.assert_array_equal(previous.isin(np.array([1, 4], dtype=np.uint64)), [True, False])
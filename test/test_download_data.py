@@ -0,0 +1,225 @@
+import hashlib
+import http.client
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.download_data import download, download_shards, main, read_manifest
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+class IrisHandler(BaseHTTPRequestHandler):
+    """Serves ``server.content`` with an ETag, Range and conditional request support."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        content, etag = server.content, f'"{hashlib.md5(server.content).hexdigest()}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == etag:
+            start = int(self.headers["Range"][len("bytes="):-1])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content) - start))
+        self.end_headers()
+
+        body = content[start:]
+        if server.cut_after is not None:
+            # Simulate a dropped connection part way through the body
+            body, server.cut_after = body[:server.cut_after], None
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ShardHandler(BaseHTTPRequestHandler):
+    """Serves ``server.files`` over keep-alive connections after ``server.latency`` seconds."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections.append(self.client_address)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = self.server.files[self.path]
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    return httpd
+
+
+@pytest.fixture
+def shard_server():
+    with open(RAW_DATA, "rb") as f:
+        header, *rows = f.read().splitlines(keepends=True)
+    httpd = serve(ShardHandler)
+    httpd.connections, httpd.latency, httpd.original = [], 0.0, header + b"".join(rows)
+    httpd.files = {
+        f"/part-{i}.csv": header + b"".join(rows[start:start + 10])
+        for i, start in enumerate(range(0, len(rows), 10))
+    }
+    httpd.files["/manifest.txt"] = "".join(
+        f"{name[1:]} {hashlib.sha256(body).hexdigest()}\n" for name, body in httpd.files.items()
+    ).encode()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    with open(RAW_DATA, "rb") as f:
+        content = f.read()
+    httpd = serve(IrisHandler)
+    httpd.content, httpd.requests, httpd.cut_after = content, [], None
+    httpd.url += "/iris.csv"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_writes_file_and_skips_unchanged_source(server, tmp_path):
+    """This test is to make sure the file is downloaded once and then revalidated without a transfer"""
+
+    path = tmp_path / "raw" / "iris.csv"
+    assert download(server.url, path, sha256=hashlib.sha256(server.content).hexdigest())
+    assert path.read_bytes() == server.content
+
+    assert not download(server.url, path)
+    assert server.requests[-1]["If-None-Match"] == f'"{hashlib.md5(server.content).hexdigest()}"'
+
+
+def test_download_refetches_changed_source(server, tmp_path):
+    """This test is to make sure a changed source replaces the local copy"""
+
+    path = tmp_path / "iris.csv"
+    download(server.url, path)
+    server.content = server.content + b"5.0,3.0,1.0,0.1,setosa\n"
+
+    assert download(server.url, path)
+    assert path.read_bytes() == server.content
+
+
+def test_interrupted_download_resumes_with_range(server, tmp_path):
+    """This test is to make sure an interrupted download continues from the bytes already on disk"""
+
+    path = tmp_path / "iris.csv"
+    server.cut_after = 1000
+    with pytest.raises((http.client.IncompleteRead, OSError)):
+        download(server.url, path, chunk_size=256)
+    assert not path.exists()
+    assert os.path.getsize(f"{path}.part") == 1000
+
+    assert download(server.url, path, sha256=hashlib.sha256(server.content).hexdigest())
+    assert server.requests[-1]["Range"] == "bytes=1000-"
+    assert path.read_bytes() == server.content
+
+
+def test_resume_restarts_when_source_changed(server, tmp_path):
+    """This test is to make sure a partial file of an older version is not stitched to a newer one"""
+
+    path = tmp_path / "iris.csv"
+    server.cut_after = 1000
+    with pytest.raises((http.client.IncompleteRead, OSError)):
+        download(server.url, path)
+    server.content = server.content.replace(b"setosa", b"Setosa")
+
+    assert download(server.url, path)
+    assert path.read_bytes() == server.content
+
+
+def test_checksum_mismatch_discards_download(server, tmp_path):
+    """This test is to make sure content with the wrong checksum is never written to the destination"""
+
+    path = tmp_path / "iris.csv"
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download(server.url, path, sha256="0" * 64)
+    assert not path.exists()
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_failed_download_exits_with_an_error(server, tmp_path):
+    """This test is to make sure a failed download makes the script exit non-zero without writing data"""
+
+    path = tmp_path / "iris.csv"
+    result = CliRunner().invoke(main, ["--url", server.url, "--path", str(path), "--sha256", "0" * 64])
+    assert result.exit_code == 1
+    assert "Failed to download or save data" in result.output
+    assert not path.exists()
+
+
+def test_checksum_of_sharded_download_is_rejected(shard_server, tmp_path):
+    """This test is to make sure --sha256 is refused for several shards instead of being silently ignored"""
+
+    path = tmp_path / "iris.csv"
+    urls = [f"--url={shard_server.url}/part-{i}.csv" for i in range(2)]
+    result = CliRunner().invoke(main, [*urls, "--path", str(path), "--sha256", "0" * 64])
+    assert result.exit_code == 2
+    assert "--sha256" in result.output
+    assert not path.exists()
+
+
+def test_shards_from_manifest_are_concatenated(shard_server, tmp_path):
+    """This test is to make sure the shards listed in a manifest are joined back into the original file"""
+
+    path = tmp_path / "iris.csv"
+    shards = read_manifest(f"{shard_server.url}/manifest.txt")
+    assert len(shards) == 15 and all(sha256 for _, sha256 in shards)
+
+    assert download_shards(shards, path)
+    assert path.read_bytes() == shard_server.original
+    assert not download_shards(shards, path)
+
+
+def test_shards_download_concurrently_over_pooled_connections(shard_server, tmp_path):
+    """This test is to make sure shards are fetched in parallel, reusing at most one connection per worker"""
+
+    shard_server.latency = 0.1
+    urls = [f"{shard_server.url}/part-{i}.csv" for i in range(15)]
+
+    start = time.perf_counter()
+    download_shards(urls, tmp_path / "iris.csv", concurrency=5)
+    elapsed = time.perf_counter() - start
+
+    # Serially the per-request latency alone would add up to 1.5 s
+    assert elapsed < 0.75
+    assert len(shard_server.connections) <= 5
+    assert (tmp_path / "iris.csv").read_bytes() == shard_server.original
@@ -0,0 +1,61 @@
+import os
+import stat
+
+import pandas as pd
+import pytest
+import sys
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.columnar import write_columnar
+from src.file_utils import current_umask
+from src.model_registry import ModelRegistry
+from src.save_model import MMAP_MODEL_SUFFIX, save_model
+from src.validation_cache import ValidationCache
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def umask():
+    """Fixture running the test under a umask of 027, restoring the previous one."""
+    previous = os.umask(0o027)
+    yield 0o027
+    os.umask(previous)
+
+
+def mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_current_umask_reads_the_process_umask(umask):
+    """Verifies the umask is read without being changed."""
+    assert current_umask() == umask
+    assert current_umask() == umask
+
+
+def test_atomically_written_artifacts_follow_the_umask(umask, tmp_path):
+    """Verifies models, columnar splits, registry entries and cache entries get the umask's mode, not 0600."""
+    df = pd.read_csv(RAW_DATA)
+    model = make_pipeline(StandardScaler(), DecisionTreeClassifier(max_depth=2)).fit(
+        df.drop(columns="species"), df["species"]
+    )
+    save_model(model, tmp_path / f"tree{MMAP_MODEL_SUFFIX}", format="mmap")
+    write_columnar(df, tmp_path / "iris.cols")
+    registry = ModelRegistry(tmp_path / "registry")
+    model_id = registry.register(model, "decision_tree")
+    cache = ValidationCache(tmp_path / "cache")
+    cache.put("key", df, "Check: OK\n")
+
+    paths = [
+        tmp_path / f"tree{MMAP_MODEL_SUFFIX}",
+        tmp_path / "iris.cols",
+        tmp_path / "registry" / "objects" / f"{model_id}{MMAP_MODEL_SUFFIX}",
+        tmp_path / "registry" / "objects" / f"{model_id}.json",
+        tmp_path / "registry" / "names" / "decision_tree.json",
+        *(tmp_path / "cache").iterdir(),
+    ]
+    for path in paths:
+        assert mode(path) == 0o640, path
@@ -0,0 +1,77 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.column_stats import ColumnStats
+from src.validate_iris import validate_data, validate_data_incremental
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def raw_lines() -> list:
+    """Fixture with the lines of the raw iris file, header first."""
+    with open(RAW_DATA) as f:
+        return f.readlines()
+
+
+def full_validation(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return validate_data(pd.read_csv(path)).reset_index(drop=True)
+
+
+def test_incremental_runs_match_full_validation(raw_lines, tmp_path, capsys):
+    """Verifies that validating appended batches gives the same rows and statistics as one full run."""
+    raw, state = tmp_path / "raw.csv", tmp_path / "state"
+    raw.write_text("".join(raw_lines[:60]))
+    validate_data_incremental(raw, state, block_size=256)
+
+    for start, stop in [(60, 120), (120, len(raw_lines))]:
+        with open(raw, "a") as f:
+            f.write("".join(raw_lines[start:stop]))
+        stats = validate_data_incremental(raw, state, block_size=256)
+        assert f"{stop - start} new rows validated" in capsys.readouterr().out
+
+    expected = full_validation(raw)
+    pd.testing.assert_frame_equal(pd.read_csv(state / "iris_validated.csv"), expected)
+    np.testing.assert_allclose(stats.corr(), ColumnStats.from_frame(expected).corr())
+    np.testing.assert_allclose(stats.quantile(0.75), expected.drop(columns="species").quantile(0.75))
+
+
+def test_incomplete_trailing_line_waits_for_next_run(raw_lines, tmp_path):
+    """Verifies that a line still being written is only validated once it is complete."""
+    raw, state = tmp_path / "raw.csv", tmp_path / "state"
+    raw.write_text("".join(raw_lines[:11]) + raw_lines[11].rstrip("\n"))
+    assert validate_data_incremental(raw, state).n_rows == 10
+
+    with open(raw, "a") as f:
+        f.write("\n")
+    assert validate_data_incremental(raw, state).n_rows == 11
+
+
+def test_rewritten_file_rebuilds_state(raw_lines, tmp_path, capsys):
+    """Verifies the state is rebuilt when the raw file is not an extension of the previous one."""
+    raw, state = tmp_path / "raw.csv", tmp_path / "state"
+    raw.write_text("".join(raw_lines[:51]))
+    validate_data_incremental(raw, state)
+
+    raw.write_text("".join([raw_lines[0], *raw_lines[101:]]))
+    stats = validate_data_incremental(raw, state)
+    assert "rebuilding the incremental state" in capsys.readouterr().out
+    assert stats.n_rows == len(full_validation(raw))
+
+
+def test_interrupted_run_does_not_duplicate_cleaned_rows(raw_lines, tmp_path):
+    """Verifies rows written by a run that did not save its state are discarded."""
+    raw, state = tmp_path / "raw.csv", tmp_path / "state"
+    raw.write_text("".join(raw_lines[:51]))
+    validate_data_incremental(raw, state)
+    with open(state / "iris_validated.csv", "a") as f:
+        f.write("5.0,3.0,1.0,0.1,setosa\n")
+
+    validate_data_incremental(raw, state)
+    assert len(pd.read_csv(state / "iris_validated.csv")) == 50
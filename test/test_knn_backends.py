@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.base import clone
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.knn_backends import BackendKNeighborsClassifier, BruteForceIndex, IVFIndex, make_index, select_backend
+from src.knn_search import NeighborGraphSearchCV
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+KNN_GRID = {"kneighborsclassifier__n_neighbors": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+def clustered(n_rows, seed):
+    """Rows drawn around 50 well separated centers in 16 dimensions."""
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(0).normal(scale=5, size=(50, 16))
+    return centers[rng.integers(0, 50, n_rows)] + rng.normal(size=(n_rows, 16))
+
+
+@pytest.mark.parametrize("backend", ["kd_tree", "ball_tree", "brute_blas"])
+def test_exact_backends_find_the_exact_neighbors(backend):
+    """Verifies exact backends return sklearn's neighbor distances, also across many small tiles."""
+    rng = np.random.default_rng(123)
+    X, queries = rng.normal(size=(3000, 12)), rng.normal(size=(500, 12))
+    expected_dist, expected_ind = NearestNeighbors(n_neighbors=7, algorithm="brute").fit(X).kneighbors(queries)
+
+    for tile_mib in [32, 0.05]:
+        dist, ind = make_index(backend, *X.shape, 7, tile_mib=tile_mib).fit(X).kneighbors(queries)
+        np.testing.assert_allclose(dist, expected_dist, rtol=1e-12)
+        np.testing.assert_array_equal(ind, expected_ind)
+
+
+@pytest.mark.parametrize("backend", ["auto", "kd_tree", "ball_tree", "brute_blas"])
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+def test_classifier_matches_kneighbors_classifier(iris, backend, weights):
+    """Verifies predictions and probabilities equal KNeighborsClassifier's on iris, ties included."""
+    X, y = iris
+    for k in [1, 5, 15]:
+        model = make_pipeline(StandardScaler(), BackendKNeighborsClassifier(k, weights=weights, backend=backend))
+        reference = make_pipeline(StandardScaler(), KNeighborsClassifier(k, weights=weights))
+        model.fit(X, y)
+        reference.fit(X, y)
+        np.testing.assert_array_equal(model.predict(X), reference.predict(X))
+        np.testing.assert_allclose(model.predict_proba(X), reference.predict_proba(X))
+
+
+@pytest.mark.parametrize("backend", ["kd_tree", "ball_tree", "brute_blas", "ivf"])
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+def test_predict_proba_matches_brute_force_classifier(backend, weights):
+    """Verifies every backend votes like KNeighborsClassifier(algorithm="brute"), without sklearn's private dispatch."""
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(600, 6))
+    # Repeated rows give exact matches, which decide distance-weighted votes on their own
+    X[300:320] = X[:20]
+    y = rng.choice(np.array(["a", "b", "c"]), size=len(X))
+    # with the same labels, so a tie between copies does not change the votes
+    y[300:320] = y[:20]
+    queries = np.vstack([rng.normal(size=(200, 6)), X[:20]])
+
+    model = BackendKNeighborsClassifier(7, weights=weights, backend=backend, recall_target=1.0).fit(X, y)
+    reference = KNeighborsClassifier(7, weights=weights, algorithm="brute").fit(X, y)
+    np.testing.assert_allclose(model.predict_proba(queries), reference.predict_proba(queries))
+    np.testing.assert_array_equal(model.predict(queries), reference.predict(queries))
+    assert model._fit_method == "brute"
+
+
+def test_ivf_index_reaches_its_recall_target():
+    """Verifies the approximate index is tuned to the recall target with fewer lists than a full scan."""
+    X, queries = clustered(20000, seed=1), clustered(1000, seed=2)
+    index = IVFIndex(n_neighbors=10, recall_target=0.9).fit(X)
+    _, exact = BruteForceIndex(10).fit(X).kneighbors(queries)
+    _, found = index.kneighbors(queries)
+
+    assert index.recall_ >= 0.9
+    assert index.n_probe_ < len(index._centroids)
+    assert np.mean([len(np.intersect1d(a, b)) / 10 for a, b in zip(found, exact)]) >= 0.85
+    # Every query gets distinct neighbors, even from lists smaller than k
+    _, found = index.kneighbors(queries, n_neighbors=300)
+    assert all(len(np.unique(row)) == 300 for row in found)
+
+
+def test_select_backend_follows_data_size():
+    """Verifies the automatic choice of backend and the error on an unknown one."""
+    assert select_backend(120, 4) == "kd_tree"
+    assert select_backend(1_000_000, 4, recall_target=0.9) == "kd_tree"
+    assert select_backend(1_000_000, 64) == "brute_blas"
+    assert select_backend(1_000_000, 64, recall_target=0.9) == "ivf"
+    assert select_backend(1_000, 64, recall_target=0.9) == "brute_blas"
+    with pytest.raises(ValueError):
+        make_index("annoy", 100, 4, 5)
+
+
+def test_neighbor_graph_search_uses_the_backend(iris):
+    """Verifies a search over a backend classifier scores like one over KNeighborsClassifier."""
+    X, y = iris
+    model = BackendKNeighborsClassifier(backend="brute_blas")
+    search = NeighborGraphSearchCV(
+        make_pipeline(StandardScaler(), model).set_params(backendkneighborsclassifier__tile_mib=1),
+        {"backendkneighborsclassifier__n_neighbors": range(1, 20)},
+    ).fit(X, y)
+    reference = NeighborGraphSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID).fit(X, y)
+
+    np.testing.assert_allclose(search.cv_results_["mean_test_score"], reference.cv_results_["mean_test_score"])
+    assert search.best_estimator_[-1].backend_ == "brute_blas"
+    assert clone(model).get_params() == model.get_params()
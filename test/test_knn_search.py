@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.model_selection import GridSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.knn_search import NeighborGraphSearchCV
+from src.model_train_and_evaluation import train
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+GRID = {"kneighborsclassifier__n_neighbors": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+def test_neighbor_graph_search_matches_grid_search(iris, weights):
+    """Verifies every candidate gets the same train and test scores as a full GridSearchCV."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier(weights=weights))
+    expected = GridSearchCV(pipe, GRID, cv=5, return_train_score=True).fit(X, y)
+    search = NeighborGraphSearchCV(pipe, GRID, cv=5).fit(X, y)
+
+    for key in ["mean_test_score", "mean_train_score", "split3_test_score", "rank_test_score"]:
+        np.testing.assert_allclose(search.cv_results_[key], expected.cv_results_[key])
+    assert search.best_params_ == expected.best_params_
+    assert search.best_estimator_.score(X, y) == expected.best_estimator_.score(X, y)
+
+
+def test_neighbor_graph_search_rejects_other_parameters(iris):
+    """Verifies the engine refuses grids over anything but n_neighbors of a KNN step."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    with pytest.raises(ValueError, match="only searches"):
+        NeighborGraphSearchCV(pipe, {**GRID, "kneighborsclassifier__weights": ["distance"]}).fit(X, y)
+
+
+def test_train_returns_same_table_with_neighbor_graph_strategy(iris):
+    """Verifies train() gives the same result table columns and ranking with both engines."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    _, random_result = train(X, y, pipe, GRID, n_iter=19)
+    _, graph_result = train(X, y, pipe, GRID, strategy="neighbor_graph")
+
+    assert list(graph_result.columns) == list(random_result.columns)
+    np.testing.assert_allclose(
+        np.sort(graph_result["mean_test_score"].to_numpy()), np.sort(random_result["mean_test_score"].to_numpy())
+    )
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.columnar import write_columnar
+from src.load_data import compact_dtypes, read_iris
+from src.validate_iris import validate_data, validate_schema
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris() -> pd.DataFrame:
+    """Fixture with the raw iris data shipped in the repository."""
+    return pd.read_csv(RAW_DATA)
+
+
+def test_read_iris_uses_compact_dtypes(iris):
+    """Verifies CSV features load as float32 and species as a categorical, in less than half the memory."""
+    df = read_iris(RAW_DATA)
+
+    assert (df.drop(columns="species").dtypes == np.float32).all()
+    assert isinstance(df["species"].dtype, pd.CategoricalDtype)
+    assert df.memory_usage(deep=True).sum() < iris.memory_usage(deep=True).sum() / 2
+    pd.testing.assert_frame_equal(df, compact_dtypes(iris))
+
+
+def test_read_iris_reads_columnar_files_and_chunks(iris, tmp_path):
+    """Verifies .cols files are read columnar and both formats can be read in chunks."""
+    write_columnar(iris, tmp_path / "iris.cols")
+    pd.testing.assert_frame_equal(read_iris(tmp_path / "iris.cols"), read_iris(RAW_DATA))
+
+    for path in [RAW_DATA, tmp_path / "iris.cols"]:
+        chunks = list(read_iris(path, chunksize=40))
+        assert [len(chunk) for chunk in chunks] == [40, 40, 40, 30]
+        assert all(chunk["sepal_length"].dtype == np.float32 for chunk in chunks)
+
+
+def test_read_iris_leaves_malformed_columns_for_validation(tmp_path):
+    """Verifies a column that does not parse as float is kept as is instead of failing the load."""
+    path = tmp_path / "iris.csv"
+    path.write_text("sepal_length,sepal_width,species\n5.1,3.5,setosa\nfive,3.0,setosa\n")
+    df = read_iris(path)
+
+    assert df["sepal_length"].dtype == object
+    assert df["sepal_width"].dtype == np.float32
+    assert isinstance(df["species"].dtype, pd.CategoricalDtype)
+
+
+def test_schema_accepts_compact_dtypes_without_upcasting(capsys):
+    """Verifies validation keeps float32 features and categorical species, with the same verdicts."""
+    df = read_iris(RAW_DATA)
+    assert validate_schema(df) is df
+
+    compact = validate_data(df)
+    compact_output = capsys.readouterr().out
+    default = validate_data(pd.read_csv(RAW_DATA))
+
+    assert compact["petal_width"].dtype == np.float32
+    assert isinstance(compact["species"].dtype, pd.CategoricalDtype)
+    assert compact_output == capsys.readouterr().out
+    pd.testing.assert_frame_equal(compact, compact_dtypes(default))
@@ -0,0 +1,115 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src import model_registry
+from src.model_registry import ModelRegistry
+from src.validation_cache import file_digest
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+def knn(X, y, n_neighbors):
+    """A fitted KNN pipeline."""
+    return make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=n_neighbors)).fit(X, y)
+
+
+@pytest.mark.parametrize("format", ["mmap", "pickle"])
+def test_register_stores_versions_by_content(iris, tmp_path, format):
+    """Verifies models are stored under their content hash with their record, and names point to the latest."""
+    X, y = iris
+    registry = ModelRegistry(tmp_path, format=format)
+    first = registry.register(knn(X, y, 5), "knn", data_hash=file_digest(RAW_DATA), params={"n_neighbors": 5},
+                              cv_scores={"mean_test_score": 0.95})
+    second = registry.register(knn(X, y, 7), "knn", params={"n_neighbors": 7})
+
+    assert first != second
+    assert registry.versions("knn") == [first, second]
+    assert registry.resolve("knn") == second
+    record = registry.record(first)
+    assert record["data_hash"] == file_digest(RAW_DATA)
+    assert record["params"] == {"n_neighbors": 5}
+    assert record["cv_scores"] == {"mean_test_score": 0.95}
+
+    # An identical model is neither stored again nor a new version
+    assert registry.register(knn(X, y, 7), "knn") == second
+    assert registry.versions("knn") == [first, second]
+    assert len(os.listdir(tmp_path / "objects")) == 4
+    np.testing.assert_array_equal(registry.load(first).predict(X), knn(X, y, 5).predict(X))
+    with pytest.raises(KeyError):
+        registry.load("decision_tree")
+
+
+def test_load_keeps_recently_used_models_in_memory(iris, tmp_path, monkeypatch):
+    """Verifies loaded models are reused without reading the disk and the least recently used is dropped."""
+    X, y = iris
+    registry = ModelRegistry(tmp_path, max_loaded=2)
+    ids = [registry.register(knn(X, y, k), f"knn{k}") for k in [1, 3, 5]]
+
+    reads = []
+    original = model_registry.load_model
+    monkeypatch.setattr(model_registry, "load_model", lambda path, **kwargs: reads.append(path) or original(path, **kwargs))
+
+    first = registry.load(ids[0])
+    assert registry.load("knn1") is first
+    registry.load(ids[1])
+    registry.load(ids[0])
+    registry.load(ids[2])
+    assert len(reads) == 3
+    # ids[1] was the least recently used
+    registry.load(ids[0])
+    registry.load(ids[1])
+    assert len(reads) == 4
+
+
+@pytest.mark.parametrize("format", ["mmap", "pickle"])
+def test_load_rejects_a_corrupted_artifact(iris, tmp_path, format):
+    """Verifies an artifact whose content no longer matches its id is neither loaded nor cached."""
+    X, y = iris
+    registry = ModelRegistry(tmp_path, format=format)
+    model_id = registry.register(knn(X, y, 5), "knn")
+    path = next((tmp_path / "objects").glob(f"{model_id}.[mp]*"))
+    content = bytearray(path.read_bytes())
+    content[-1] ^= 0xFF
+    path.write_bytes(bytes(content))
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="corrupted"):
+            registry.load("knn")
+
+
+def test_load_is_thread_safe(iris, tmp_path):
+    """Verifies threads loading the same versions concurrently all get the single cached model."""
+    X, y = iris
+    registry = ModelRegistry(tmp_path, max_loaded=4)
+    ids = [registry.register(knn(X, y, k), "knn") for k in [1, 3]]
+
+    loaded = [[] for _ in ids]
+
+    def worker():
+        for _ in range(20):
+            for i, model_id in enumerate(ids):
+                loaded[i].append(registry.load(model_id))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for i, model_id in enumerate(ids):
+        assert all(model is registry.load(model_id) for model in loaded[i])
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.model_train_and_evaluation import train
+from src.search_utils import halving_time_report
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+GRID = {
+    "kneighborsclassifier__n_neighbors": range(1, 20),
+    "kneighborsclassifier__weights": ["uniform", "distance"],
+}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the raw iris data repeated with noise, large enough for several halving rounds."""
+    df = pd.read_csv(RAW_DATA)
+    big = df.sample(1200, replace=True, random_state=123)
+    noise = np.random.default_rng(123).normal(0, 0.2, (len(big), 4))
+    return big.drop(columns="species") + noise, big["species"]
+
+
+def test_halving_search_keeps_result_table_shape(iris, capsys):
+    """Verifies the halving strategy returns the usual table, one row per candidate with the survivors first."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    search, result = train(X, y, pipe, GRID, strategy="halving")
+    _, random_result = train(X, y, pipe, GRID, n_iter=2)
+
+    assert sorted(result.columns) == sorted(random_result.columns)
+    assert len(result) == 5
+    assert search.n_iterations_ > 2
+    best = result.iloc[0]
+    assert search.best_params_ == {
+        "kneighborsclassifier__n_neighbors": best["param_kneighborsclassifier__n_neighbors"],
+        "kneighborsclassifier__weights": best["param_kneighborsclassifier__weights"],
+    }
+    assert "saved" in capsys.readouterr().out
+
+
+def test_halving_search_respects_budget(iris):
+    """Verifies no round uses more training samples than the budget and the time report adds up."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    search, _ = train(X, y, pipe, GRID, strategy="halving", budget=400, factor=2)
+
+    assert max(search.n_resources_) <= 400
+    assert search.n_candidates_[0] == 38
+    report = halving_time_report(search)
+    assert 0 < report["spent"] < report["exhaustive"]
+    assert report["saved"] == pytest.approx(report["exhaustive"] - report["spent"])
+
+
+def test_train_rejects_unknown_strategy(iris):
+    """Verifies a misspelled strategy fails instead of silently running the default search."""
+    X, y = iris
+    with pytest.raises(ValueError, match="Unknown search strategy"):
+        train(X, y, make_pipeline(KNeighborsClassifier()), GRID, strategy="halfing")
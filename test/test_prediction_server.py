@@ -0,0 +1,130 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.compiled_tree import compile_tree
+from src.prediction_server import MicroBatcher, PredictionServer, load_models, request_json
+from src.save_model import save_model
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+@pytest.fixture
+def models(iris):
+    """Fixture with the two pipelines trained like the saved models."""
+    X, y = iris
+    return {
+        "decision_tree": make_pipeline(StandardScaler(), DecisionTreeClassifier(max_depth=3, random_state=123)).fit(X, y),
+        "knn": make_pipeline(StandardScaler(), KNeighborsClassifier()).fit(X, y),
+    }
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    """Verifies concurrent requests share batches within the row limit and each gets its own predictions."""
+    batches = []
+
+    def predict(X):
+        batches.append(len(X))
+        return X[:, 0] * 10
+
+    async def run():
+        batcher = MicroBatcher(predict, max_batch_rows=8, max_wait_ms=50)
+        task = asyncio.create_task(batcher.run())
+        requests = [np.full((1 + i % 3, 2), i, dtype=float) for i in range(20)]
+        results = await asyncio.gather(*[batcher.predict(rows) for rows in requests])
+        task.cancel()
+        return requests, results
+
+    requests, results = asyncio.run(run())
+    for rows, result in zip(requests, results):
+        np.testing.assert_array_equal(result, rows[:, 0] * 10)
+    assert sum(batches) == sum(len(rows) for rows in requests)
+    assert max(batches) <= 8
+    assert len(batches) < len(requests)
+
+
+def test_micro_batcher_fails_only_its_batch():
+    """Verifies a failing batch raises in its requests while the batcher keeps serving."""
+    def predict(X):
+        if (X < 0).any():
+            raise ValueError("negative feature")
+        return X[:, 0]
+
+    async def run():
+        batcher = MicroBatcher(predict, max_wait_ms=0)
+        task = asyncio.create_task(batcher.run())
+        with pytest.raises(ValueError):
+            await batcher.predict(np.array([[-1.0]]))
+        result = await batcher.predict(np.array([[2.0]]))
+        task.cancel()
+        return result
+
+    np.testing.assert_array_equal(asyncio.run(run()), [2.0])
+
+
+def test_server_predicts_like_the_models(iris, models, tmp_path):
+    """Verifies served predictions over TCP and a Unix socket equal the models' own, with stats and errors."""
+    X, _ = iris
+
+    async def run(unix_socket):
+        server = PredictionServer(models, max_wait_ms=1)
+        listener = await server.start(port=0, unix_socket=unix_socket)
+        if unix_socket:
+            reader, writer = await asyncio.open_unix_connection(unix_socket)
+        else:
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        answers = {
+            name: await request_json(reader, writer, "POST", f"/predict/{name}", {"rows": X.to_numpy().tolist()})
+            for name in models
+        }
+        by_name = await request_json(
+            reader, writer, "POST", "/predict/knn", {"rows": X.iloc[:3].to_dict(orient="records")}
+        )
+        errors = [
+            await request_json(reader, writer, "POST", "/predict/knn", {"rows": [[1.0, 2.0]]}),
+            await request_json(reader, writer, "POST", "/predict/svm", {"rows": [[1.0, 2.0, 3.0, 4.0]]}),
+            await request_json(reader, writer, "GET", "/predict/knn"),
+        ]
+        stats = await request_json(reader, writer, "GET", "/stats")
+        writer.close()
+        await server.stop()
+        return answers, by_name, errors, stats
+
+    for unix_socket in [None, str(tmp_path / "server.sock")]:
+        answers, by_name, errors, (_, stats) = asyncio.run(run(unix_socket))
+        for name, model in models.items():
+            assert answers[name] == (200, {"predictions": model.predict(X).tolist()})
+        assert by_name == (200, {"predictions": models["knn"].predict(X.iloc[:3]).tolist()})
+        assert [status for status, _ in errors] == [400, 404, 405]
+        assert stats["knn"]["requests"] == 2 and stats["knn"]["rows"] == len(X) + 3
+        assert stats["knn"]["errors"] == 1
+        assert stats["knn"]["latency_p99_ms"] >= stats["knn"]["latency_p50_ms"] > 0
+
+
+def test_load_models_reads_saved_and_compiled_models(iris, models, tmp_path):
+    """Verifies the saved pickles, or the compiled tree, are loaded and predict the same."""
+    X, _ = iris
+    for name, model in models.items():
+        save_model(model, tmp_path / f"{name}.pickle")
+    compile_tree(models["decision_tree"]).save(tmp_path / "decision_tree.npz")
+
+    loaded = load_models(tmp_path, ["decision_tree", "knn"])
+    compiled = load_models(tmp_path, ["decision_tree"], compiled_tree=True)["decision_tree"]
+    for name, model in models.items():
+        np.testing.assert_array_equal(loaded[name].predict(X), model.predict(X))
+    np.testing.assert_array_equal(compiled.predict(X), models["decision_tree"].predict(X))
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.quantile_sketch import KLLSketch
+from src.column_stats import ColumnStats
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_error(sorted_values, estimate, q):
+    """Normalized distance between the rank of the estimate and the target rank."""
+    lo = np.searchsorted(sorted_values, estimate, side="left") / len(sorted_values)
+    hi = np.searchsorted(sorted_values, estimate, side="right") / len(sorted_values)
+    return 0.0 if lo <= q <= hi else min(abs(lo - q), abs(hi - q))
+
+
+@pytest.fixture
+def iris() -> pd.DataFrame:
+    """Fixture with the raw iris data shipped in the repository."""
+    return pd.read_csv(RAW_DATA)
+
+
+@pytest.fixture(scope="module")
+def synthetic() -> np.ndarray:
+    """Fixture with two million skewed values, far more than the sketch holds."""
+    rng = np.random.default_rng(123)
+    return rng.lognormal(mean=1.0, sigma=0.5, size=2_000_000)
+
+
+def test_sketch_is_exact_while_small(iris):
+    """Verifies that a sketch that never compacted returns exact order statistics."""
+    column = iris["petal_length"].to_numpy()
+    sketch = KLLSketch(k=400).update(column)
+    assert len(sketch) == len(column)
+    for q in QUANTILES:
+        assert rank_error(np.sort(column), sketch.quantile(q), q) == 0
+
+
+@pytest.mark.parametrize("column", ["sepal_length", "sepal_width", "petal_length", "petal_width"])
+def test_sketch_matches_exact_quantiles_on_iris(iris, column):
+    """Verifies the quartiles of a compacting sketch on the iris columns stay within the error bound."""
+    values = iris[column].to_numpy()
+    sketch = KLLSketch(k=16)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    for q in QUANTILES:
+        assert rank_error(np.sort(values), sketch.quantile(q), q) <= sketch.error_bound
+
+
+def test_sketch_matches_exact_quantiles_on_large_data(synthetic):
+    """Verifies rank error and constant memory on large synthetic data."""
+    sketch = KLLSketch.from_error(0.01)
+    for chunk in np.array_split(synthetic, 40):
+        sketch.update(chunk)
+
+    ordered = np.sort(synthetic)
+    assert sketch.n == len(synthetic)
+    assert len(sketch) < 3 * sketch.k
+    for q in QUANTILES:
+        assert rank_error(ordered, sketch.quantile(q), q) <= 0.01
+
+
+def test_merged_sketches_match_single_sketch_bound(synthetic):
+    """Verifies that sketches built on separate partitions merge within the error bound."""
+    parts = np.array_split(synthetic, 8)
+    sketches = [KLLSketch(k=200, seed=i).update(part) for i, part in enumerate(parts)]
+    merged = sketches[0]
+    for other in sketches[1:]:
+        merged.merge(other)
+
+    ordered = np.sort(synthetic)
+    assert merged.n == len(synthetic)
+    for q in QUANTILES:
+        assert rank_error(ordered, merged.quantile(q), q) <= merged.error_bound
+
+
+def test_merge_rejects_different_k():
+    """Verifies that sketches of different sizes cannot be merged."""
+    with pytest.raises(ValueError):
+        KLLSketch(k=100).merge(KLLSketch(k=200))
+
+
+def test_column_stats_with_sketches_flags_same_outliers(iris):
+    """Verifies chunk-merged sketch statistics flag the same IQR outlier columns as exact ones."""
+    exact = ColumnStats.from_frame(iris)
+    sketched = ColumnStats.from_frame(iris.iloc[:75], sketch_k=200)
+    sketched.merge(ColumnStats.from_frame(iris.iloc[75:], sketch_k=200))
+    assert sketched.iqr_outliers() == exact.iqr_outliers()
+
+    with pytest.raises(ValueError):
+        exact.merge(ColumnStats.from_frame(iris, sketch_k=200))
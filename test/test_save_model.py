@@ -1,13 +1,17 @@
 import os
 import sys
 import pickle
+import numpy as np
 import pytest
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.datasets import make_classification
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from src.save_model import save_model
+from src.save_model import load_model, read_mmap_model, save_model
 
 @pytest.fixture
 def model():
@@ -54,4 +58,56 @@ def test_save_model_content_similar_to_created_model(dummy_data, tmp_path):
     assert load_model.get_params() == sample_model.get_params()
     assert (load_model.predict(X) == sample_model.predict(X)).all()
     assert load_model.max_depth == 10
-    assert load_model.get_depth() == sample_model.get_depth()
\ No newline at end of file
+    assert load_model.get_depth() == sample_model.get_depth()
+
+@pytest.fixture
+def knn_pipeline(dummy_data):
+    X, y = dummy_data
+    return make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=3)).fit(X, y)
+
+def test_mmap_model_predicts_like_the_saved_model(dummy_data, knn_pipeline, tmp_path):
+    """This test is to make sure KNN and tree pipelines saved in the mmap format predict exactly like the originals"""
+
+    X, y = dummy_data
+    tree_pipeline = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123)).fit(X, y)
+    for name, model in [("knn", knn_pipeline), ("tree", tree_pipeline)]:
+        path = tmp_path/f"{name}.mmodel"
+        save_model(model, path, format="mmap")
+        loaded = load_model(path)
+
+        assert (loaded.predict(X) == model.predict(X)).all()
+        assert (loaded.predict_proba(X) == model.predict_proba(X)).all()
+
+def test_mmap_model_arrays_map_the_file(knn_pipeline, tmp_path):
+    """This test is to make sure the KNN training data is a read-only view of the file instead of a copy"""
+
+    path = tmp_path/"knn.mmodel"
+    save_model(knn_pipeline, path, format="mmap")
+    fit_X = load_model(path)[-1]._fit_X
+
+    assert not fit_X.flags.writeable
+    assert not fit_X.flags.owndata
+    np.testing.assert_array_equal(fit_X, knn_pipeline[-1]._fit_X)
+
+def test_mmap_model_detects_corruption(knn_pipeline, tmp_path):
+    """This test is to make sure a corrupted mmap model fails the checksum instead of loading wrong values"""
+
+    path = tmp_path/"knn.mmodel"
+    save_model(knn_pipeline, path, format="mmap")
+    data = bytearray(path.read_bytes())
+    data[data.find(knn_pipeline[-1]._fit_X.tobytes()) + 7] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        load_model(path)
+
+def test_load_model_reads_both_formats(knn_pipeline, tmp_path):
+    """This test is to make sure load_model reads pickles too and the mmap reader refuses them"""
+
+    save_model(knn_pipeline, tmp_path/"knn.pickle")
+    assert isinstance(load_model(tmp_path/"knn.pickle")[-1], KNeighborsClassifier)
+
+    with pytest.raises(ValueError, match="not a memory-mapped model"):
+        read_mmap_model(tmp_path/"knn.pickle")
+    with pytest.raises(ValueError, match="Unknown model format"):
+        save_model(knn_pipeline, tmp_path/"knn.joblib", format="joblib")
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.knn_search import NeighborGraphSearchCV
+from src.search_scheduler import fit_searches
+from src.tree_search import DepthSweepSearchCV
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+TREE_GRID = {"decisiontreeclassifier__max_depth": range(1, 20)}
+KNN_GRID = {"kneighborsclassifier__n_neighbors": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+def make_searches():
+    """Unfitted tree and KNN searches, like in the training script."""
+    return [
+        DepthSweepSearchCV(make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123)), TREE_GRID),
+        NeighborGraphSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID),
+    ]
+
+
+def shared_segments():
+    """Names of the POSIX shared memory segments currently alive."""
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_fit_searches_matches_sequential_fits(iris, n_jobs):
+    """Verifies searches fitted in one shared pool get the same results as fitted one after the other."""
+    X, y = iris
+    expected = [search.fit(X, y) for search in make_searches()]
+    before = shared_segments()
+    fitted = fit_searches(make_searches(), X, y, n_jobs=n_jobs)
+
+    assert shared_segments() == before
+    for search, reference in zip(fitted, expected):
+        for key in ["mean_test_score", "mean_train_score", "split4_test_score", "rank_test_score"]:
+            np.testing.assert_allclose(search.cv_results_[key], reference.cv_results_[key])
+        assert search.best_params_ == reference.best_params_
+        np.testing.assert_array_equal(search.best_estimator_.predict(X), reference.best_estimator_.predict(X))
+
+
+def test_fit_searches_splits_candidates_over_a_reused_pool(iris):
+    """Verifies folds are split into candidate chunks when workers outnumber folds, in a pool left running."""
+    X, y = iris
+    expected = [search.fit(X, y) for search in make_searches()]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        workers = []
+        for _ in range(2):
+            # 40 workers for 10 folds: each fold is scored in 4 chunks of candidates
+            fitted = fit_searches(make_searches(), X, y, n_jobs=40, pool=pool)
+            workers.append(set(pool._processes))
+            for search, reference in zip(fitted, expected):
+                for key in ["mean_test_score", "mean_train_score", "rank_test_score"]:
+                    np.testing.assert_allclose(search.cv_results_[key], reference.cv_results_[key])
+                assert search.best_params_ == reference.best_params_
+    assert workers[0] == workers[1]
+
+
+def test_fit_searches_fits_sklearn_searches_alongside_the_pool(iris):
+    """Verifies searches without fold tasks are fitted in the parent while the pool runs the others."""
+    X, y = iris
+    random_search = RandomizedSearchCV(
+        make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID, n_iter=5, random_state=123
+    )
+    tree, knn, random_search = fit_searches([*make_searches(), random_search], X, y, n_jobs=2)
+
+    assert len(random_search.cv_results_["params"]) == 5
+    assert len(tree.cv_results_["params"]) == len(knn.cv_results_["params"]) == 19
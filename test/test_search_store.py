@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.base import clone
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.knn_search import NeighborGraphSearchCV
+from src.model_train_and_evaluation import train
+from src.search_scheduler import fit_searches
+from src.search_store import SearchStore, fit_stored_search, search_key
+from src.transform_cache import FoldTransformCache
+from src.tree_search import DepthSweepSearchCV
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+KNN_GRID = {"kneighborsclassifier__n_neighbors": range(1, 20)}
+TREE_GRID = {"decisiontreeclassifier__max_depth": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+def knn_search():
+    """An unfitted KNN neighbor-graph search."""
+    return NeighborGraphSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID)
+
+
+def test_store_resumes_interrupted_search(iris, tmp_path, monkeypatch):
+    """Verifies folds scored before an interruption are read back and only the missing folds are scored."""
+    X, y = iris
+    store = SearchStore(tmp_path)
+    expected = knn_search().fit(X, y)
+
+    scored = []
+    original = NeighborGraphSearchCV._fold
+
+    def interrupted(self, X, y_codes, train_rows, test_rows):
+        if len(scored) == 3:
+            raise KeyboardInterrupt
+        scored.append(train_rows)
+        return original(self, X, y_codes, train_rows, test_rows)
+
+    monkeypatch.setattr(NeighborGraphSearchCV, "_fold", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        knn_search().fit(X, y, store=store)
+
+    scored.clear()
+    monkeypatch.setattr(NeighborGraphSearchCV, "_fold", lambda self, *args: scored.append(1) or original(self, *args))
+    resumed = knn_search().fit(X, y, store=store)
+    assert len(scored) == 2
+    for key in ["mean_test_score", "mean_train_score", "rank_test_score"]:
+        np.testing.assert_allclose(resumed.cv_results_[key], expected.cv_results_[key])
+
+    # A repeat run scores nothing at all
+    scored.clear()
+    train(X, y, knn_search().pipeline, KNN_GRID, strategy="neighbor_graph", store=store)
+    assert scored == []
+
+
+def test_store_scores_only_new_candidates_of_a_grown_grid(iris, tmp_path):
+    """Verifies each candidate is stored on its own, so records survive between searches of different grids."""
+    X, y = iris
+    store = SearchStore(tmp_path)
+    search = knn_search()
+    search.fit(X, y, store=store)
+    key = store.key(search, X, y)
+
+    assert store.load_fold(key, 0, [1, 5, 19]) is not None
+    assert store.load_fold(key, 0, [1, 20]) is None
+
+
+def test_search_key_tracks_what_changes_results(iris):
+    """Verifies the key changes with the data, pipeline and grid but not with the cache or n_jobs."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), KNeighborsClassifier())
+    key = search_key(NeighborGraphSearchCV(pipe, KNN_GRID), X, y)
+
+    assert key == search_key(NeighborGraphSearchCV(clone(pipe).set_params(memory=FoldTransformCache()), KNN_GRID), X, y)
+    assert key != search_key(NeighborGraphSearchCV(pipe, KNN_GRID), X.assign(sepal_length=X["sepal_length"] + 1), y)
+    assert key != search_key(NeighborGraphSearchCV(pipe, {"kneighborsclassifier__n_neighbors": range(1, 10)}), X, y)
+    assert key != search_key(NeighborGraphSearchCV(clone(pipe).set_params(kneighborsclassifier__p=1), KNN_GRID), X, y)
+
+    random_search = RandomizedSearchCV(pipe, KNN_GRID, n_iter=5, random_state=123)
+    assert search_key(random_search, X, y) == search_key(clone(random_search).set_params(n_jobs=-1), X, y)
+
+
+def test_store_restores_whole_sklearn_searches(iris, tmp_path):
+    """Verifies a finished sklearn search is restored with the same results and best model."""
+    X, y = iris
+    store = SearchStore(tmp_path)
+    search = RandomizedSearchCV(make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID, n_iter=5, random_state=123)
+    fitted = fit_stored_search(clone(search), X, y, store)
+    restored = fit_stored_search(clone(search), X, y, store)
+
+    assert restored.cv_results_["params"] == fitted.cv_results_["params"]
+    assert restored.best_params_ == fitted.best_params_
+    assert restored.best_index_ == fitted.best_index_
+    np.testing.assert_array_equal(restored.best_estimator_.predict(X), fitted.best_estimator_.predict(X))
+
+
+def test_fit_searches_stores_folds_scored_in_the_pool(iris, tmp_path):
+    """Verifies searches fitted in the shared pool store their folds and are read back identically."""
+    X, y = iris
+    store = SearchStore(tmp_path)
+    tree_pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    first = fit_searches([DepthSweepSearchCV(tree_pipe, TREE_GRID), knn_search()], X, y, n_jobs=2, store=store)
+    again = fit_searches([DepthSweepSearchCV(tree_pipe, TREE_GRID), knn_search()], X, y, n_jobs=2, store=store)
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert all(len(os.listdir(tmp_path / key)) == 5 for key in os.listdir(tmp_path))
+    for search, reference in zip(again, first):
+        np.testing.assert_allclose(search.cv_results_["mean_test_score"], reference.cv_results_["mean_test_score"])
+        np.testing.assert_allclose(search.cv_results_["mean_fit_time"], reference.cv_results_["mean_fit_time"])
@@ -0,0 +1,93 @@
+import subprocess
+
+import pandas as pd
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.load_data import read_iris
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+RAW_DATA = os.path.join(ROOT, "data", "raw", "iris.csv")
+
+
+def split_preprocess(*args) -> subprocess.CompletedProcess:
+    """Runs the split_preprocess script like the Makefile does."""
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "src", "split_preprocess.py"), *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_sketch_k_requires_chunksize(tmp_path):
+    """Verifies --sketch-k without --chunksize is a usage error rather than a sketch of an in-memory column."""
+    result = split_preprocess("--rawdata", RAW_DATA, "--path", str(tmp_path), "--sketch-k", "200", "--cache-dir", "")
+
+    assert result.returncode == 2
+    assert "--chunksize" in result.stderr
+    assert not os.listdir(tmp_path)
+
+
+def read_splits(path):
+    return [read_iris(os.path.join(path, f"iris_{name}.cols")) for name in ("train", "test")]
+
+
+def test_chunksize_streams_a_stratified_split(tmp_path):
+    """Verifies the --chunksize pipeline streams every cleaned row into matching CSV and columnar splits, stratified by species."""
+    result = split_preprocess("--rawdata", RAW_DATA, "--path", str(tmp_path), "--chunksize", "40", "--cache-dir", "")
+    assert result.returncode == 0, result.stderr
+
+    train, test = read_splits(tmp_path)
+    for df, name in [(train, "train"), (test, "test")]:
+        pd.testing.assert_frame_equal(df, read_iris(tmp_path / f"iris_{name}.csv"), check_categorical=False)
+    cleaned = read_iris(RAW_DATA).drop_duplicates()
+    assert len(train) + len(test) == len(cleaned)
+    for label, n in cleaned["species"].value_counts().items():
+        assert abs((test["species"] == label).sum() - 0.3 * n) <= 0.3 * 20 + 1
+
+
+def test_chunksize_hash_split_matches_in_memory_split(tmp_path):
+    """Verifies the streamed hash split writes the same files as the in-memory pipeline."""
+    for name, args in [("memory", []), ("chunked", ["--chunksize", "40"])]:
+        result = split_preprocess(
+            "--rawdata", RAW_DATA, "--path", str(tmp_path / name), "--split-method", "hash", "--cache-dir", "", *args
+        )
+        assert result.returncode == 0, result.stderr
+
+    for expected, streamed in zip(read_splits(tmp_path / "memory"), read_splits(tmp_path / "chunked")):
+        pd.testing.assert_frame_equal(streamed, expected)
+
+
+def test_incremental_runs_append_new_rows_to_the_splits(tmp_path):
+    """Verifies incremental runs only append the new rows' hash split, ending with the splits of one full run."""
+    with open(RAW_DATA) as f:
+        lines = f.readlines()
+    raw, state, out = tmp_path / "raw.csv", tmp_path / "state", tmp_path / "out"
+    args = ["--rawdata", str(raw), "--path", str(out), "--split-method", "hash", "--incremental-state", str(state)]
+
+    raw.write_text("".join(lines[:80]))
+    assert split_preprocess(*args).returncode == 0
+    before = (out / "iris_train.csv").read_bytes()
+    with open(raw, "a") as f:
+        f.write("".join(lines[80:]))
+    result = split_preprocess(*args)
+    assert result.returncode == 0, result.stderr
+    assert (out / "iris_train.csv").read_bytes().startswith(before)
+    assert "70 newly cleaned rows appended" in result.stdout
+
+    full = tmp_path / "full"
+    split_preprocess("--rawdata", RAW_DATA, "--path", str(full), "--split-method", "hash", "--cache-dir", "")
+    for expected, appended in zip(read_splits(full), read_splits(out)):
+        pd.testing.assert_frame_equal(appended, expected)
+    for name in ["train", "test"]:
+        assert (out / f"iris_{name}.csv").read_bytes() == (full / f"iris_{name}.csv").read_bytes()
+
+
+def test_incremental_state_requires_hash_split(tmp_path):
+    """Verifies --incremental-state with the shuffle split is a usage error, as shuffled splits cannot be appended to."""
+    result = split_preprocess(
+        "--rawdata", RAW_DATA, "--path", str(tmp_path / "out"), "--incremental-state", str(tmp_path / "state")
+    )
+
+    assert result.returncode == 2
+    assert "--split-method=hash" in result.stderr
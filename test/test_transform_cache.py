@@ -0,0 +1,123 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.base import clone
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.model_train_and_evaluation import make_search, result_table, train
+from src.search_scheduler import fit_searches
+from src.transform_cache import FoldTransformCache
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+TREE_GRID = {"decisiontreeclassifier__max_depth": range(1, 20)}
+KNN_GRID = {"kneighborsclassifier__n_neighbors": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"].astype("category")
+
+
+def test_cache_fits_each_fold_scaler_once_across_candidates(iris):
+    """Verifies a random search fits the scaler once per fold plus the refit, with unchanged scores."""
+    X, y = iris
+    cache = FoldTransformCache()
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    expected = RandomizedSearchCV(pipe, TREE_GRID, n_iter=19, random_state=123).fit(X, y)
+    search, result = train(X, y, clone(pipe).set_params(memory=cache), TREE_GRID, n_iter=19)
+
+    assert cache.misses == 5 + 1
+    assert cache.hits == 19 * 5 - 5
+    np.testing.assert_allclose(search.cv_results_["mean_test_score"], expected.cv_results_["mean_test_score"])
+    assert "mean_fit_time_saved" in result.columns
+
+
+def test_cache_is_shared_across_model_families(iris):
+    """Verifies the KNN search reuses every fold scaler of the tree search and reports it in its table."""
+    X, y = iris
+    cache = FoldTransformCache()
+    searches = [
+        make_search(
+            make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123), memory=cache),
+            TREE_GRID,
+            strategy="depth_sweep",
+        ),
+        make_search(
+            make_pipeline(StandardScaler(), KNeighborsClassifier(), memory=cache), KNN_GRID, strategy="neighbor_graph"
+        ),
+    ]
+    tree, knn = fit_searches(searches, X, y, n_jobs=1)
+
+    # Five folds and the refit are fitted by the tree search and reused by KNN
+    assert (cache.misses, cache.hits) == (6, 6)
+    assert result_table(knn)["mean_fit_time_saved"].iloc[0] > 0
+    # The tree search only missed, which saves nothing but costs nothing either
+    assert (result_table(tree)["mean_fit_time_saved"] >= 0).all()
+    assert cache.overhead > 0
+    baseline = make_search(make_pipeline(StandardScaler(), KNeighborsClassifier()), KNN_GRID, strategy="neighbor_graph")
+    np.testing.assert_allclose(knn.cv_results_["mean_test_score"], baseline.fit(X, y).cv_results_["mean_test_score"])
+
+
+def test_cache_evicts_least_recently_used_entries(iris):
+    """Verifies the cache stays within its size bound by dropping the oldest entries."""
+    X, y = iris
+    fold_bytes = X.iloc[:100].to_numpy(dtype=float).nbytes
+    cache = FoldTransformCache(max_bytes=2 * fold_bytes)
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(), memory=cache)
+
+    for start in [0, 10, 0, 20]:
+        clone(pipe).fit(X.iloc[start:start + 100], y.iloc[start:start + 100])
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    # Rows 0-100 were used after rows 10-110, so those were evicted
+    clone(pipe).fit(X.iloc[:100], y.iloc[:100])
+    assert cache.hits == 2
+
+
+def test_cache_is_shared_by_clones_and_emptied_by_pickling(iris):
+    """Verifies cloned pipelines keep the same cache while a pickled copy starts empty."""
+    X, y = iris
+    cache = FoldTransformCache()
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(), memory=cache)
+    clone(pipe).fit(X, y)
+
+    assert clone(pipe).memory is cache
+    assert len(cache) == 1
+    copy = pickle.loads(pickle.dumps(cache))
+    assert len(copy) == 0 and copy.hits == 0
+
+
+def test_best_estimators_do_not_share_cached_transformers(iris):
+    """Verifies refitting one search's best estimator leaves the other's predictions unchanged."""
+    X, y = iris
+    cache = FoldTransformCache()
+    searches = [
+        make_search(
+            make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123), memory=cache),
+            TREE_GRID,
+            strategy="depth_sweep",
+        ),
+        make_search(
+            make_pipeline(StandardScaler(), KNeighborsClassifier(), memory=cache), KNN_GRID, strategy="neighbor_graph"
+        ),
+    ]
+    tree, knn = fit_searches(searches, X, y, n_jobs=1)
+    tree_model = tree.best_estimator_.set_params(memory=None)
+    knn_model = knn.best_estimator_.set_params(memory=None)
+    assert tree_model[0] is not knn_model[0]
+
+    expected = knn_model.predict(X)
+    tree_model.fit(X * 10 + 5, y)
+    np.testing.assert_array_equal(knn_model.predict(X), expected)
+    # The cached scaler is untouched too
+    np.testing.assert_array_equal(clone(knn_model).set_params(memory=cache).fit(X, y).predict(X), expected)
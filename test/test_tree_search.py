@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys, os
+from sklearn.model_selection import GridSearchCV
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.model_train_and_evaluation import train
+from src.tree_search import DepthSweepSearchCV, depth_predictions
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+GRID = {"decisiontreeclassifier__max_depth": range(1, 20)}
+
+
+@pytest.fixture
+def iris():
+    """Fixture with the features and target of the raw iris data, duplicates included."""
+    df = pd.read_csv(RAW_DATA)
+    return df.drop(columns="species"), df["species"]
+
+
+def test_depth_predictions_match_depth_limited_trees(iris):
+    """Verifies truncating a full tree at each depth predicts like a tree fitted with that max_depth."""
+    X, y = iris
+    full = DecisionTreeClassifier(random_state=123).fit(X, y)
+    predictions = depth_predictions(full, X, [1, 2, 3, None])
+
+    for depth in [1, 2, 3, None]:
+        limited = DecisionTreeClassifier(max_depth=depth, random_state=123).fit(X, y)
+        np.testing.assert_array_equal(full.classes_[predictions[depth]], limited.predict(X))
+
+
+def test_depth_sweep_search_matches_grid_search(iris):
+    """Verifies every candidate gets the same train and test scores as a full GridSearchCV."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    expected = GridSearchCV(pipe, GRID, cv=5, return_train_score=True).fit(X, y)
+    search = DepthSweepSearchCV(pipe, GRID, cv=5).fit(X, y)
+
+    for key in ["mean_test_score", "mean_train_score", "split3_test_score", "rank_test_score"]:
+        np.testing.assert_allclose(search.cv_results_[key], expected.cv_results_[key])
+    assert search.best_params_ == expected.best_params_
+    assert search.best_estimator_.get_params()["decisiontreeclassifier__max_depth"] == search.best_params_[
+        "decisiontreeclassifier__max_depth"
+    ]
+
+
+@pytest.mark.parametrize(
+    "settings", [{"max_features": 2}, {"max_leaf_nodes": 6}, {"splitter": "random"}, {"ccp_alpha": 0.01}]
+)
+def test_depth_sweep_search_refits_each_depth_of_other_trees(iris, settings):
+    """Verifies trees that truncation cannot emulate get GridSearchCV's scores and best depth."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123, **settings))
+    expected = GridSearchCV(pipe, GRID, cv=5, return_train_score=True).fit(X, y)
+    search = DepthSweepSearchCV(pipe, GRID, cv=5).fit(X, y)
+
+    for key in ["mean_test_score", "mean_train_score", "rank_test_score"]:
+        np.testing.assert_allclose(search.cv_results_[key], expected.cv_results_[key])
+    assert search.best_params_ == expected.best_params_
+
+
+def test_depth_sweep_search_rejects_other_models_and_parameters(iris):
+    """Verifies the engine refuses non-tree pipelines and grids over anything but max_depth."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier())
+    with pytest.raises(ValueError, match="only searches"):
+        DepthSweepSearchCV(pipe, {**GRID, "decisiontreeclassifier__criterion": ["entropy"]}).fit(X, y)
+    with pytest.raises(ValueError, match="DecisionTreeClassifier"):
+        DepthSweepSearchCV(make_pipeline(KNeighborsClassifier()), GRID).fit(X, y)
+
+
+def test_train_returns_same_table_with_depth_sweep_strategy(iris):
+    """Verifies train() gives the same result table columns and scores with both engines."""
+    X, y = iris
+    pipe = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    _, random_result = train(X, y, pipe, GRID, n_iter=19)
+    _, sweep_result = train(X, y, pipe, GRID, strategy="depth_sweep")
+
+    assert list(sweep_result.columns) == list(random_result.columns)
+    np.testing.assert_allclose(
+        np.sort(sweep_result["mean_test_score"].to_numpy()), np.sort(random_result["mean_test_score"].to_numpy())
+    )
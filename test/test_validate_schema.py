@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+import pytest
+import sys, os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from src.validate_iris import IrisPreSplitSchema, validate_schema
+
+RAW_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "iris.csv")
+
+
+def iris():
+    return pd.read_csv(RAW_DATA)
+
+
+def with_value(column, value, row=3):
+    df = iris()
+    df[column] = df[column].astype(object) if not isinstance(value, float) else df[column]
+    df.loc[row, column] = value
+    return df
+
+
+# Each case is a frame the fast path must treat exactly like pandera
+CASES = {
+    "valid": iris,
+    "empty": lambda: iris().iloc[:0],
+    "reordered_columns": lambda: iris()[["species", "petal_width", "sepal_length", "petal_length", "sepal_width"]],
+    "boundary_values": lambda: with_value("petal_width", 10.0).pipe(lambda df: df.assign(sepal_width=0.0)),
+    "negative_zero": lambda: with_value("sepal_width", -0.0),
+    "above_range": lambda: with_value("sepal_length", 10.5),
+    "below_range": lambda: with_value("petal_length", -0.1),
+    "infinite": lambda: with_value("petal_width", np.inf),
+    "missing_feature": lambda: with_value("sepal_width", np.nan),
+    "missing_species": lambda: with_value("species", None),
+    "unknown_species": lambda: with_value("species", "sibirica"),
+    "non_string_species": lambda: with_value("species", 3),
+    "extra_column": lambda: iris().assign(id=1),
+    "dropped_column": lambda: iris().drop(columns="petal_width"),
+    "integer_features": lambda: iris().assign(sepal_length=5),
+    "float32_features": lambda: iris().astype({"petal_length": "float32"}),
+    "string_features": lambda: iris().astype({"sepal_width": str}),
+    "unparseable_feature": lambda: with_value("sepal_length", "n/a"),
+    "categorical_species": lambda: iris().astype({"species": "category"}),
+    "duplicate_index": lambda: iris().set_axis([0] * 150),
+}
+
+
+def pandera_outcome(df):
+    try:
+        return IrisPreSplitSchema.validate(df.copy()), None
+    except (pa.errors.SchemaError, pa.errors.SchemaErrors) as err:
+        return None, err
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_validate_schema_matches_pandera(case):
+    """Verifies the fast path returns the same frame, or raises the same error, as pandera."""
+    expected, expected_error = pandera_outcome(CASES[case]())
+
+    if expected_error is None:
+        result = validate_schema(CASES[case]())
+        pd.testing.assert_frame_equal(result, expected)
+    else:
+        with pytest.raises(type(expected_error)) as raised:
+            validate_schema(CASES[case]())
+        assert str(raised.value) == str(expected_error)
+
+
+def test_validate_schema_skips_copy_when_conforming():
+    """Verifies a conforming frame is returned as is, without coercion copies."""
+    df = iris()
+    assert validate_schema(df) is df
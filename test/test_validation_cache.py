@@ -0,0 +1,91 @@
+import inspect
+import os
+import sys
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.validate_iris import validation_params
+from src.validation_cache import ValidationCache, cache_key, capture_output
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / "iris.csv"
+    path.write_text("sepal_length,species\n5.1,setosa\n4.9,setosa\n")
+    return path
+
+
+@pytest.fixture
+def cleaned():
+    return pd.DataFrame({"sepal_length": [5.1, 4.9], "species": ["setosa", "setosa"]})
+
+
+def test_cache_hit_returns_stored_frame_and_report(raw_file, cleaned, tmp_path):
+    """This test is to make sure a stored entry comes back unchanged for the same file and parameters"""
+
+    cache = ValidationCache(tmp_path / "cache")
+    key = cache_key(raw_file, {"threshold": 0.95})
+    assert cache.get(key) is None
+
+    cache.put(key, cleaned, "Check: OK\n")
+    entry = ValidationCache(tmp_path / "cache").get(cache_key(raw_file, {"threshold": 0.95}))
+    pd.testing.assert_frame_equal(entry["data"], cleaned)
+    assert entry["report"] == "Check: OK\n"
+
+
+def test_cache_key_changes_with_content_and_parameters(raw_file):
+    """This test is to make sure changed data or changed check parameters miss the cache"""
+
+    key = cache_key(raw_file, {"threshold": 0.95})
+    assert cache_key(raw_file, {"threshold": 0.9}) != key
+
+    with open(raw_file, "a") as f:
+        f.write("4.7,setosa\n")
+    assert cache_key(raw_file, {"threshold": 0.95}) != key
+
+
+@pytest.mark.parametrize("module", ["src.column_stats", "src.quantile_sketch", "src.dedup"])
+def test_validation_params_change_with_verdict_modules(module, monkeypatch):
+    """This test is to make sure editing a module that computes verdicts invalidates cached results"""
+
+    params = validation_params()
+    getsource = inspect.getsource
+    monkeypatch.setattr(
+        inspect, "getsource", lambda obj: getsource(obj) + ("# edited\n" if obj.__name__ == module else "")
+    )
+    assert validation_params()["source"] != params["source"]
+
+
+def test_invalidate_removes_entries(raw_file, cleaned, tmp_path):
+    """This test is to make sure the invalidation removes one entry or all of them"""
+
+    cache = ValidationCache(tmp_path / "cache")
+    cache.put("a", cleaned, "")
+    cache.put("b", cleaned, "")
+
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") is not None
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_eviction_keeps_cache_under_size_bound(cleaned, tmp_path):
+    """This test is to make sure the least recently used entries are evicted beyond max_bytes"""
+
+    cache = ValidationCache(tmp_path / "cache", max_bytes=1)
+    cache.put("old", cleaned, "")
+    cache.put("new", cleaned, "")
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_capture_output_still_prints(capsys):
+    """This test is to make sure the report is captured while still being printed"""
+
+    with capture_output() as report:
+        print("Check: OK")
+    assert report.getvalue() == "Check: OK\n"
+    assert capsys.readouterr().out == "Check: OK\n"